@@ -0,0 +1,47 @@
+"""
+Benchmark de perfiles SQLite: mide cuántos commits por segundo admite cada
+perfil de Database insertando tareas una por una (una transacción por tarea,
+como hace la UI al crear o marcar tareas).
+
+Uso:
+    python -m benchmarks.bench_perfiles [--commits 500]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src.modelo.modelo import Database, PERFILES_SQLITE
+from src.logica.task_manager import TaskManager
+
+
+def medir_perfil(perfil, commits):
+    """Devuelve commits/segundo para el perfil sobre un archivo temporal."""
+    with tempfile.TemporaryDirectory() as carpeta:
+        db = Database(f"sqlite:///{os.path.join(carpeta, 'bench.sqlite')}", perfil=perfil)
+        db.inicializar_db()
+        manager = TaskManager(db_instance=db)
+        manager.registrar_usuario("bench@test.com", "clave", "Bench")
+        user_id = manager.login("bench@test.com", "clave")["id"]
+
+        inicio = time.perf_counter()
+        for i in range(commits):
+            manager.agregar_tarea_usuario(user_id, f"Tarea {i}", "Benchmark", "01/01/2025")
+        duracion = time.perf_counter() - inicio
+
+        db.engine.dispose()
+    return commits / duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--commits", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'perfil':<12} {'commits/s':>12}")
+    for perfil in PERFILES_SQLITE:
+        print(f"{perfil:<12} {medir_perfil(perfil, args.commits):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
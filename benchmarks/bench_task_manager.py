@@ -0,0 +1,361 @@
+"""
+Benchmark de TaskManager con volúmenes de datos realistas: siembra una base de
+datos (usuarios x tareas por usuario), mide cada método público y reporta
+p50/p95/p99 y operaciones por segundo. El resultado es JSON para poder
+guardarlo como línea base y comparar ejecuciones posteriores.
+
+Uso:
+    python -m benchmarks.bench_task_manager [--usuarios 1000] [--tareas-por-usuario 10]
+        [--repeticiones 200] [--salida resultados.json]
+        [--guardar-base benchmarks/base.json] [--comparar benchmarks/base.json]
+
+Con --comparar termina con código 1 si algún método empeoró su p50 o p95
+más que --tolerancia (por defecto 25 %) y más que --margen-ms respecto de
+la línea base. Conviene generar la línea base en la misma máquina.
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import sqlalchemy
+from sqlalchemy import insert, select
+
+from src.modelo.modelo import Database, Tarea, Usuario
+from src.logica.hasher import HasherPbkdf2
+from src.logica.task_manager import TaskManager
+
+PALABRAS = ("informe", "reunión", "compras", "lectura", "proyecto", "correo",
+            "ejercicio", "médico", "factura", "viaje", "estudio", "revisión",
+            "llamada", "jardín", "código", "presentación", "limpieza", "banco")
+PRIORIDADES = ("Alta", "Media", "Baja")
+# Filas por sentencia INSERT al sembrar
+TAMANO_LOTE_SIEMBRA = 5_000
+# Métricas que se comparan contra la línea base
+METRICAS_COMPARADAS = ("p50_ms", "p95_ms")
+
+
+# ---------------------------------------------------------
+# SIEMBRA
+# ---------------------------------------------------------
+
+def sembrar(db, usuarios, tareas_por_usuario, rng, pw_hash):
+    """
+    Inserta los usuarios y sus tareas con INSERT multi-fila (los triggers
+    mantienen el índice FTS). Devuelve {user_id: [ids de sus tareas]}.
+    """
+    inicio = date(2024, 1, 1)
+    with db.engine.begin() as conn:
+        conn.execute(insert(Usuario), [
+            {"email": f"bench{u}@test.com", "password": pw_hash, "nombre": f"Bench {u}"}
+            for u in range(usuarios)])
+        ids_usuarios = conn.execute(select(Usuario.id).order_by(Usuario.id)).scalars().all()
+
+        filas = []
+        for user_id in ids_usuarios:
+            for _ in range(tareas_por_usuario):
+                filas.append({
+                    "titulo": " ".join(rng.sample(PALABRAS, 2)).capitalize(),
+                    "descripcion": " ".join(rng.choices(PALABRAS, k=8)),
+                    # ~10 % sin fecha, como en el uso real
+                    "fecha": None if rng.random() < 0.1
+                    else inicio + timedelta(days=rng.randrange(730)),
+                    "prioridad": rng.choice(PRIORIDADES),
+                    "estado": "completada" if rng.random() < 0.3 else "pendiente",
+                    "user_id": user_id,
+                })
+                if len(filas) >= TAMANO_LOTE_SIEMBRA:
+                    conn.execute(insert(Tarea), filas)
+                    filas = []
+        if filas:
+            conn.execute(insert(Tarea), filas)
+
+        tareas = {user_id: [] for user_id in ids_usuarios}
+        for id_task, user_id in conn.execute(select(Tarea.id, Tarea.user_id)):
+            tareas[user_id].append(id_task)
+    return tareas
+
+
+# ---------------------------------------------------------
+# MEDICIÓN
+# ---------------------------------------------------------
+
+# Métodos públicos de TaskManager que no son operaciones de la aplicación
+NO_MEDIDOS = ("stats", "transaccion")
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    indice = max(0, min(len(valores_ordenados) - 1,
+                        round(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+def medir(funcion, preparar, repeticiones):
+    """
+    Ejecuta `funcion(*preparar())` `repeticiones` veces; solo se cronometra la
+    llamada, no la preparación de sus argumentos.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        args = preparar()
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tiempos.sort()
+    return {
+        "n": repeticiones,
+        "p50_ms": percentil(tiempos, 50) * 1000,
+        "p95_ms": percentil(tiempos, 95) * 1000,
+        "p99_ms": percentil(tiempos, 99) * 1000,
+        "ops_s": repeticiones / sum(tiempos) if sum(tiempos) else float("inf"),
+    }
+
+
+def operaciones(manager, tareas, rng):
+    """
+    (nombre, función, preparar) de cada método público medido (ver
+    NO_MEDIDOS). Las escrituras que destruyen datos crean antes (sin
+    cronometrar) lo que van a borrar.
+    """
+    usuarios = list(tareas)
+
+    def usuario():
+        return rng.choice(usuarios)
+
+    def tarea_de_usuario():
+        user_id = usuario()
+        while not tareas[user_id]:
+            user_id = usuario()
+        return rng.choice(tareas[user_id]), user_id
+
+    def nueva_tarea(user_id):
+        manager.agregar_tarea_usuario(user_id, "Temporal", "Benchmark", None)
+        with manager._session_scope() as session:
+            return session.scalar(select(Tarea.id).where(Tarea.user_id == user_id)
+                                  .order_by(Tarea.id.desc()).limit(1))
+
+    def nuevas_tareas(user_id, cantidad=50):
+        manager.agregar_tareas_usuario(user_id, [{"titulo": "Temporal"}] * cantidad)
+        with manager._session_scope() as session:
+            return session.scalars(select(Tarea.id).where(Tarea.user_id == user_id)
+                                   .order_by(Tarea.id.desc()).limit(cantidad)).all()
+
+    def pagina_siguiente():
+        user_id = usuario()
+        primera = manager.listar_tareas_pagina(user_id, tamano=20)
+        return user_id, primera["siguiente"]
+
+    def preparar_eliminar():
+        user_id = usuario()
+        return nueva_tarea(user_id), user_id
+
+    def preparar_eliminar_lote():
+        user_id = usuario()
+        return user_id, nuevas_tareas(user_id)
+
+    def preparar_eliminar_completadas():
+        user_id = usuario()
+        manager.marcar_completadas(user_id, nuevas_tareas(user_id, 10))
+        return (user_id,)
+
+    sesion = {}
+
+    def preparar_resolver():
+        if "token" not in sesion:
+            sesion["token"] = manager.iniciar_sesion("bench0@test.com", "clave")["token"]
+        return (sesion["token"],)
+
+    def credenciales():
+        return f"bench{rng.randrange(len(usuarios))}@test.com", "clave"
+
+    altas = itertools.count()
+
+    def preparar_registro():
+        return f"nuevo{next(altas)}@test.com", "clave", "Nuevo"
+
+    def preparar_cerrar_sesion():
+        return (manager.iniciar_sesion(*credenciales())["token"],)
+
+    # 50 filas en CSV, como un archivo que sube el usuario
+    csv_importacion = "titulo,descripcion,fecha,prioridad,estado\n" + "".join(
+        f"Importada {i},Benchmark,0{i % 9 + 1}/07/2025,Media,pendiente\n"
+        for i in range(50))
+
+    return [
+        ("registrar_usuario", manager.registrar_usuario, preparar_registro),
+        ("login", manager.login, credenciales),
+        ("iniciar_sesion", manager.iniciar_sesion, credenciales),
+        ("resolver_sesion", manager.resolver_sesion, preparar_resolver),
+        ("cerrar_sesion", manager.cerrar_sesion, preparar_cerrar_sesion),
+        ("listar_tareas_usuario", manager.listar_tareas_usuario,
+         lambda: (usuario(),)),
+        ("listar_tareas_usuario[rango]",
+         lambda u: manager.listar_tareas_usuario(u, desde="01/03/2024", hasta="31/05/2024"),
+         lambda: (usuario(),)),
+        ("listar_tareas_pagina", manager.listar_tareas_pagina,
+         lambda: (usuario(),)),
+        ("listar_tareas_pagina[cursor]",
+         lambda u, c: manager.listar_tareas_pagina(u, cursor=c, tamano=20),
+         pagina_siguiente),
+        ("filtrar_tareas_usuario",
+         lambda u: manager.filtrar_tareas_usuario(u, estado="pendiente"),
+         lambda: (usuario(),)),
+        ("buscar_tareas[texto]", manager.buscar_tareas,
+         lambda: (usuario(), rng.choice(PALABRAS)[:4])),
+        ("buscar_tareas[fecha]", manager.buscar_tareas,
+         lambda: (usuario(), f"{rng.randint(1, 12):02d}/2024")),
+        ("obtener_tarea",
+         lambda t, u: manager.obtener_tarea(t, user_id=u),
+         tarea_de_usuario),
+        ("resumen_tareas", manager.resumen_tareas, lambda: (usuario(),)),
+        ("estadisticas_tareas", manager.estadisticas_tareas, lambda: (usuario(),)),
+        ("exportar_tareas", manager.exportar_tareas,
+         lambda: (usuario(), io.StringIO())),
+        ("importar_tareas[50]", manager.importar_tareas,
+         lambda: (usuario(), io.StringIO(csv_importacion))),
+        ("agregar_tarea_usuario", manager.agregar_tarea_usuario,
+         lambda: (usuario(), "Nueva", "Benchmark", "01/06/2025", "Media")),
+        ("agregar_tareas_usuario[50]", manager.agregar_tareas_usuario,
+         lambda: (usuario(), [{"titulo": "Lote", "fecha": "02/06/2025"}] * 50)),
+        ("editar_tarea",
+         lambda t, u: manager.editar_tarea(t, "Editada", "Benchmark", "03/06/2025",
+                                           "Alta", user_id=u),
+         tarea_de_usuario),
+        ("marcar_completada",
+         lambda t, u: manager.marcar_completada(t, user_id=u),
+         tarea_de_usuario),
+        ("marcar_completadas[50]",
+         lambda u: manager.marcar_completadas(u, tareas[u][:50], completada=False),
+         lambda: (usuario(),)),
+        ("eliminar_tarea",
+         lambda t, u: manager.eliminar_tarea(t, user_id=u),
+         preparar_eliminar),
+        ("eliminar_tareas[50]", manager.eliminar_tareas, preparar_eliminar_lote),
+        ("eliminar_completadas", manager.eliminar_completadas,
+         preparar_eliminar_completadas),
+    ]
+
+
+def ejecutar(usuarios, tareas_por_usuario, repeticiones, perfil=None, semilla=42):
+    """Siembra una base de datos temporal, mide todo y devuelve el informe."""
+    rng = random.Random(semilla)
+    with tempfile.TemporaryDirectory() as carpeta:
+        db = Database(f"sqlite:///{os.path.join(carpeta, 'bench.sqlite')}", perfil=perfil)
+        db.inicializar_db()
+        # El costo del hash se mide aparte (se calibra por máquina); aquí
+        # interesa lo que cuesta la base de datos
+        manager = TaskManager(db_instance=db, hasher=HasherPbkdf2(costo=1_000))
+
+        inicio = time.perf_counter()
+        tareas = sembrar(db, usuarios, tareas_por_usuario, rng,
+                         manager.hasher.hashear("clave"))
+        siembra = time.perf_counter() - inicio
+
+        resultados = {}
+        for nombre, funcion, preparar in operaciones(manager, tareas, rng):
+            resultados[nombre] = medir(funcion, preparar, repeticiones)
+            print(f"  {nombre:<30} p50 {resultados[nombre]['p50_ms']:8.3f} ms",
+                  file=sys.stderr)
+        db.engine.dispose()
+
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "usuarios": usuarios,
+            "tareas_por_usuario": tareas_por_usuario,
+            "repeticiones": repeticiones,
+            "perfil": db.perfil,
+            "semilla": semilla,
+            "siembra_s": round(siembra, 3),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "maquina": platform.machine(),
+        },
+        "resultados": resultados,
+    }
+
+
+# ---------------------------------------------------------
+# LÍNEA BASE
+# ---------------------------------------------------------
+
+def comparar(informe, base, tolerancia, margen_ms=0.2):
+    """
+    Lista de regresiones (metodo, metrica, base, actual) donde la métrica
+    actual supera a la de la línea base en más de `tolerancia` (proporción)
+    y en más de `margen_ms` (las operaciones de décimas de milisegundo
+    fluctúan por encima de cualquier tolerancia relativa).
+    """
+    regresiones = []
+    for nombre, actual in informe["resultados"].items():
+        anterior = base["resultados"].get(nombre)
+        if anterior is None:
+            continue
+        for metrica in METRICAS_COMPARADAS:
+            limite = max(anterior[metrica] * (1 + tolerancia),
+                         anterior[metrica] + margen_ms)
+            if actual[metrica] > limite:
+                regresiones.append((nombre, metrica, anterior[metrica], actual[metrica]))
+    return regresiones
+
+
+def imprimir_tabla(informe):
+    print(f"{'método':<30} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10}",
+          file=sys.stderr)
+    for nombre, r in informe["resultados"].items():
+        print(f"{nombre:<30} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+              f"{r['p99_ms']:>9.3f} {r['ops_s']:>10.0f}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--tareas-por-usuario", type=int, default=10)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--perfil", default=None)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto stdout)")
+    parser.add_argument("--guardar-base", help="guarda los resultados como línea base")
+    parser.add_argument("--comparar", help="línea base JSON contra la que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    parser.add_argument("--margen-ms", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"Sembrando {args.usuarios} usuarios x {args.tareas_por_usuario} tareas...",
+          file=sys.stderr)
+    informe = ejecutar(args.usuarios, args.tareas_por_usuario, args.repeticiones,
+                       args.perfil, args.semilla)
+    imprimir_tabla(informe)
+
+    salida = json.dumps(informe, indent=2, ensure_ascii=False)
+    for ruta in (args.salida, args.guardar_base):
+        if ruta:
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(salida + "\n")
+    if not args.salida:
+        print(salida)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(informe, base, args.tolerancia, args.margen_ms)
+        for nombre, metrica, antes, ahora in regresiones:
+            print(f"REGRESIÓN {nombre} {metrica}: {antes:.3f} -> {ahora:.3f} ms",
+                  file=sys.stderr)
+        if regresiones:
+            sys.exit(1)
+        print("Sin regresiones respecto de la línea base.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
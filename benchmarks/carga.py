@@ -0,0 +1,268 @@
+"""
+Generador de carga: simula usuarios concurrentes contra un TaskManager sobre
+SQLite para dimensionar cuántos admite. Cada usuario simulado repite una
+mezcla realista de login, listado, búsqueda, alta y marcado de tareas durante
+--duracion segundos; se reportan throughput, latencia de cola y errores por
+bloqueo de la base de datos en cada nivel de concurrencia.
+
+Uso:
+    python -m benchmarks.carga [--concurrencia 1,10,50,100] [--duracion 10]
+        [--modo hilos|async] [--pausa-ms 0] [--perfil equilibrado]
+        [--hash-real] [--salida carga.json]
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+
+from benchmarks.bench_task_manager import PALABRAS, percentil, sembrar
+from src.modelo.modelo import Database
+from src.logica.async_task_manager import AsyncTaskManager
+from src.logica.hasher import HasherPbkdf2, hasher_por_defecto
+from src.logica.task_manager import TaskManager
+
+# Peso relativo de cada operación en la mezcla de un usuario
+MEZCLA = (
+    ("login", 5),
+    ("listar_tareas_usuario", 40),
+    ("buscar_tareas", 20),
+    ("agregar_tarea_usuario", 20),
+    ("marcar_completada", 15),
+)
+TAREAS_INICIALES = 50
+
+
+def es_error_de_bloqueo(error):
+    texto = str(error).lower()
+    return "database is locked" in texto or "database table is locked" in texto
+
+
+class Registro:
+    """Latencias y errores de un nivel de concurrencia (seguro entre hilos)."""
+
+    def __init__(self):
+        self.latencias = {nombre: [] for nombre, _ in MEZCLA}
+        self.bloqueos = 0
+        self.errores = 0
+        self._lock = threading.Lock()
+
+    def anotar(self, nombre, duracion, error=None):
+        with self._lock:
+            if error is None:
+                self.latencias[nombre].append(duracion)
+            elif es_error_de_bloqueo(error):
+                self.bloqueos += 1
+            else:
+                self.errores += 1
+
+    def resumen(self, concurrencia, duracion):
+        todas = sorted(t for tiempos in self.latencias.values() for t in tiempos)
+        por_operacion = {}
+        for nombre, tiempos in self.latencias.items():
+            tiempos.sort()
+            por_operacion[nombre] = _percentiles(tiempos) | {"n": len(tiempos)}
+        return {
+            "concurrencia": concurrencia,
+            "operaciones": len(todas),
+            "ops_s": round(len(todas) / duracion, 1),
+            **_percentiles(todas),
+            "errores_bloqueo": self.bloqueos,
+            "otros_errores": self.errores,
+            "por_operacion": por_operacion,
+        }
+
+
+def _percentiles(tiempos):
+    if not tiempos:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    return {f"p{p}_ms": round(percentil(tiempos, p) * 1000, 3) for p in (50, 95, 99)}
+
+
+def _elegir(rng):
+    return rng.choices([n for n, _ in MEZCLA], weights=[p for _, p in MEZCLA])[0]
+
+
+def _argumentos(nombre, usuario, rng):
+    """Argumentos de la operación para el usuario simulado ({'email', 'id', 'tareas'})."""
+    if nombre == "login":
+        return (usuario["email"], "clave"), {}
+    if nombre == "listar_tareas_usuario":
+        return (usuario["id"],), {}
+    if nombre == "buscar_tareas":
+        return (usuario["id"], rng.choice(PALABRAS)[:4]), {"limite": 50}
+    if nombre == "agregar_tarea_usuario":
+        return (usuario["id"], "Carga", "Tarea de la prueba de carga", "01/06/2025"), {}
+    return (rng.choice(usuario["tareas"]),), {"user_id": usuario["id"]}
+
+
+# Última excepción de la BD en el contexto actual (hilo o tarea asyncio).
+# agregar_tarea_usuario la captura y solo devuelve False; se recupera aquí
+# para que un "database is locked" se cuente como bloqueo y no como otro error.
+_error_bd = contextvars.ContextVar("error_bd", default=None)
+
+
+def _anotar_error_bd(contexto):
+    _error_bd.set(contexto.original_exception)
+
+
+def escuchar_errores(engine):
+    """Registra los errores de la BD del motor (síncrono) en el contexto actual."""
+    event.listen(engine, "handle_error", _anotar_error_bd)
+
+
+def _error(nombre, resultado):
+    """Error a anotar para un resultado; None si la operación tuvo éxito."""
+    if resultado is not False:
+        return None
+    return _error_bd.get() or RuntimeError(f"{nombre} devolvió False")
+
+
+# ---------------------------------------------------------
+# MODOS DE EJECUCIÓN
+# ---------------------------------------------------------
+
+def _usuario_con_hilos(manager, usuario, hasta, pausa, registro, semilla):
+    rng = random.Random(semilla)
+    while time.perf_counter() < hasta:
+        nombre = _elegir(rng)
+        args, kwargs = _argumentos(nombre, usuario, rng)
+        _error_bd.set(None)
+        inicio = time.perf_counter()
+        try:
+            error = _error(nombre, getattr(manager, nombre)(*args, **kwargs))
+        except Exception as e:
+            error = e
+        registro.anotar(nombre, time.perf_counter() - inicio, error)
+        if pausa:
+            time.sleep(pausa)
+
+
+def con_hilos(manager, usuarios, duracion, pausa, semilla):
+    registro = Registro()
+    hasta = time.perf_counter() + duracion
+    with ThreadPoolExecutor(max_workers=len(usuarios)) as pool:
+        for i, usuario in enumerate(usuarios):
+            pool.submit(_usuario_con_hilos, manager, usuario, hasta, pausa,
+                        registro, semilla + i)
+    return registro
+
+
+async def _usuario_async(manager, usuario, hasta, pausa, registro, semilla):
+    rng = random.Random(semilla)
+    while time.perf_counter() < hasta:
+        nombre = _elegir(rng)
+        args, kwargs = _argumentos(nombre, usuario, rng)
+        _error_bd.set(None)
+        inicio = time.perf_counter()
+        try:
+            error = _error(nombre, await getattr(manager, nombre)(*args, **kwargs))
+        except Exception as e:
+            error = e
+        registro.anotar(nombre, time.perf_counter() - inicio, error)
+        # Cede el bucle aunque no haya pausa, como haría un cliente real
+        await asyncio.sleep(pausa)
+
+
+async def con_asyncio(manager, usuarios, duracion, pausa, semilla):
+    registro = Registro()
+    hasta = time.perf_counter() + duracion
+    await asyncio.gather(*[
+        _usuario_async(manager, usuario, hasta, pausa, registro, semilla + i)
+        for i, usuario in enumerate(usuarios)])
+    return registro
+
+
+# ---------------------------------------------------------
+# PROGRAMA
+# ---------------------------------------------------------
+
+def ejecutar(niveles, duracion, modo="hilos", pausa=0.0, perfil=None,
+             hash_real=False, semilla=7):
+    """Siembra una BD temporal y mide cada nivel de concurrencia. Devuelve la lista de resúmenes."""
+    hasher = hasher_por_defecto() if hash_real else HasherPbkdf2(costo=1_000)
+    if hash_real:
+        hasher.calibrar()
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        url = f"sqlite:///{os.path.join(carpeta, 'carga.sqlite')}"
+        # Una conexión por usuario simulado: la contención medida es la de SQLite
+        db = Database(url, perfil=perfil, pool_size=max(niveles), max_overflow=0)
+        db.inicializar_db()
+        escuchar_errores(db.engine)
+        tareas = sembrar(db, max(niveles), TAREAS_INICIALES, random.Random(semilla),
+                         hasher.hashear("clave"))
+        usuarios = [{"id": user_id, "email": f"bench{i}@test.com", "tareas": ids}
+                    for i, (user_id, ids) in enumerate(tareas.items())]
+
+        for n in niveles:
+            print(f"  {n} usuario(s) concurrentes...", file=sys.stderr)
+            if modo == "async":
+                manager = AsyncTaskManager(url, perfil=perfil, hasher=hasher,
+                                           pool_size=max(niveles), max_overflow=0)
+                escuchar_errores(manager.engine.sync_engine)
+                registro = asyncio.run(_medir_async(manager, usuarios[:n], duracion,
+                                                    pausa, semilla))
+            else:
+                manager = TaskManager(db_instance=db, hasher=hasher)
+                registro = con_hilos(manager, usuarios[:n], duracion, pausa, semilla)
+            resultados.append(registro.resumen(n, duracion))
+        db.engine.dispose()
+    return resultados
+
+
+async def _medir_async(manager, usuarios, duracion, pausa, semilla):
+    try:
+        return await con_asyncio(manager, usuarios, duracion, pausa, semilla)
+    finally:
+        await manager.cerrar()
+
+
+def imprimir_tabla(resultados):
+    print(f"{'usuarios':>8} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'bloqueos':>9} {'errores':>8}", file=sys.stderr)
+    for r in resultados:
+        print(f"{r['concurrencia']:>8} {r['ops_s']:>9.1f} {r['p50_ms'] or 0:>9.3f} "
+              f"{r['p95_ms'] or 0:>9.3f} {r['p99_ms'] or 0:>9.3f} "
+              f"{r['errores_bloqueo']:>9} {r['otros_errores']:>8}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrencia", default="1,10,50,100",
+                        help="niveles de usuarios simultáneos, separados por coma")
+    parser.add_argument("--duracion", type=float, default=10.0,
+                        help="segundos por nivel")
+    parser.add_argument("--modo", choices=("hilos", "async"), default="hilos")
+    parser.add_argument("--pausa-ms", type=float, default=0.0,
+                        help="tiempo de 'lectura' del usuario entre acciones")
+    parser.add_argument("--perfil", default=None)
+    parser.add_argument("--hash-real", action="store_true",
+                        help="usa el hash calibrado de producción en los logins")
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+
+    niveles = [int(n) for n in args.concurrencia.split(",")]
+    resultados = ejecutar(niveles, args.duracion, args.modo, args.pausa_ms / 1000,
+                          args.perfil, args.hash_real)
+    imprimir_tabla(resultados)
+
+    salida = json.dumps(resultados, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(salida + "\n")
+    else:
+        print(salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,20 @@ Interfaz gráfica del Gestor de Tareas (Flet).
 Controla el ruteo de vistas, la comunicación con el TaskManager y las validaciones de UI.
 """
 
-from src.logica.task_manager import TaskManager
+from src.logica.async_task_manager import AsyncTaskManager
+from src.logica.cache_tareas import CacheTareas
+from src.logica.busqueda_diferida import BusquedaDiferidaAsync
+from src.logica.sesiones import AlmacenSesiones
+from src.logica.instrumentacion import Instrumentacion
+from src.modelo.modelo import Database, parsear_fecha
 import flet as ft
+import asyncio
+import functools
+import logging
 import sys
 import os
 import random
-from datetime import datetime
+from datetime import date, datetime
 
 # Parche de compatibilidad para versiones recientes de Flet
 if not hasattr(ft, "colors"):
@@ -18,6 +26,31 @@ if not hasattr(ft, "colors"):
 sys.path.append(os.path.abspath(
     os.path.join(os.path.dirname(__file__), 'src')))
 
+# Tiempo sin teclear (ms) antes de lanzar la búsqueda; ajustable por entorno
+ESPERA_BUSQUEDA_MS = int(os.environ.get("ESPERA_BUSQUEDA_MS", "250"))
+# Con ESCRITURA_AGRUPADA=1 los clics que llegan juntos, desde cualquier página,
+# comparten un commit: hay un único escritor por proceso
+ESCRITURA_AGRUPADA = os.environ.get("ESCRITURA_AGRUPADA") == "1"
+# Con STATS_INTERVALO=<segundos> se miden los métodos de TaskManager y sus
+# estadísticas se escriben en el log con esa periodicidad
+STATS_INTERVALO = float(os.environ.get("STATS_INTERVALO", "0"))
+# Clave del token de sesión en las preferencias del cliente
+CLAVE_TOKEN = "token_sesion"
+# Tareas por página al desplazarse y máximo de resultados de una búsqueda
+TAMANO_PAGINA = 50
+LIMITE_BUSQUEDA = 200
+# Distancia (px) al final de la lista a partir de la cual se pide otra página
+UMBRAL_SCROLL = 200
+
+# Caché compartida por todas las páginas (pestañas y reconexiones) del proceso:
+# una escritura desde cualquiera invalida lo que las demás tienen en memoria
+CACHE_TAREAS = CacheTareas()
+# Sesiones del proceso: una reconexión o una pestaña nueva resuelve su token
+# en memoria; la tabla 'sesiones' solo se consulta tras un reinicio
+SESIONES = AlmacenSesiones(persistente=True)
+# Métricas de todo el proceso; su volcado periódico se inicia una sola vez
+INSTRUMENTACION = Instrumentacion() if STATS_INTERVALO > 0 else None
+
 # ==========================================
 # COMPONENTES REUTILIZABLES
 # ==========================================
@@ -72,7 +105,7 @@ def crear_componente_fecha(page: ft.Page, valor_inicial=""):
 # VISTAS (PANTALLAS)
 # ==========================================
 
-def mostrar_login(page: ft.Page, manager: TaskManager):
+def mostrar_login(page: ft.Page, manager: AsyncTaskManager):
     page.clean()
     page.title = "Acceso"
 
@@ -80,15 +113,17 @@ def mostrar_login(page: ft.Page, manager: TaskManager):
     password = ft.TextField(label="Contraseña", password=True, width=280)
     txt_error = ft.Text("", color="red", visible=False, size=14, weight="bold")
 
-    def funcion_entrar(e):
+    async def funcion_entrar(e):
         email.error_text, password.error_text = None, None
         txt_error.visible = False
         page.update()
 
         try:
-            usuario = manager.login(email.value, password.value)
+            usuario = await manager.iniciar_sesion(email.value, password.value)
             if not usuario:
                 raise ValueError("Correo o contraseña incorrectos")
+            # Al volver a abrir la app se entra con el token, sin login
+            await ft.SharedPreferences().set(CLAVE_TOKEN, usuario["token"])
 
             mostrar_tareas(page, manager, usuario)
 
@@ -121,7 +156,7 @@ def mostrar_login(page: ft.Page, manager: TaskManager):
     page.update()
 
 
-def mostrar_registro(page: ft.Page, manager: TaskManager):
+def mostrar_registro(page: ft.Page, manager: AsyncTaskManager):
     page.clean()
     page.title = "Registro"
 
@@ -135,7 +170,7 @@ def mostrar_registro(page: ft.Page, manager: TaskManager):
                             ft.dropdown.Option("M"), ft.dropdown.Option("F")])
     mensaje = ft.Text("", color="red")
 
-    def funcion_guardar(e):
+    async def funcion_guardar(e):
         for campo in [txt_nombre, txt_email, txt_pass, txt_fecha]:
             campo.error_text = None
         mensaje.value = ""
@@ -170,7 +205,7 @@ def mostrar_registro(page: ft.Page, manager: TaskManager):
             return
 
         try:
-            exito = manager.registrar_usuario(
+            exito = await manager.registrar_usuario(
                 email=email_text,
                 password=txt_pass.value,
                 nombre=txt_nombre.value
@@ -189,12 +224,8 @@ def mostrar_registro(page: ft.Page, manager: TaskManager):
                 page.snack_bar.open = True
                 page.update()
 
-                import threading
-
-                def finalizar():
-                    mostrar_login(page, manager)
-
-                threading.Timer(2.0, finalizar).start()
+                await asyncio.sleep(2.0)
+                mostrar_login(page, manager)
 
             else:
                 mensaje.value = "Error: No se pudo guardar en la base de datos"
@@ -229,7 +260,7 @@ def mostrar_registro(page: ft.Page, manager: TaskManager):
     page.update()
 
 
-def mostrar_tareas(page: ft.Page, manager: TaskManager, usuario: dict):
+def mostrar_tareas(page: ft.Page, manager: AsyncTaskManager, usuario: dict):
     page.clean()
     page.title = "Mis Tareas"
     page.padding = 30
@@ -243,9 +274,58 @@ def mostrar_tareas(page: ft.Page, manager: TaskManager, usuario: dict):
     filtro = ft.Dropdown(label="Filtrar por estado", width=200, value="Todas", options=[
                          ft.dropdown.Option("Todas"), ft.dropdown.Option("Pendiente"), ft.dropdown.Option("Completada")])
 
-    lista = ft.Column(spacing=10, expand=True, scroll=ft.ScrollMode.AUTO)
-
-    def ver_descripcion(e, tarea):
+    # Estructura fija de la lista: solo el contenido de cada sección cambia
+    seccion_pendientes = ft.Column(spacing=10)
+    seccion_completadas = ft.Column(spacing=10)
+    vacio_pendientes = ft.Text("", italic=True, color=ft.colors.GREY_600)
+    vacio_completadas = ft.Text("", color=ft.colors.GREY_500, size=14)
+    contenedor_vacio_pendientes = ft.Container(content=vacio_pendientes, padding=10)
+
+    lista = ft.Column(spacing=10, expand=True, scroll=ft.ScrollMode.AUTO, controls=[
+        ft.Text("Pendientes", weight=ft.FontWeight.BOLD, size=18),
+        seccion_pendientes, contenedor_vacio_pendientes,
+        ft.Divider(),
+        ft.Text("Completadas", weight=ft.FontWeight.BOLD, size=18),
+        seccion_completadas, vacio_completadas
+    ])
+
+    # id de tarea -> (datos mostrados, tarjeta). Permite reutilizar las tarjetas
+    # entre recargas para que Flet envíe solo las diferencias al cliente.
+    tarjetas = {}
+
+    # Páginas cargadas por sección: {"tareas": [...], "siguiente": cursor},
+    # o None si la sección aún no se pidió. 'cargadas' recuerda hasta dónde
+    # se desplazó el usuario para conservarlo al recargar.
+    vista = {"secciones": None, "texto": "",
+             "cargadas": {"pendiente": 0, "completada": 0}}
+    cargando = asyncio.Lock()
+
+    # Resumen de conteos del usuario (ver actualizar_resumen)
+    resumen = ft.Text("", size=13, color=ft.colors.GREY_700)
+
+    # Selección múltiple para las acciones por lotes
+    seleccionadas = set()
+    txt_seleccion = ft.Text("Ninguna seleccionada", size=12, color=ft.colors.GREY_700)
+    btn_completar_sel = ft.ElevatedButton("✔ Completar", disabled=True)
+    btn_eliminar_sel = ft.ElevatedButton(
+        "🗑 Eliminar", disabled=True, bgcolor=ft.colors.RED_100)
+    btn_limpiar_completadas = ft.TextButton("Limpiar completadas")
+    barra_seleccion = ft.Row(wrap=True, spacing=10, controls=[
+        txt_seleccion, btn_completar_sel, btn_eliminar_sel, btn_limpiar_completadas
+    ])
+
+    async def obtener_detalle(tarea):
+        """Los listados no traen la descripción: se pide al abrir la tarea."""
+        detalle = await manager.obtener_tarea(tarea["id"], user_id=usuario["id"])
+        if detalle is None:
+            mostrar_snackbar(page, "❌ La tarea ya no existe", "red")
+            await cargar_tareas()
+        return detalle
+
+    async def ver_descripcion(e, tarea):
+        tarea = await obtener_detalle(tarea)
+        if tarea is None:
+            return
         dialogo = ft.AlertDialog(
             modal=True,
             title=ft.Text(tarea["titulo"]),
@@ -253,7 +333,7 @@ def mostrar_tareas(page: ft.Page, manager: TaskManager, usuario: dict):
                 tight=True,
                 controls=[
                     ft.Text("📌 Descripción:", weight=ft.FontWeight.BOLD),
-                    ft.Text(tarea.get("descripcion", "Sin descripción")),
+                    ft.Text(tarea["descripcion"] or "Sin descripción"),
                     ft.Divider(),
                     ft.Text("⭐ Prioridad:", weight=ft.FontWeight.BOLD),
                     ft.Text(tarea.get("prioridad", "No definida")),
@@ -270,67 +350,147 @@ def mostrar_tareas(page: ft.Page, manager: TaskManager, usuario: dict):
         dialogo.open = False
         page.update()
 
-    def cargar_tareas(e=None):
-        lista.controls.clear()
+    def texto_busqueda():
+        return buscador.value.strip().lower() if buscador.value else ""
 
-        texto = buscador.value.strip().lower() if buscador.value else ""
+    async def leer_pagina(estado, tamano, cursor=None):
+        return await manager.listar_tareas_pagina(
+            usuario["id"], cursor=cursor, tamano=tamano, estado=estado)
 
-        # Obtener tareas y ordenarlas de más reciente a más antigua
-        tareas_raw = manager.listar_tareas_usuario(usuario["id"])
-        tareas_ordenadas = sorted(
-            tareas_raw,
-            key=lambda t: datetime.strptime(
-                t.get('fecha', '01/01/2000'), "%d/%m/%Y"),
-            reverse=True
-        )
-
-        # Aplicar búsqueda si hay texto ingresado
+    async def consultar_tareas(texto):
+        # Con texto se usa el índice de búsqueda (título, descripción o fecha)
         if texto:
-            tareas_finales = [t for t in tareas_ordenadas if texto in t["titulo"].lower()
-                              or texto in t.get("fecha", "").lower()]
-        else:
-            tareas_finales = tareas_ordenadas
+            tareas = await manager.buscar_tareas(
+                usuario["id"], texto, limite=LIMITE_BUSQUEDA)
+            return {estado: {"tareas": [t for t in tareas if t["estado"] == estado],
+                             "siguiente": None}
+                    for estado in ("pendiente", "completada")}
+
+        # Sin texto: primeras páginas, de más reciente a más antigua. Las
+        # completadas se piden recién cuando se agotan las pendientes.
+        cargadas = vista["cargadas"]
+        pendientes = await leer_pagina(
+            "pendiente", max(TAMANO_PAGINA, cargadas["pendiente"]))
+        completadas = None
+        if pendientes["siguiente"] is None:
+            completadas = await leer_pagina(
+                "completada", max(TAMANO_PAGINA, cargadas["completada"]))
+        return {"pendiente": pendientes, "completada": completadas}
+
+    async def cargar_mas(e):
+        """Carga la siguiente página al acercarse al final de la lista."""
+        if e.pixels < e.max_scroll_extent - UMBRAL_SCROLL or vista["texto"]:
+            return
+        if vista["secciones"] is None or cargando.locked():
+            return
+        async with cargando:
+            secciones = vista["secciones"]
+            nuevas = dict(secciones)
+            for estado in ("pendiente", "completada"):
+                actual = secciones[estado]
+                if actual is not None and actual["siguiente"] is None:
+                    continue
+                cursor = actual["siguiente"] if actual else None
+                pagina = await leer_pagina(estado, TAMANO_PAGINA, cursor)
+                previas = actual["tareas"] if actual else []
+                nuevas[estado] = {"tareas": previas + pagina["tareas"],
+                                  "siguiente": pagina["siguiente"]}
+                # Si las pendientes siguen teniendo páginas no se sigue bajando
+                if pagina["siguiente"]:
+                    break
+
+            # Una recarga o búsqueda reemplazó la lista mientras se leía
+            if vista["secciones"] is not secciones or nuevas == secciones:
+                return
+            for estado, seccion in nuevas.items():
+                if seccion:
+                    vista["cargadas"][estado] = len(seccion["tareas"])
+            pintar_tareas("", nuevas)
+
+    async def cargar_tareas(e=None):
+        # Recarga inmediata: descarta cualquier búsqueda pendiente o en curso
+        await busqueda.ejecutar_ahora(texto_busqueda())
+        await actualizar_resumen()
+
+    async def actualizar_resumen():
+        # Contadores materializados: una búsqueda por clave, sin leer tareas
+        stats = await manager.resumen_tareas(usuario["id"])
+        resumen.value = (f"📊 {stats['pendientes']} pendiente(s) · "
+                         f"{stats['completadas']} completada(s) · "
+                         f"{stats['vencidas']} vencida(s)")
+        page.update()
 
-        pendientes = [t for t in tareas_finales if t["estado"] == "pendiente"]
-        completadas = [
-            t for t in tareas_finales if t["estado"] == "completada"]
+    def pintar_tareas(texto, secciones):
+        vista["secciones"], vista["texto"] = secciones, texto
+        pendientes = secciones["pendiente"]["tareas"]
+        completadas_cargadas = secciones["completada"] is not None
+        completadas = secciones["completada"]["tareas"] if completadas_cargadas else []
 
         # --- SECCIÓN PENDIENTES ---
-        lista.controls.append(
-            ft.Text("Pendientes", weight=ft.FontWeight.BOLD, size=18))
-
-        if pendientes:
-            for t in pendientes:
-                lista.controls.append(
-                    crear_tarjeta_tarea(t, es_completada=False))
-        else:
-            msj = "🔍 No se encontraron coincidencias." if texto else "🌟 ¡No tienes tareas pendientes! Estás al día."
-            lista.controls.append(ft.Container(content=ft.Text(
-                msj, italic=True, color=ft.colors.GREY_600), padding=10))
-
-        lista.controls.append(ft.Divider())
+        sincronizar_seccion(seccion_pendientes, pendientes, es_completada=False)
+        contenedor_vacio_pendientes.visible = not pendientes
+        vacio_pendientes.value = "🔍 No se encontraron coincidencias." if texto else "🌟 ¡No tienes tareas pendientes! Estás al día."
 
         # --- SECCIÓN COMPLETADAS ---
-        lista.controls.append(
-            ft.Text("Completadas", weight=ft.FontWeight.BOLD, size=18))
-
-        if completadas:
-            for t in completadas:
-                lista.controls.append(
-                    crear_tarjeta_tarea(t, es_completada=True))
-        else:
-            msj_comp = "No hay resultados en completadas." if texto else "Aún no has terminado tareas."
-            lista.controls.append(
-                ft.Text(msj_comp, color=ft.colors.GREY_500, size=14))
+        sincronizar_seccion(seccion_completadas, completadas, es_completada=True)
+        vacio_completadas.visible = completadas_cargadas and not completadas
+        vacio_completadas.value = "No hay resultados en completadas." if texto else "Aún no has terminado tareas."
+
+        # Descarta las tarjetas de tareas que ya no se muestran
+        visibles = {t["id"] for t in pendientes + completadas}
+        for id_task in [i for i in tarjetas if i not in visibles]:
+            del tarjetas[id_task]
+        # Las acciones por lotes solo actúan sobre tareas a la vista
+        seleccionadas.intersection_update(visibles)
+        actualizar_barra_seleccion()
 
         page.update()
 
+    def sincronizar_seccion(seccion, tareas, es_completada):
+        """
+        Reconciliación por id: reutiliza la tarjeta si la tarea no cambió y solo
+        crea tarjetas nuevas para tareas agregadas o modificadas. Las tarjetas
+        eliminadas o movidas se reflejan al reemplazar la lista de controles.
+        """
+        controles = []
+        for t in tareas:
+            datos = (t["titulo"], t["descripcion"], t["fecha"],
+                     t["prioridad"], t["estado"])
+            actual = tarjetas.get(t["id"])
+            if actual is None or actual[0] != datos:
+                actual = (datos, crear_tarjeta_tarea(t, es_completada))
+                tarjetas[t["id"]] = actual
+            controles.append(actual[1])
+
+        # Comparación por identidad: si nada cambió no se toca la sección
+        if len(controles) != len(seccion.controls) or any(
+                a is not b for a, b in zip(controles, seccion.controls)):
+            seccion.controls = controles
+
     def crear_tarjeta_tarea(t, es_completada):
         color_bg = ft.colors.GREEN_50 if es_completada else ft.colors.GREY_100
+        async def al_marcar(e):
+            await cambiar_estado(t["id"])
+
+        async def al_eliminar(e):
+            await eliminar(t["id"])
+
+        async def al_ver(e):
+            await ver_descripcion(e, t)
+
+        async def al_editar(e):
+            detalle = await obtener_detalle(t)
+            if detalle is not None:
+                mostrar_editar(page, manager, usuario, detalle)
+
         icono_estado = ft.Text("✔", size=20, color=ft.colors.GREEN) if es_completada else ft.Checkbox(
-            value=False, on_change=lambda e: cambiar_estado(t["id"]))
+            value=False, on_change=al_marcar)
+        casilla_seleccion = ft.Checkbox(
+            value=t["id"] in seleccionadas, tooltip="Seleccionar",
+            on_change=lambda e: alternar_seleccion(t["id"], e.control.value))
 
         return ft.Container(
+            key=str(t["id"]), data=casilla_seleccion,
             padding=10, margin=5, bgcolor=color_bg, border_radius=12,
             content=ft.Row(
                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
@@ -349,39 +509,145 @@ def mostrar_tareas(page: ft.Page, manager: TaskManager, usuario: dict):
                                 size=12, color=ft.colors.GREY_700
                             ),
                             ft.TextButton(
-                                "Ver descripción", on_click=lambda e: ver_descripcion(e, t))
+                                "Ver descripción", on_click=al_ver)
                         ])
                     ]),
                     ft.Row(spacing=5, controls=[
+                        casilla_seleccion,
                         # Ocultar botón de edición en tareas que ya están finalizadas
                         ft.ElevatedButton("✏️", width=40, height=40,
-                                          on_click=lambda e: mostrar_editar(page, manager, usuario, t)) if not es_completada else ft.Container(),
+                                          on_click=al_editar) if not es_completada else ft.Container(),
 
                         ft.ElevatedButton("❌", bgcolor=ft.colors.RED, color=ft.colors.WHITE,
-                                          width=40, height=40, on_click=lambda e: eliminar(t["id"]))
+                                          width=40, height=40, on_click=al_eliminar)
                     ])
                 ]
             )
         )
 
-    def cambiar_estado(id_task):
-        manager.marcar_completada(id_task)
-        cargar_tareas()
+    # --- ACTUALIZACIÓN OPTIMISTA ---
+    # La tarjeta se mueve o desaparece en cuanto el usuario hace clic; la
+    # escritura se confirma después. Si falla, se recarga desde la BD (que no
+    # tiene el cambio) y se avisa con un snackbar.
+    def clave_orden(t):
+        # Mismo orden que la BD: fecha descendente (sin fecha al final), luego id
+        fecha = parsear_fecha(t["fecha"])
+        return (fecha is not None, fecha or date.min, t["id"])
+
+    def aplicar_local(id_task, cambiar):
+        """
+        Pinta las secciones con la tarea transformada por `cambiar` (que
+        devuelve la tarea nueva o None para quitarla) sin consultar la BD.
+        """
+        secciones = vista["secciones"]
+        if secciones is None:
+            return
+        nuevas, tarea = {}, None
+        for estado, seccion in secciones.items():
+            if seccion is None:
+                nuevas[estado] = None
+                continue
+            restantes = [t for t in seccion["tareas"] if t["id"] != id_task]
+            if len(restantes) != len(seccion["tareas"]):
+                tarea = next(t for t in seccion["tareas"] if t["id"] == id_task)
+            nuevas[estado] = dict(seccion, tareas=restantes)
+
+        nueva = cambiar(tarea) if tarea else None
+        destino = nuevas.get(nueva["estado"]) if nueva else None
+        if destino is not None:
+            tareas = destino["tareas"]
+            if vista["texto"]:
+                destino["tareas"] = tareas + [nueva]
+            # Si cae después de la última tarea cargada, llegará al desplazarse
+            elif destino["siguiente"] is None or (
+                    tareas and clave_orden(nueva) > clave_orden(tareas[-1])):
+                destino["tareas"] = sorted(tareas + [nueva], key=clave_orden, reverse=True)
+        pintar_tareas(vista["texto"], nuevas)
+
+    async def persistir(escritura, mensaje_error):
+        try:
+            confirmada = await escritura
+        except Exception as ex:
+            print(f"Error al guardar el cambio: {ex}")
+            confirmada = False
+        if not confirmada:
+            mostrar_snackbar(page, mensaje_error, "red")
+            await cargar_tareas()
+        else:
+            await actualizar_resumen()
+
+    async def cambiar_estado(id_task):
+        aplicar_local(id_task, lambda t: dict(
+            t, estado="completada" if t["estado"] == "pendiente" else "pendiente"))
+        await persistir(manager.marcar_completada(id_task, user_id=usuario["id"]),
+                        "❌ No se pudo actualizar la tarea")
+
+    async def eliminar(id_task):
+        aplicar_local(id_task, lambda t: None)
+        await persistir(manager.eliminar_tarea(id_task, user_id=usuario["id"]),
+                        "❌ No se pudo eliminar la tarea")
+
+    # --- ACCIONES POR LOTES (una sola transacción cada una) ---
+    def alternar_seleccion(id_task, marcada):
+        if marcada:
+            seleccionadas.add(id_task)
+        else:
+            seleccionadas.discard(id_task)
+        actualizar_barra_seleccion()
+        page.update()
+
+    def actualizar_barra_seleccion():
+        cantidad = len(seleccionadas)
+        txt_seleccion.value = f"{cantidad} seleccionada(s)" if cantidad else "Ninguna seleccionada"
+        btn_completar_sel.disabled = btn_eliminar_sel.disabled = not cantidad
+
+    async def terminar_lote(mensaje):
+        seleccionadas.clear()
+        for _, tarjeta in tarjetas.values():
+            tarjeta.data.value = False
+        mostrar_snackbar(page, mensaje, "green")
+        await cargar_tareas()
+
+    async def completar_seleccionadas(e):
+        cantidad = await manager.marcar_completadas(usuario["id"], list(seleccionadas))
+        await terminar_lote(f"✅ {cantidad} tarea(s) completada(s)")
 
-    def eliminar(id_task):
-        manager.eliminar_tarea(id_task)
-        cargar_tareas()
+    async def eliminar_seleccionadas(e):
+        cantidad = await manager.eliminar_tareas(usuario["id"], list(seleccionadas))
+        await terminar_lote(f"🗑 {cantidad} tarea(s) eliminada(s)")
+
+    async def limpiar_completadas(e):
+        cantidad = await manager.eliminar_completadas(usuario["id"])
+        await terminar_lote(f"🧹 {cantidad} tarea(s) completada(s) eliminada(s)")
+
+    btn_completar_sel.on_click = completar_seleccionadas
+    btn_eliminar_sel.on_click = eliminar_seleccionadas
+    btn_limpiar_completadas.on_click = limpiar_completadas
+
+    # Al escribir se espera una pausa antes de buscar; los resultados de
+    # búsquedas superadas por otra tecla se descartan sin pintarse
+    busqueda = BusquedaDiferidaAsync(
+        consultar_tareas, pintar_tareas, espera=ESPERA_BUSQUEDA_MS / 1000)
+
+    async def al_escribir(e):
+        busqueda.solicitar(texto_busqueda())
 
     # Vincular recarga automática al escribir o cambiar el filtro
-    buscador.on_change = cargar_tareas
+    buscador.on_change = al_escribir
     filtro.on_change = cargar_tareas
+    lista.on_scroll = cargar_mas
+
+    async def cerrar_sesion(e):
+        await manager.cerrar_sesion(usuario["token"])
+        await ft.SharedPreferences().remove(CLAVE_TOKEN)
+        mostrar_login(page, manager)
 
     header = ft.Row(
         alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
         controls=[
             ft.Text("Mis Tareas", size=24, weight=ft.FontWeight.BOLD),
             ft.ElevatedButton(
-                "Cerrar sesión", on_click=lambda e: mostrar_login(page, manager))
+                "Cerrar sesión", on_click=cerrar_sesion)
         ]
     )
 
@@ -389,16 +655,19 @@ def mostrar_tareas(page: ft.Page, manager: TaskManager, usuario: dict):
         header, ft.Divider(),
         ft.Text(f"Hola, {usuario['nombre']} 👋"),
         ft.Text(random.choice(frases), color=ft.colors.PURPLE),
+        resumen,
         buscador, filtro,
         ft.ElevatedButton("➕ Nueva tarea", bgcolor=ft.colors.BLACK, color=ft.colors.WHITE,
                           on_click=lambda e: mostrar_crear(page, manager, usuario)),
+        barra_seleccion,
         ft.Divider(), lista
     )
 
-    cargar_tareas()
+    # La vista se dibuja de inmediato; las tareas llegan cuando responde la BD
+    page.run_task(cargar_tareas)
 
 
-def mostrar_crear(page: ft.Page, manager: TaskManager, usuario: dict):
+def mostrar_crear(page: ft.Page, manager: AsyncTaskManager, usuario: dict):
     page.clean()
     page.title = "Crear Tarea"
 
@@ -410,7 +679,7 @@ def mostrar_crear(page: ft.Page, manager: TaskManager, usuario: dict):
 
     txt_fecha, fila_fecha = crear_componente_fecha(page)
 
-    def guardar(e):
+    async def guardar(e):
         txt_titulo.error_text, txt_descripcion.error_text, txt_fecha.error_text = None, None, None
         mensaje.value = ""
         error = False
@@ -432,7 +701,7 @@ def mostrar_crear(page: ft.Page, manager: TaskManager, usuario: dict):
             page.update()
             return
 
-        exito = manager.agregar_tarea_usuario(
+        exito = await manager.agregar_tarea_usuario(
             usuario["id"], txt_titulo.value, txt_descripcion.value, txt_fecha.value, prioridad.value)
 
         if exito:
@@ -454,7 +723,7 @@ def mostrar_crear(page: ft.Page, manager: TaskManager, usuario: dict):
     page.update()
 
 
-def mostrar_editar(page: ft.Page, manager: TaskManager, usuario: dict, tarea: dict):
+def mostrar_editar(page: ft.Page, manager: AsyncTaskManager, usuario: dict, tarea: dict):
     page.clean()
     page.title = "Editar Tarea"
 
@@ -467,7 +736,7 @@ def mostrar_editar(page: ft.Page, manager: TaskManager, usuario: dict, tarea: di
     txt_fecha, fila_fecha = crear_componente_fecha(
         page, tarea.get("fecha", ""))
 
-    def guardar_editar(e):
+    async def guardar_editar(e):
         if txt_fecha.value:
             try:
                 datetime.strptime(txt_fecha.value, "%d/%m/%Y")
@@ -476,8 +745,9 @@ def mostrar_editar(page: ft.Page, manager: TaskManager, usuario: dict, tarea: di
                 page.update()
                 return
 
-        manager.editar_tarea(tarea["id"], txt_titulo.value,
-                             txt_descripcion.value, txt_fecha.value, prioridad.value)
+        await manager.editar_tarea(tarea["id"], txt_titulo.value,
+                             txt_descripcion.value, txt_fecha.value, prioridad.value,
+                             user_id=usuario["id"])
         mostrar_tareas(page, manager, usuario)
 
     page.add(
@@ -500,16 +770,50 @@ def mostrar_snackbar(page: ft.Page, texto: str, color: str):
 # ==========================================
 
 
-def main(page: ft.Page):
+def crear_manager():
+    """
+    Arranque del proceso: migra el esquema, calibra el hash de contraseñas y
+    crea el único AsyncTaskManager (motor, pool y escritor agrupado) que
+    comparten todas las páginas.
+    """
+    db = Database()
+    db.inicializar_db()
+    db.engine.dispose()
+
+    manager = AsyncTaskManager(cache=CACHE_TAREAS,
+                               escritura_agrupada=ESCRITURA_AGRUPADA,
+                               sesiones=SESIONES,
+                               instrumentacion=INSTRUMENTACION)
+    # Costo del hash ajustado a esta máquina
+    manager.hasher.calibrar()
+    return manager
+
+
+async def main(page: ft.Page, manager: AsyncTaskManager):
     # Dimensiones y tema base de la ventana
     page.window_width = 400
     page.window_height = 650
     page.vertical_alignment = ft.MainAxisAlignment.CENTER
     page.theme_mode = ft.ThemeMode.LIGHT
 
-    manager = TaskManager()
-    mostrar_login(page, manager)
+    # Sesión recordada: se resuelve el token sin consultar usuario ni hash
+    usuario = await manager.resolver_sesion(
+        await ft.SharedPreferences().get(CLAVE_TOKEN))
+    if usuario:
+        mostrar_tareas(page, manager, usuario)
+    else:
+        mostrar_login(page, manager)
 
 
 if __name__ == "__main__":
-    ft.run(main)
+    if INSTRUMENTACION is not None:
+        logging.basicConfig(level=logging.INFO)
+        INSTRUMENTACION.iniciar_volcado(STATS_INTERVALO)
+    manager = crear_manager()
+    try:
+        ft.run(functools.partial(main, manager=manager))
+    finally:
+        # Vacía la cola de escrituras agrupadas y cierra el pool al salir
+        asyncio.run(manager.cerrar())
+        if INSTRUMENTACION is not None:
+            INSTRUMENTACION.detener_volcado()
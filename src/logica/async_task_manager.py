@@ -0,0 +1,221 @@
+"""
+Versión asíncrona de TaskManager sobre sqlalchemy.ext.asyncio + aiosqlite.
+Permite que los manejadores async de Flet esperen la BD sin bloquear el bucle
+de eventos mientras SQLite hace commit.
+"""
+import asyncio
+import contextlib
+import functools
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from src.modelo.modelo import (Database, url_por_defecto, aplicar_perfil_sqlite,
+                               inicializar_esquema, opciones_pool, resolver_perfil)
+from src.logica.escritor_agrupado import EscritorAgrupado
+from src.logica.hasher import hasher_por_defecto
+from src.logica.instrumentacion import filas_devueltas
+from src.logica.sesiones import AlmacenSesiones
+from src.logica.task_manager import TaskManager
+
+# Métodos públicos de TaskManager expuestos como corrutinas (registrar_usuario
+# y login se definen aparte: el hash se calcula fuera del bucle de eventos)
+METODOS_ASINCRONOS = (
+    "listar_tareas_usuario", "listar_tareas_pagina", "filtrar_tareas_usuario",
+    "obtener_tarea",
+    "buscar_tareas", "resumen_tareas", "estadisticas_tareas",
+    "agregar_tarea_usuario", "editar_tarea", "eliminar_tarea", "marcar_completada",
+    "agregar_tareas_usuario", "marcar_completadas", "eliminar_tareas",
+    "eliminar_completadas",
+    "exportar_tareas", "importar_tareas",
+    "cerrar_sesion",
+)
+
+# Métodos que pasan por el escritor agrupado cuando está activo
+METODOS_ESCRITURA = (
+    "agregar_tarea_usuario", "editar_tarea", "eliminar_tarea", "marcar_completada",
+    "agregar_tareas_usuario", "marcar_completadas", "eliminar_tareas",
+    "eliminar_completadas",
+)
+
+# Métodos que leen o escriben un archivo del llamador: corren en un hilo con un
+# TaskManager síncrono para que la E/S del archivo no bloquee el bucle de eventos
+METODOS_ARCHIVO = ("exportar_tareas", "importar_tareas")
+
+
+class _ConexionSincrona:
+    """
+    Adaptador mínimo con la interfaz de Database que TaskManager necesita
+    (`Session`), ligado a la conexión síncrona que entrega run_sync.
+    """
+
+    def __init__(self, conexion):
+        self.engine = conexion
+        self.Session = functools.partial(Session, bind=conexion)
+
+
+class AsyncTaskManager:
+    """
+    Misma API que TaskManager, pero cada método es una corrutina.
+
+    La lógica no se duplica: cada llamada toma una conexión del motor asíncrono
+    y ejecuta el método de TaskManager con `AsyncConnection.run_sync`; las
+    lecturas y commits pasan por aiosqlite y ceden el control al bucle de
+    eventos mientras esperan a SQLite.
+
+    Con `escritura_agrupada=True` las escrituras (METODOS_ESCRITURA) se envían
+    a un EscritorAgrupado que comparte un commit entre las que llegan juntas;
+    la corrutina espera el Future de su operación.
+
+    exportar_tareas e importar_tareas (METODOS_ARCHIVO) reciben archivos
+    abiertos por el llamador, así que corren con asyncio.to_thread sobre un
+    Database síncrono propio, creado en la primera llamada.
+
+    Con una Instrumentacion cada corrutina se mide completa (incluida la
+    espera de una conexión) y las sentencias se cuentan en el motor síncrono
+    subyacente.
+    """
+
+    def __init__(self, db_url=None, perfil=None, cache=None,
+                 escritura_agrupada=False, ventana=0.01, max_lote=64, hasher=None,
+                 sesiones=None, instrumentacion=None, pool_size=None,
+                 max_overflow=None, pool_timeout=None):
+        db_url = db_url or url_por_defecto()
+        url_async = db_url
+        if db_url.startswith("sqlite:"):
+            url_async = "sqlite+aiosqlite:" + db_url[len("sqlite:"):]
+
+        # Mismo dimensionado que Database (argumentos o DB_POOL_*)
+        pool = (pool_size, max_overflow, pool_timeout)
+        self._db_url, self._pool = db_url, pool
+        self.engine = create_async_engine(
+            url_async, **opciones_pool(url_async, *pool, asincrono=True))
+        # Los PRAGMAs se registran sobre el motor síncrono subyacente
+        self.perfil = resolver_perfil(perfil)
+        aplicar_perfil_sqlite(self.engine.sync_engine, self.perfil)
+        self.cache = cache
+        self.hasher = hasher or hasher_por_defecto()
+        self.sesiones = sesiones if sesiones is not None else AlmacenSesiones()
+        self.instrumentacion = instrumentacion
+        if instrumentacion is not None:
+            instrumentacion.instalar(self.engine.sync_engine)
+
+        self.escritor = None
+        if escritura_agrupada:
+            # Las escrituras agrupadas se miden en el hilo del escritor
+            manager = TaskManager(db_instance=Database(db_url, self.perfil, *pool),
+                                  cache=cache, hasher=self.hasher,
+                                  sesiones=self.sesiones,
+                                  instrumentacion=instrumentacion)
+            self.escritor = EscritorAgrupado(manager, ventana, max_lote)
+        self._archivos = None
+
+    async def inicializar_db(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(inicializar_esquema)
+
+    def stats(self):
+        """Métricas por método si hay instrumentación activa ({} si no)."""
+        return self.instrumentacion.stats() if self.instrumentacion else {}
+
+    def _medir(self, nombre):
+        if self.instrumentacion is None:
+            return contextlib.nullcontext({})
+        return self.instrumentacion.medir(nombre)
+
+    async def cerrar(self):
+        if self.escritor is not None:
+            # Termina las escrituras pendientes sin bloquear el bucle de eventos
+            await asyncio.to_thread(self.escritor.cerrar)
+            self.escritor.manager.db.engine.dispose()
+        if self._archivos is not None:
+            self._archivos.db.engine.dispose()
+        await self.engine.dispose()
+
+    # El hash corre en el pool del hasher; la BD solo se toca para leer y
+    # guardar el resultado, con los mismos métodos que usa TaskManager.
+
+    async def registrar_usuario(self, email, password, nombre):
+        with self._medir("registrar_usuario"):
+            pw_hash = await self.hasher.hashear_async(password)
+            return await self._ejecutar("_crear_usuario", email, pw_hash, nombre)
+
+    async def login(self, email, password):
+        with self._medir("login"):
+            return await self._login(email, password)
+
+    async def _login(self, email, password):
+        usuario = await self._ejecutar("_credenciales", email)
+        if not await self.hasher.verificar_async(password, usuario["password"]):
+            raise ValueError("Contraseña incorrecta.")
+
+        if self.hasher.necesita_rehash(usuario["password"]):
+            nuevo = await self.hasher.hashear_async(password)
+            await self._ejecutar("_actualizar_hash", usuario["id"],
+                                 usuario["password"], nuevo)
+        return TaskManager._datos_sesion(usuario)
+
+    async def iniciar_sesion(self, email, password):
+        with self._medir("iniciar_sesion"):
+            usuario = await self.login(email, password)
+            return await self._ejecutar("_registrar_sesion", usuario)
+
+    async def resolver_sesion(self, token):
+        with self._medir("resolver_sesion"):
+            return await self._resolver_sesion(token)
+
+    async def _resolver_sesion(self, token):
+        # Acierto en memoria: se responde sin tomar una conexión
+        usuario = self.sesiones.resolver(token) if token else None
+        if usuario is not None:
+            return dict(usuario, token=token)
+        if not token or not self.sesiones.persistente:
+            return None
+        usuario = await self._ejecutar("_sesion_persistida", token)
+        return dict(usuario, token=token) if usuario else None
+
+    def _manager_archivos(self):
+        # Solo se llama desde el bucle de eventos: no hace falta lock
+        if self._archivos is None:
+            self._archivos = TaskManager(
+                db_instance=Database(self._db_url, self.perfil, *self._pool),
+                cache=self.cache, hasher=self.hasher, sesiones=self.sesiones,
+                instrumentacion=self.instrumentacion)
+        return self._archivos
+
+    async def _ejecutar(self, nombre, *args, **kwargs):
+        if self.escritor is not None and nombre in METODOS_ESCRITURA:
+            return await asyncio.wrap_future(
+                self.escritor.encolar(nombre, *args, **kwargs))
+        if nombre in METODOS_ARCHIVO:
+            # Con instrumentación el TaskManager síncrono mide la llamada
+            return await asyncio.to_thread(
+                getattr(self._manager_archivos(), nombre), *args, **kwargs)
+        if self.instrumentacion is None:
+            return await self._en_conexion(nombre, args, kwargs)
+
+        with self.instrumentacion.medir(nombre) as medicion:
+            resultado = await self._en_conexion(nombre, args, kwargs)
+            medicion["filas"] = filas_devueltas(resultado)
+            return resultado
+
+    async def _en_conexion(self, nombre, args, kwargs):
+        async with self.engine.connect() as conn:
+            return await conn.run_sync(self._ejecutar_sincrono, nombre, args, kwargs)
+
+    def _ejecutar_sincrono(self, conexion, nombre, args, kwargs):
+        manager = TaskManager(db_instance=_ConexionSincrona(conexion),
+                              cache=self.cache, hasher=self.hasher,
+                              sesiones=self.sesiones)
+        return getattr(manager, nombre)(*args, **kwargs)
+
+
+def _metodo_asincrono(nombre):
+    original = getattr(TaskManager, nombre)
+
+    @functools.wraps(original)
+    async def metodo(self, *args, **kwargs):
+        return await self._ejecutar(nombre, *args, **kwargs)
+    return metodo
+
+
+for _nombre in METODOS_ASINCRONOS:
+    setattr(AsyncTaskManager, _nombre, _metodo_asincrono(_nombre))
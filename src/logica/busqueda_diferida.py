@@ -0,0 +1,131 @@
+"""
+Canal de búsqueda con espera (debounce) para la búsqueda mientras se escribe.
+Agrupa ráfagas de teclas en una sola consulta y descarta resultados viejos.
+"""
+import asyncio
+import threading
+
+
+class BusquedaDiferida:
+    """
+    Versión con hilos, para usar con el TaskManager síncrono.
+
+    Ejecuta `funcion_busqueda(texto)` cuando el usuario deja de escribir
+    durante `espera` segundos y entrega el resultado a `al_resultado(texto, res)`.
+
+    Cada solicitud recibe un número de secuencia; si llega otra antes de que
+    termine la anterior, el resultado de la anterior se descarta en lugar de
+    pintarse encima del más reciente.
+    """
+
+    def __init__(self, funcion_busqueda, al_resultado, espera=0.25):
+        self.funcion_busqueda = funcion_busqueda
+        self.al_resultado = al_resultado
+        self.espera = espera
+        self._secuencia = 0
+        self._temporizador = None
+        self._lock = threading.Lock()
+
+    def solicitar(self, texto):
+        """Programa la búsqueda; reinicia la espera si ya había una pendiente."""
+        with self._lock:
+            secuencia = self._nueva_secuencia()
+            self._temporizador = threading.Timer(
+                self.espera, self._ejecutar, args=(secuencia, texto))
+            self._temporizador.daemon = True
+            self._temporizador.start()
+
+    def ejecutar_ahora(self, texto):
+        """Búsqueda inmediata (carga inicial, filtros); anula la pendiente."""
+        with self._lock:
+            secuencia = self._nueva_secuencia()
+        return self._ejecutar(secuencia, texto)
+
+    def cancelar(self):
+        with self._lock:
+            self._nueva_secuencia()
+
+    def _nueva_secuencia(self):
+        """Invalida la búsqueda en curso. Requiere tener el lock."""
+        if self._temporizador:
+            self._temporizador.cancel()
+            self._temporizador = None
+        self._secuencia += 1
+        return self._secuencia
+
+    def _vigente(self, secuencia):
+        with self._lock:
+            return secuencia == self._secuencia
+
+    def _ejecutar(self, secuencia, texto):
+        if not self._vigente(secuencia):
+            return False
+
+        resultado = self.funcion_busqueda(texto)
+
+        # Otra tecla llegó mientras se consultaba: este resultado ya es viejo
+        if not self._vigente(secuencia):
+            return False
+
+        self.al_resultado(texto, resultado)
+        return True
+
+
+class BusquedaDiferidaAsync:
+    """
+    Variante para manejadores async (AsyncTaskManager): la espera es un
+    `asyncio.sleep` que se cancela con cada tecla y `funcion_busqueda` es una
+    corrutina. Una consulta ya enviada a la BD no se cancela (interrumpirla
+    podría dejar la conexión a medias); su resultado se descarta si quedó viejo.
+    """
+
+    def __init__(self, funcion_busqueda, al_resultado, espera=0.25):
+        self.funcion_busqueda = funcion_busqueda
+        self.al_resultado = al_resultado
+        self.espera = espera
+        self._secuencia = 0
+        self._pausa = None
+        self._tarea = None
+
+    def solicitar(self, texto):
+        """Programa la búsqueda; debe llamarse desde el bucle de eventos."""
+        secuencia = self._nueva_secuencia()
+        self._pausa = asyncio.ensure_future(asyncio.sleep(self.espera))
+        # Se guarda la referencia para que el recolector no descarte la tarea
+        self._tarea = asyncio.ensure_future(
+            self._esperar_y_ejecutar(secuencia, texto, self._pausa))
+        return self._tarea
+
+    async def ejecutar_ahora(self, texto):
+        """Búsqueda inmediata (carga inicial, filtros); anula la pendiente."""
+        return await self._ejecutar(self._nueva_secuencia(), texto)
+
+    def cancelar(self):
+        self._nueva_secuencia()
+
+    def _nueva_secuencia(self):
+        if self._pausa and not self._pausa.done():
+            self._pausa.cancel()
+        self._pausa = None
+        self._secuencia += 1
+        return self._secuencia
+
+    async def _esperar_y_ejecutar(self, secuencia, texto, pausa):
+        try:
+            await pausa
+        except asyncio.CancelledError:
+            return False
+        return await self._ejecutar(secuencia, texto)
+
+    async def _ejecutar(self, secuencia, texto):
+        if secuencia != self._secuencia:
+            return False
+
+        resultado = await self.funcion_busqueda(texto)
+
+        # Otra tecla llegó mientras se consultaba: este resultado ya es viejo
+        if secuencia != self._secuencia:
+            return False
+
+        self.al_resultado(texto, resultado)
+        return True
@@ -0,0 +1,168 @@
+"""
+Caché en memoria de los listados de tareas por usuario y de las tareas
+abiertas en detalle. Evita reconsultar SQLite en cada acción de la UI cuando
+nada cambió.
+"""
+import threading
+from collections import OrderedDict
+
+
+class CacheTareas:
+    """
+    Caché LRU de lectura (read-through) indexada por user_id.
+
+    El presupuesto de memoria se expresa en número total de tareas
+    almacenadas: al superarlo se descartan los usuarios usados hace más tiempo.
+    Aparte guarda las últimas `max_detalles` tareas completas (con
+    descripción) pedidas con obtener_tarea, que se invalidan junto con el
+    listado de su dueño.
+    Es segura entre hilos (Flet atiende los eventos en hilos de trabajo).
+    """
+
+    def __init__(self, max_tareas=50_000, max_detalles=128):
+        self.max_tareas = max_tareas
+        self.max_detalles = max_detalles
+        self._listados = OrderedDict()     # user_id -> tuple de TaskRecord
+        self._duenos = {}                  # id_task -> user_id (tareas en caché)
+        self._generaciones = {}            # user_id -> contador de invalidaciones
+        self._epoca = 0                    # escrituras de dueño desconocido
+        self._detalles = OrderedDict()     # id_task -> (user_id, TaskRecord completo)
+        self._total_tareas = 0
+        self._lock = threading.Lock()
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self.descartes = 0
+        self.aciertos_detalle = 0
+        self.fallos_detalle = 0
+
+    # ---------------------------------------------------------
+    # LECTURA
+    # ---------------------------------------------------------
+
+    def obtener(self, user_id):
+        """
+        Devuelve el listado o None si no está en caché. Las tareas son
+        TaskRecord inmutables: se comparten sin copiarlas, solo la lista es nueva.
+        """
+        with self._lock:
+            tareas = self._listados.get(user_id)
+            if tareas is None:
+                self.fallos += 1
+                return None
+            self._listados.move_to_end(user_id)
+            self.aciertos += 1
+        return list(tareas)
+
+    def generacion(self, user_id):
+        """Marca a capturar antes de consultar la BD (ver `guardar`)."""
+        with self._lock:
+            return self._generaciones.get(user_id, 0), self._epoca
+
+    def guardar(self, user_id, tareas, generacion):
+        """
+        Almacena el listado leído de la BD. Si hubo una invalidación mientras
+        se consultaba (la generación cambió) el resultado ya es viejo y se ignora.
+        """
+        tareas = tuple(tareas)
+        if len(tareas) > self.max_tareas:
+            return False
+
+        with self._lock:
+            if (self._generaciones.get(user_id, 0), self._epoca) != generacion:
+                return False
+
+            self._quitar(user_id)
+            self._listados[user_id] = tareas
+            self._total_tareas += len(tareas)
+            for t in tareas:
+                self._duenos[t["id"]] = user_id
+
+            while self._total_tareas > self.max_tareas:
+                antiguo = next(iter(self._listados))
+                self._quitar(antiguo)
+                self.descartes += 1
+        return True
+
+    def obtener_detalle(self, id_task, user_id):
+        """La tarea completa si está en caché y es de user_id; si no, None."""
+        with self._lock:
+            entrada = self._detalles.get(id_task)
+            if entrada is None or entrada[0] != user_id:
+                self.fallos_detalle += 1
+                return None
+            self._detalles.move_to_end(id_task)
+            self.aciertos_detalle += 1
+            return entrada[1]
+
+    def guardar_detalle(self, user_id, tarea, generacion):
+        """Almacena una tarea completa; misma regla de generación que `guardar`."""
+        with self._lock:
+            if (self._generaciones.get(user_id, 0), self._epoca) != generacion:
+                return False
+            self._detalles[tarea["id"]] = (user_id, tarea)
+            self._detalles.move_to_end(tarea["id"])
+            while len(self._detalles) > self.max_detalles:
+                self._detalles.popitem(last=False)
+        return True
+
+    # ---------------------------------------------------------
+    # INVALIDACIÓN
+    # ---------------------------------------------------------
+
+    def invalidar_usuario(self, user_id):
+        with self._lock:
+            self._generaciones[user_id] = self._generaciones.get(user_id, 0) + 1
+            if self._quitar(user_id):
+                self.invalidaciones += 1
+            for id_task in [i for i, (u, _) in self._detalles.items() if u == user_id]:
+                del self._detalles[id_task]
+
+    def invalidar_tarea(self, id_task):
+        """
+        Invalida solo al dueño de la tarea. Si la tarea no está en caché
+        ningún listado almacenado la contiene: no se descarta nada, pero se
+        rechazan las lecturas en curso que pudieran traerla con datos viejos.
+        """
+        with self._lock:
+            user_id = self._duenos.get(id_task)
+            if user_id is None and id_task in self._detalles:
+                user_id = self._detalles[id_task][0]
+            if user_id is None:
+                self._epoca += 1
+                return
+        self.invalidar_usuario(user_id)
+
+    def limpiar(self):
+        with self._lock:
+            self._epoca += 1
+            self._listados.clear()
+            self._duenos.clear()
+            self._detalles.clear()
+            self._total_tareas = 0
+
+    def estadisticas(self):
+        """Contadores para verificar en producción la tasa de aciertos."""
+        with self._lock:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "invalidaciones": self.invalidaciones,
+                "descartes": self.descartes,
+                "usuarios": len(self._listados),
+                "tareas": self._total_tareas,
+                "aciertos_detalle": self.aciertos_detalle,
+                "fallos_detalle": self.fallos_detalle,
+                "detalles": len(self._detalles),
+            }
+
+    def _quitar(self, user_id):
+        """Elimina un usuario de la caché. Requiere tener el lock."""
+        tareas = self._listados.pop(user_id, None)
+        if tareas is None:
+            return False
+        self._total_tareas -= len(tareas)
+        for t in tareas:
+            self._duenos.pop(t["id"], None)
+        return True
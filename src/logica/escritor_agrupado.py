@@ -0,0 +1,115 @@
+"""
+Cola de escrituras con commit agrupado (group commit).
+Cada clic de la UI deja de ser su propia transacción: las escrituras que llegan
+dentro de una ventana corta comparten un único commit (y un único fsync).
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Marca de cierre para el hilo escritor
+_FIN = object()
+
+
+class EscritorAgrupado:
+    """
+    Hilo en segundo plano que ejecuta métodos de escritura de un TaskManager.
+
+    `encolar(nombre, *args)` devuelve un Future con el resultado del método.
+    El hilo toma la primera escritura pendiente y espera hasta `ventana`
+    segundos (o hasta juntar `max_lote` operaciones) antes de ejecutarlas
+    todas en una sola transacción. Un único hilo consume la cola en orden de
+    llegada, por lo que las escrituras de cada usuario se aplican en el orden
+    en que se pidieron.
+
+    Si el lote falla se deshace completo y cada operación se reintenta en su
+    propia transacción: un error solo afecta al Future que lo causó.
+    """
+
+    def __init__(self, manager, ventana=0.01, max_lote=64):
+        self.manager = manager
+        self.ventana = ventana
+        self.max_lote = max_lote
+        self._cola = queue.Queue()
+        self._cerrado = False
+        self._lock = threading.Lock()
+
+        self.lotes = 0
+        self.operaciones = 0
+
+        self._hilo = threading.Thread(
+            target=self._procesar, name="escritor-agrupado", daemon=True)
+        self._hilo.start()
+
+    def encolar(self, nombre, *args, **kwargs):
+        """Programa `manager.<nombre>(*args, **kwargs)` y devuelve su Future."""
+        futuro = Future()
+        with self._lock:
+            if self._cerrado:
+                raise RuntimeError("El escritor agrupado está cerrado")
+            self._cola.put((futuro, nombre, args, kwargs))
+        return futuro
+
+    def cerrar(self):
+        """Ejecuta lo que quede en la cola y detiene el hilo."""
+        with self._lock:
+            if self._cerrado:
+                return
+            self._cerrado = True
+            self._cola.put(_FIN)
+        self._hilo.join()
+
+    def _procesar(self):
+        terminar = False
+        while not terminar:
+            primera = self._cola.get()
+            if primera is _FIN:
+                break
+
+            lote = [primera]
+            limite = time.monotonic() + self.ventana
+            while len(lote) < self.max_lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    siguiente = self._cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if siguiente is _FIN:
+                    terminar = True
+                    break
+                lote.append(siguiente)
+
+            self._ejecutar_lote(lote)
+
+    def _ejecutar_lote(self, lote):
+        lote = [op for op in lote if op[0].set_running_or_notify_cancel()]
+        if not lote:
+            return
+
+        try:
+            with self.manager.transaccion():
+                resultados = [getattr(self.manager, nombre)(*args, **kwargs)
+                              for _, nombre, args, kwargs in lote]
+        except Exception:
+            for op in lote:
+                self._ejecutar_sola(op)
+            return
+
+        self.lotes += 1
+        self.operaciones += len(lote)
+        for (futuro, *_), resultado in zip(lote, resultados):
+            futuro.set_result(resultado)
+
+    def _ejecutar_sola(self, op):
+        futuro, nombre, args, kwargs = op
+        try:
+            resultado = getattr(self.manager, nombre)(*args, **kwargs)
+        except Exception as e:
+            futuro.set_exception(e)
+        else:
+            self.lotes += 1
+            self.operaciones += 1
+            futuro.set_result(resultado)
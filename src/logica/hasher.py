@@ -0,0 +1,155 @@
+"""
+Hash de contraseñas con una KDF lenta y con sal (scrypt o PBKDF2 de hashlib).
+El costo se calibra al arrancar para un tiempo objetivo por hash y el cálculo
+corre en un pool de hilos acotado: los inicios de sesión simultáneos esperan
+turno en lugar de competir por CPU y memoria, y la UI nunca calcula un hash
+en el bucle de eventos.
+"""
+import abc
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Tiempo por hash buscado al calibrar (segundos)
+OBJETIVO_HASH = 0.05
+# Hashes calculados a la vez como máximo
+TRABAJADORES_HASH = 4
+
+
+def _b64(datos):
+    return base64.b64encode(datos).decode("ascii")
+
+
+def es_hash_heredado(almacenado):
+    """Hash antiguo: SHA-256 sin sal en hexadecimal."""
+    return (len(almacenado) == 64 and "$" not in almacenado
+            and all(c in "0123456789abcdef" for c in almacenado))
+
+
+class Hasher(abc.ABC):
+    """
+    Base de los algoritmos de hash. Las subclases definen ALGORITMO,
+    COSTO_MINIMO y `_derivar(password, sal, costo)`.
+
+    El formato almacenado es "<algoritmo>$<costo>$<sal>$<hash>" (base64): el
+    costo viaja con cada hash, así que recalibrar no invalida los existentes;
+    los que quedaron por debajo del costo actual se rehashean en el login.
+    """
+
+    ALGORITMO = None
+    COSTO_MINIMO = None
+
+    def __init__(self, costo=None, trabajadores=TRABAJADORES_HASH):
+        self.costo = costo or self.COSTO_MINIMO
+        self._ejecutor = ThreadPoolExecutor(
+            max_workers=trabajadores, thread_name_prefix="hasher")
+
+    @staticmethod
+    @abc.abstractmethod
+    def _derivar(password, sal, costo):
+        """Deriva la clave de `password` con `sal` y `costo` (bytes)."""
+
+    def calibrar(self, objetivo=OBJETIVO_HASH, costo_maximo=None):
+        """
+        Duplica el costo (desde COSTO_MINIMO) hasta que un hash tarde al menos
+        `objetivo` segundos. Devuelve el costo elegido.
+        """
+        costo = self.COSTO_MINIMO
+        while costo_maximo is None or costo * 2 <= costo_maximo:
+            inicio = time.perf_counter()
+            self._derivar(b"calibracion", os.urandom(16), costo)
+            if time.perf_counter() - inicio >= objetivo:
+                break
+            costo *= 2
+        self.costo = costo
+        return costo
+
+    # ---------------------------------------------------------
+    # API (bloqueante y asíncrona, ambas pasan por el pool acotado)
+    # ---------------------------------------------------------
+
+    def hashear(self, password):
+        return self._ejecutor.submit(self._hashear, password).result()
+
+    def verificar(self, password, almacenado):
+        return self._ejecutor.submit(self._verificar, password, almacenado).result()
+
+    async def hashear_async(self, password):
+        return await asyncio.wrap_future(self._ejecutor.submit(self._hashear, password))
+
+    async def verificar_async(self, password, almacenado):
+        return await asyncio.wrap_future(
+            self._ejecutor.submit(self._verificar, password, almacenado))
+
+    def necesita_rehash(self, almacenado):
+        """True si el hash es heredado, de otro algoritmo o de menor costo."""
+        partes = almacenado.split("$")
+        if len(partes) != 4 or partes[0] != self.ALGORITMO:
+            return True
+        return int(partes[1]) < self.costo
+
+    def cerrar(self):
+        self._ejecutor.shutdown(wait=True)
+
+    # ---------------------------------------------------------
+    # CÁLCULO (en los hilos del pool)
+    # ---------------------------------------------------------
+
+    def _hashear(self, password):
+        sal = os.urandom(16)
+        derivado = self._derivar(password.encode(), sal, self.costo)
+        return f"{self.ALGORITMO}${self.costo}${_b64(sal)}${_b64(derivado)}"
+
+    def _verificar(self, password, almacenado):
+        if es_hash_heredado(almacenado):
+            calculado = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(calculado, almacenado)
+
+        try:
+            algoritmo, costo, sal, esperado = almacenado.split("$")
+            clase = ALGORITMOS[algoritmo]
+            derivado = clase._derivar(password.encode(), base64.b64decode(sal), int(costo))
+        except (KeyError, ValueError):
+            # Hash con formato desconocido o dañado: nunca coincide
+            return False
+        return hmac.compare_digest(derivado, base64.b64decode(esperado))
+
+
+class HasherScrypt(Hasher):
+    """scrypt (resistente a GPU por uso de memoria); el costo es N, con r=8 y p=1."""
+
+    ALGORITMO = "scrypt"
+    COSTO_MINIMO = 2 ** 14
+
+    @staticmethod
+    def _derivar(password, sal, costo):
+        # Memoria usada ~ 128 * r * N; se deja margen sobre el límite por defecto
+        return hashlib.scrypt(password, salt=sal, n=costo, r=8, p=1,
+                              maxmem=256 * 8 * costo, dklen=32)
+
+
+class HasherPbkdf2(Hasher):
+    """PBKDF2-HMAC-SHA256; el costo es el número de iteraciones."""
+
+    ALGORITMO = "pbkdf2_sha256"
+    COSTO_MINIMO = 100_000
+
+    @staticmethod
+    def _derivar(password, sal, costo):
+        return hashlib.pbkdf2_hmac("sha256", password, sal, costo)
+
+
+# Algoritmos que se saben verificar (aunque el hasher activo sea otro)
+ALGORITMOS = {c.ALGORITMO: c for c in (HasherScrypt, HasherPbkdf2)}
+
+# Hasher compartido por los TaskManager que no reciben uno propio (sus hilos
+# se crean recién con el primer hash)
+_por_defecto = HasherScrypt()
+
+
+def hasher_por_defecto():
+    return _por_defecto
@@ -0,0 +1,233 @@
+"""
+Instrumentación de TaskManager: sentencias SQL, filas y latencia por método.
+
+Los métodos públicos se marcan con `@medido`; la marca no los envuelve, así
+que sin instrumentación activa no hay ningún costo. Al pasar una
+Instrumentacion a TaskManager se envuelven los métodos marcados de esa
+instancia y se escuchan before/after_cursor_execute del motor.
+"""
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (ms) de los cubos del histograma de latencia
+CUBOS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+# Nombre bajo el que se cuentan las sentencias emitidas fuera de un método medido
+SIN_METODO = "(sin método)"
+
+# Métodos medidos en curso. Una ContextVar (y no un threading.local) sigue
+# también a las corrutinas y greenlets de AsyncTaskManager que comparten hilo.
+_en_curso = contextvars.ContextVar("metodos_medidos", default=())
+
+
+def medido(funcion):
+    """Marca un método de TaskManager para que Instrumentacion lo mida."""
+    funcion._medido = True
+    return funcion
+
+
+class _Metricas:
+    __slots__ = ("llamadas", "errores", "tiempo_ms", "sentencias", "tiempo_sql_ms",
+                 "filas_afectadas", "filas_devueltas", "histograma")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.tiempo_ms = 0.0
+        self.sentencias = 0
+        self.tiempo_sql_ms = 0.0
+        self.filas_afectadas = 0
+        self.filas_devueltas = 0
+        self.histograma = [0] * len(CUBOS_MS)
+
+    def percentil(self, p):
+        """Límite superior del cubo que contiene al percentil p (aproximado)."""
+        objetivo = p / 100 * self.llamadas
+        acumulado = 0
+        for limite, cantidad in zip(CUBOS_MS, self.histograma):
+            acumulado += cantidad
+            if cantidad and acumulado >= objetivo:
+                return limite
+        return None
+
+    def resumen(self):
+        return {
+            "llamadas": self.llamadas,
+            "errores": self.errores,
+            "tiempo_ms": round(self.tiempo_ms, 3),
+            "media_ms": round(self.tiempo_ms / self.llamadas, 3) if self.llamadas else None,
+            "p50_ms": self.percentil(50),
+            "p95_ms": self.percentil(95),
+            "p99_ms": self.percentil(99),
+            "sentencias": self.sentencias,
+            "sentencias_por_llamada": (round(self.sentencias / self.llamadas, 2)
+                                       if self.llamadas else None),
+            "tiempo_sql_ms": round(self.tiempo_sql_ms, 3),
+            "filas_afectadas": self.filas_afectadas,
+            "filas_devueltas": self.filas_devueltas,
+            "histograma": {f"<={limite}ms": cantidad
+                           for limite, cantidad in zip(CUBOS_MS, self.histograma)
+                           if cantidad},
+        }
+
+
+class Instrumentacion:
+    """
+    Acumula métricas por método. Una misma instancia puede compartirse entre
+    varios TaskManager (p. ej. los que crea AsyncTaskManager por llamada).
+    Es segura entre hilos.
+    """
+
+    def __init__(self):
+        self._metricas = {}
+        self._motores = []
+        self._lock = threading.Lock()
+        self._volcado = None
+
+    # ---------------------------------------------------------
+    # INSTALACIÓN
+    # ---------------------------------------------------------
+
+    def instalar(self, engine):
+        """Escucha las sentencias del motor (una sola vez por motor)."""
+        with self._lock:
+            if any(m is engine for m in self._motores):
+                return
+            self._motores.append(engine)
+        event.listen(engine, "before_cursor_execute", self._antes_de_sentencia)
+        event.listen(engine, "after_cursor_execute", self._despues_de_sentencia)
+
+    def desinstalar(self):
+        with self._lock:
+            motores, self._motores = self._motores, []
+        for engine in motores:
+            event.remove(engine, "before_cursor_execute", self._antes_de_sentencia)
+            event.remove(engine, "after_cursor_execute", self._despues_de_sentencia)
+
+    def activar(self, manager):
+        """Envuelve, solo en esta instancia, los métodos marcados con @medido."""
+        for nombre in dir(type(manager)):
+            if getattr(getattr(type(manager), nombre), "_medido", False):
+                setattr(manager, nombre, self._envolver(nombre, getattr(manager, nombre)))
+
+    def _envolver(self, nombre, metodo):
+        @functools.wraps(metodo)
+        def envoltura(*args, **kwargs):
+            with self.medir(nombre) as medicion:
+                resultado = metodo(*args, **kwargs)
+                medicion["filas"] = filas_devueltas(resultado)
+                return resultado
+        return envoltura
+
+    # ---------------------------------------------------------
+    # MEDICIÓN
+    # ---------------------------------------------------------
+
+    @contextmanager
+    def medir(self, nombre):
+        """
+        Mide un bloque como una llamada a `nombre`; las sentencias emitidas
+        dentro se le atribuyen (y también a los métodos que lo contienen).
+        El bloque puede informar filas devueltas en el dict que se entrega.
+        """
+        medicion = {"filas": 0}
+        marca = _en_curso.set(_en_curso.get() + (nombre,))
+        inicio = time.perf_counter()
+        error = False
+        try:
+            yield medicion
+        except Exception:
+            error = True
+            raise
+        finally:
+            duracion = (time.perf_counter() - inicio) * 1000
+            _en_curso.reset(marca)
+            with self._lock:
+                m = self._de(nombre)
+                m.llamadas += 1
+                m.errores += error
+                m.tiempo_ms += duracion
+                m.filas_devueltas += medicion["filas"]
+                m.histograma[_cubo(duracion)] += 1
+
+    def _antes_de_sentencia(self, conn, cursor, statement, parameters, context,
+                            executemany):
+        # El inicio vive en el contexto de la sentencia: si ésta falla no queda
+        # nada pendiente en la conexión
+        context._instrumentacion_inicio = time.perf_counter()
+
+    def _despues_de_sentencia(self, conn, cursor, statement, parameters, context,
+                              executemany):
+        duracion = (time.perf_counter() - context._instrumentacion_inicio) * 1000
+        # rowcount es -1 en los SELECT de sqlite3: solo cuenta filas escritas
+        afectadas = max(cursor.rowcount or 0, 0)
+        with self._lock:
+            for nombre in set(_en_curso.get()) or (SIN_METODO,):
+                m = self._de(nombre)
+                m.sentencias += 1
+                m.tiempo_sql_ms += duracion
+                m.filas_afectadas += afectadas
+
+    def _de(self, nombre):
+        """Métricas de un método. Requiere tener el lock."""
+        m = self._metricas.get(nombre)
+        if m is None:
+            m = self._metricas[nombre] = _Metricas()
+        return m
+
+    # ---------------------------------------------------------
+    # CONSULTA Y VOLCADO
+    # ---------------------------------------------------------
+
+    def stats(self):
+        """Resumen por método (ver _Metricas.resumen)."""
+        with self._lock:
+            return {nombre: m.resumen() for nombre, m in sorted(self._metricas.items())}
+
+    def reiniciar(self):
+        with self._lock:
+            self._metricas.clear()
+
+    def iniciar_volcado(self, intervalo=60.0):
+        """Escribe stats() en el log cada `intervalo` segundos (hilo demonio)."""
+        self.detener_volcado()
+        detener = threading.Event()
+
+        def volcar():
+            while not detener.wait(intervalo):
+                logger.info("stats TaskManager %s",
+                            json.dumps(self.stats(), ensure_ascii=False))
+
+        hilo = threading.Thread(target=volcar, name="volcado-stats", daemon=True)
+        self._volcado = (detener, hilo)
+        hilo.start()
+
+    def detener_volcado(self):
+        if self._volcado:
+            detener, hilo = self._volcado
+            detener.set()
+            hilo.join()
+            self._volcado = None
+
+
+def _cubo(duracion_ms):
+    for i, limite in enumerate(CUBOS_MS):
+        if duracion_ms <= limite:
+            return i
+
+
+def filas_devueltas(resultado):
+    """Filas que entrega un método: largo de la lista o de la página de tareas."""
+    if isinstance(resultado, list):
+        return len(resultado)
+    if isinstance(resultado, dict) and isinstance(resultado.get("tareas"), list):
+        return len(resultado["tareas"])
+    return 0
@@ -0,0 +1,104 @@
+"""
+Almacén de tokens de sesión en memoria con vencimiento (TTL) y límite LRU.
+Tras el login, cada vista o reconexión resuelve el token con una búsqueda en
+un diccionario, sin volver a consultar al usuario ni a calcular su hash.
+"""
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+# Vigencia de una sesión (segundos)
+TTL_SESION = 7 * 24 * 3600
+
+
+def huella_token(token):
+    """
+    SHA-256 del token: es lo que se guarda en la tabla de sesiones, para que
+    una copia de la BD no permita suplantar a nadie.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AlmacenSesiones:
+    """
+    token opaco -> datos del usuario, con vencimiento absoluto por sesión.
+
+    Al superar `max_sesiones` se descartan las usadas hace más tiempo. Con
+    `persistente=True`, TaskManager guarda además cada sesión en la tabla
+    `sesiones` y recupera desde ahí las que no estén en memoria (tras un
+    reinicio o un descarte). Es segura entre hilos.
+    """
+
+    def __init__(self, ttl=TTL_SESION, max_sesiones=10_000, persistente=False):
+        self.ttl = ttl
+        self.max_sesiones = max_sesiones
+        self.persistente = persistente
+        self._sesiones = OrderedDict()     # token -> (usuario, vence)
+        self._lock = threading.Lock()
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartes = 0
+
+    def emitir(self, usuario):
+        """Crea un token nuevo para el usuario. Devuelve (token, vence)."""
+        token = secrets.token_urlsafe(32)
+        vence = time.time() + self.ttl
+        self.guardar(token, usuario, vence)
+        return token, vence
+
+    def guardar(self, token, usuario, vence):
+        """Registra una sesión ya emitida (p. ej. leída de la tabla persistida)."""
+        with self._lock:
+            self._sesiones[token] = (dict(usuario), vence)
+            self._sesiones.move_to_end(token)
+            while len(self._sesiones) > self.max_sesiones:
+                self._sesiones.popitem(last=False)
+                self.descartes += 1
+
+    def resolver(self, token):
+        """Copia de los datos del usuario, o None si el token no es válido o venció."""
+        with self._lock:
+            sesion = self._sesiones.get(token)
+            if sesion is None:
+                self.fallos += 1
+                return None
+            usuario, vence = sesion
+            if vence <= time.time():
+                del self._sesiones[token]
+                self.fallos += 1
+                return None
+            self._sesiones.move_to_end(token)
+            self.aciertos += 1
+        return dict(usuario)
+
+    def revocar(self, token):
+        with self._lock:
+            return self._sesiones.pop(token, None) is not None
+
+    def revocar_usuario(self, user_id):
+        """Cierra todas las sesiones de un usuario (p. ej. al cambiar la contraseña)."""
+        with self._lock:
+            tokens = [t for t, (u, _) in self._sesiones.items() if u["id"] == user_id]
+            for token in tokens:
+                del self._sesiones[token]
+        return len(tokens)
+
+    def limpiar_vencidas(self):
+        ahora = time.time()
+        with self._lock:
+            vencidas = [t for t, (_, vence) in self._sesiones.items() if vence <= ahora]
+            for token in vencidas:
+                del self._sesiones[token]
+        return len(vencidas)
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "descartes": self.descartes,
+                "sesiones": len(self._sesiones),
+            }
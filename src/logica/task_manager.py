@@ -2,9 +2,62 @@
 Logica de negocio optimizada.
 Gestiona Usuarios y Tareas interactuando con SQLAlchemy.
 """
-import hashlib
+import csv
+import json
+import re
+import threading
+import time
+import unicodedata
 from contextlib import contextmanager
-from src.modelo.modelo import Database, Usuario, Tarea
+from datetime import date, timedelta
+from sqlalchemy import (Engine, and_, case, column, delete, func, insert,
+                        literal, literal_column, null, select, table, tuple_,
+                        update)
+from sqlalchemy.orm import scoped_session
+from src.modelo.modelo import (Database, Usuario, Tarea, Sesion, ContadorTareas,
+                               CODIGOS_ESTADO, CODIGOS_PRIORIDAD, FORMATO_FECHA_UI,
+                               SIN_FECHA, parsear_fecha)
+from src.logica.hasher import hasher_por_defecto
+from src.logica.instrumentacion import medido
+from src.logica.sesiones import AlmacenSesiones, huella_token
+from src.logica.task_record import TaskRecord
+
+
+# SQLite admite un número limitado de parámetros por sentencia; las listas de
+# ids más largas se parten en tramos dentro de la misma transacción.
+MAX_IDS_POR_SENTENCIA = 500
+
+# Columnas de un TaskRecord, en su orden. SQLite entrega la fecha ya
+# formateada para la UI y los vacíos resueltos: cada fila se convierte en
+# TaskRecord sin tocar sus valores.
+COLUMNAS_REGISTRO = (
+    Tarea.id, Tarea.titulo,
+    func.coalesce(Tarea.descripcion, "").label("descripcion"),
+    func.coalesce(func.strftime(FORMATO_FECHA_UI, Tarea.fecha), SIN_FECHA).label("fecha"),
+    Tarea.prioridad, Tarea.estado,
+)
+# Los listados son resúmenes: la descripción (posiblemente larga) no se lee
+# ni se transfiere y queda en None; obtener_tarea trae la tarea completa
+COLUMNAS_RESUMEN = (COLUMNAS_REGISTRO[:2] + (null().label("descripcion"),)
+                    + COLUMNAS_REGISTRO[3:])
+# Usuarios con hasta esta cantidad de tareas cargan su listado completo en la
+# caché al pedir la primera página; las páginas siguientes, las recargas y las
+# búsquedas por fecha se sirven de memoria. Con más tareas se pagina en la BD.
+MAX_LISTADO_PAGINADO = 2_000
+# Índice FTS5 (tabla virtual, fuera del modelo) para unirlo a 'tasks'
+TASKS_FTS = table("tasks_fts", column("rowid"), column("rank"))
+
+# Exportación/importación en flujo: filas leídas por tanda al exportar, filas
+# por transacción al importar y errores de validación que se informan
+COLUMNAS_EXPORTACION = ("titulo", "descripcion", "fecha", "prioridad", "estado")
+TAMANO_TANDA_EXPORTACION = 1_000
+TAMANO_LOTE_IMPORTACION = 10_000
+MAX_ERRORES_IMPORTACION = 100
+
+# Agrupación de la fecha en las estadísticas (formato de strftime de SQLite).
+# Las semanas empiezan en lunes y se numeran desde 00 (%W).
+PERIODOS_ESTADISTICAS = {"mes": "%Y-%m", "semana": "%Y-W%W"}
+ESTADOS = tuple(CODIGOS_ESTADO)
 
 
 class TaskManager:
@@ -13,14 +66,34 @@ class TaskManager:
     Implementa el patrón de persistencia mediante SQLAlchemy.
     """
 
-    def __init__(self, db_instance=None):
+    def __init__(self, db_instance=None, cache=None, hasher=None, sesiones=None,
+                 instrumentacion=None):
         if db_instance:
             self.db = db_instance
         else:
             self.db = Database()
             self.db.inicializar_db()
 
+        # Registro de sesiones por hilo: si se inyecta una fábrica simple
+        # (p. ej. en pruebas) se envuelve para que sea segura entre hilos.
         self.Session = self.db.Session
+        if not isinstance(self.Session, scoped_session):
+            self.Session = scoped_session(self.Session)
+        # Caché opcional de listados por usuario (ver CacheTareas)
+        self.cache = cache
+        # Hash de contraseñas (ver src/logica/hasher.py)
+        self.hasher = hasher or hasher_por_defecto()
+        # Tokens de sesión emitidos en el login (ver AlmacenSesiones)
+        self.sesiones = sesiones if sesiones is not None else AlmacenSesiones()
+        # Métricas opcionales por método (ver Instrumentacion); sin ella los
+        # métodos marcados con @medido se ejecutan tal cual
+        self.instrumentacion = instrumentacion
+        if instrumentacion is not None:
+            if isinstance(self.db.engine, Engine):
+                instrumentacion.instalar(self.db.engine)
+            instrumentacion.activar(self)
+        # Estado de la transacción agrupada en curso, por hilo (ver transaccion)
+        self._lote = threading.local()
 
     # ---------------------------------------------------------
     # MÉTODOS AUXILIARES (DRY)
@@ -31,7 +104,16 @@ class TaskManager:
         """
         Context manager para manejar el ciclo de vida de la sesión.
         Abre, hace commit, maneja rollbacks en caso de error y cierra la sesión.
+        La sesión es la del hilo actual; al salir se retira del registro para
+        devolver la conexión al pool (por eso estos bloques no se anidan).
+        Dentro de `transaccion()` se reutiliza la sesión del lote sin commit.
         """
+        if self._en_lote():
+            session = self.Session()
+            yield session
+            session.flush()
+            return
+
         session = self.Session()
         try:
             yield session
@@ -40,24 +122,87 @@ class TaskManager:
             session.rollback()
             raise
         finally:
-            session.close()
+            self.Session.remove()
 
-    def _tarea_to_dict(self, t):
-        """Centraliza la serialización de tareas para evitar código duplicado."""
-        return {
-            "id": t.id,
-            "titulo": t.titulo,
-            "descripcion": t.descripcion or "",
-            "fecha": t.fecha or "Sin fecha",
-            "prioridad": t.prioridad,
-            "estado": t.estado
-        }
+    def stats(self):
+        """Métricas por método si hay instrumentación activa ({} si no)."""
+        return self.instrumentacion.stats() if self.instrumentacion else {}
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Agrupa todas las operaciones del bloque en un único commit.
+        Si algo falla se deshace el bloque completo. Las invalidaciones de
+        caché se aplican después del commit para que ninguna lectura
+        concurrente vuelva a guardar datos anteriores a la escritura.
+        """
+        pendientes = []
+        with self._session_scope():
+            self._lote.invalidaciones = pendientes
+            try:
+                yield
+            finally:
+                self._lote.invalidaciones = None
+
+        for invalidar, clave in pendientes:
+            invalidar(clave)
+
+    def _en_lote(self):
+        return getattr(self._lote, "invalidaciones", None) is not None
+
+    def _registros(self, session, consulta):
+        """Ejecuta una consulta de COLUMNAS_REGISTRO y devuelve sus TaskRecord."""
+        # Por la conexión (Core): sin la capa ORM de session.execute
+        filas = session.connection().execute(consulta)
+        return [TaskRecord._make(fila) for fila in filas]
+
+    def _ordenar_y_acotar(self, query, orden="desc", desde=None, hasta=None):
+        """
+        Aplica el rango de fechas (inclusivo) y el orden por fecha en SQL.
+        'desc' devuelve primero las más recientes (las tareas sin fecha al final);
+        'asc' devuelve primero las más antiguas; 'prioridad', las más
+        importantes y, dentro de cada prioridad, las más recientes.
+        """
+        desde, hasta = parsear_fecha(desde), parsear_fecha(hasta)
+        if desde:
+            query = query.filter(Tarea.fecha >= desde)
+        if hasta:
+            query = query.filter(Tarea.fecha <= hasta)
+
+        if orden == "desc":
+            return query.order_by(Tarea.fecha.desc(), Tarea.id.desc())
+        if orden == "asc":
+            return query.order_by(Tarea.fecha.asc(), Tarea.id.asc())
+        if orden == "prioridad":
+            return query.order_by(Tarea.prioridad.desc(), Tarea.fecha.desc(),
+                                  Tarea.id.desc())
+        raise ValueError(f"Orden no soportado: {orden}")
 
     # ---------------------------------------------------------
     # GESTIÓN DE USUARIOS
     # ---------------------------------------------------------
 
+    # El hash se calcula fuera de la transacción: la KDF es lenta a propósito
+    # y no debe retener la conexión ni el bloqueo de escritura de SQLite.
+
+    @medido
     def registrar_usuario(self, email, password, nombre):
+        return self._crear_usuario(email, self.hasher.hashear(password), nombre)
+
+    @medido
+    def login(self, email, password):
+        usuario = self._credenciales(email)
+        if not self.hasher.verificar(password, usuario["password"]):
+            raise ValueError("Contraseña incorrecta.")
+
+        # Hash heredado (SHA-256) o de menor costo: se reemplaza ahora que
+        # se conoce la contraseña
+        if self.hasher.necesita_rehash(usuario["password"]):
+            self._actualizar_hash(usuario["id"], usuario["password"],
+                                  self.hasher.hashear(password))
+        return self._datos_sesion(usuario)
+
+    def _crear_usuario(self, email, pw_hash, nombre):
         try:
             with self._session_scope() as session:
                 # 1. VERIFICACIÓN DE UNICIDAD:
@@ -69,7 +214,6 @@ class TaskManager:
                         "El correo electrónico ya está registrado.")
 
                 # 2. PROCESO DE REGISTRO:
-                pw_hash = hashlib.sha256(password.encode()).hexdigest()
                 nuevo = Usuario(email=email, password=pw_hash, nombre=nombre)
                 session.add(nuevo)
             return True
@@ -80,7 +224,8 @@ class TaskManager:
             print(f"Error en registro: {e}")
             return False
 
-    def login(self, email, password):
+    def _credenciales(self, email):
+        """Datos del usuario, incluido el hash almacenado, para verificar el login."""
         try:
             with self._session_scope() as session:
                 user = session.query(Usuario).filter_by(email=email).first()
@@ -88,15 +233,11 @@ class TaskManager:
                 if not user:
                     raise ValueError("El correo no existe.")
 
-                pw_hash = hashlib.sha256(password.encode()).hexdigest()
-
-                if user.password != pw_hash:
-                    raise ValueError("Contraseña incorrecta.")
-
                 return {
                     "id": user.id,
                     "nombre": user.nombre,
-                    "email": user.email
+                    "email": user.email,
+                    "password": user.password
                 }
         except ValueError as e:
             raise e
@@ -104,65 +245,744 @@ class TaskManager:
             print(f"Error desconocido: {e}")
             raise ValueError("Error de conexión con la base de datos.")
 
+    def _actualizar_hash(self, user_id, anterior, nuevo):
+        # Solo si nadie cambió la contraseña entre la lectura y esta escritura
+        with self._session_scope() as session:
+            session.execute(
+                update(Usuario)
+                .where(Usuario.id == user_id, Usuario.password == anterior)
+                .values(password=nuevo),
+                execution_options={"synchronize_session": False})
+
+    @staticmethod
+    def _datos_sesion(usuario):
+        return {
+            "id": usuario["id"],
+            "nombre": usuario["nombre"],
+            "email": usuario["email"]
+        }
+
+    # ---------------------------------------------------------
+    # SESIONES
+    # ---------------------------------------------------------
+
+    @medido
+    def iniciar_sesion(self, email, password):
+        """Login que además emite un token; devuelve los datos del usuario con 'token'."""
+        return self._registrar_sesion(self.login(email, password))
+
+    @medido
+    def resolver_sesion(self, token):
+        """
+        Usuario dueño del token (con 'token') o None si no es válido o venció.
+        Se resuelve en memoria; solo con sesiones persistentes se consulta la
+        tabla cuando el token no está cargado.
+        """
+        if not token:
+            return None
+        usuario = self.sesiones.resolver(token)
+        if usuario is None and self.sesiones.persistente:
+            usuario = self._sesion_persistida(token)
+        return dict(usuario, token=token) if usuario else None
+
+    @medido
+    def cerrar_sesion(self, token):
+        self.sesiones.revocar(token)
+        if self.sesiones.persistente:
+            with self._session_scope() as session:
+                session.execute(
+                    delete(Sesion).where(Sesion.huella == huella_token(token)),
+                    execution_options={"synchronize_session": False})
+
+    def _registrar_sesion(self, usuario):
+        token, vence = self.sesiones.emitir(usuario)
+        if self.sesiones.persistente:
+            with self._session_scope() as session:
+                # De paso se descartan las sesiones vencidas del mismo usuario
+                session.execute(
+                    delete(Sesion).where(Sesion.user_id == usuario["id"],
+                                         Sesion.vence <= time.time()),
+                    execution_options={"synchronize_session": False})
+                session.execute(insert(Sesion).values(
+                    huella=huella_token(token), user_id=usuario["id"], vence=vence))
+        return dict(usuario, token=token)
+
+    def _sesion_persistida(self, token):
+        with self._session_scope() as session:
+            fila = (session.query(Usuario.id, Usuario.nombre, Usuario.email, Sesion.vence)
+                    .join(Sesion, Sesion.user_id == Usuario.id)
+                    .filter(Sesion.huella == huella_token(token),
+                            Sesion.vence > time.time())
+                    .first())
+        if fila is None:
+            return None
+
+        usuario = {"id": fila.id, "nombre": fila.nombre, "email": fila.email}
+        self.sesiones.guardar(token, usuario, fila.vence)
+        return usuario
+
     # ---------------------------------------------------------
     # GESTIÓN DE TAREAS (CRUD)
     # ---------------------------------------------------------
 
-    def listar_tareas_usuario(self, user_id):
+    @medido
+    def listar_tareas_usuario(self, user_id, orden="desc", desde=None, hasta=None):
+        # Solo el listado por defecto (el que pide la UI) pasa por la caché
+        usar_cache = self.cache is not None and orden == "desc" \
+            and desde is None and hasta is None
+        if usar_cache:
+            tareas = self.cache.obtener(user_id)
+            return tareas if tareas is not None else self._cargar_listado(user_id)
+        return self._leer_listado(user_id, orden, desde, hasta)
+
+    def _leer_listado(self, user_id, orden="desc", desde=None, hasta=None):
         with self._session_scope() as session:
-            tareas = session.query(Tarea).filter_by(user_id=user_id).all()
-            return [self._tarea_to_dict(t) for t in tareas]
+            consulta = select(*COLUMNAS_RESUMEN).where(Tarea.user_id == user_id)
+            consulta = self._ordenar_y_acotar(consulta, orden, desde, hasta)
+            return self._registros(session, consulta)
+
+    def _cargar_listado(self, user_id):
+        """Lee el listado por defecto de la BD y lo guarda en la caché."""
+        generacion = self.cache.generacion(user_id)
+        tareas = self._leer_listado(user_id)
+        self.cache.guardar(user_id, tareas, generacion)
+        return tareas
+
+    @medido
+    def listar_tareas_pagina(self, user_id, cursor=None, tamano=50, estado=None,
+                             orden="desc"):
+        """
+        Paginación por clave (keyset) ordenada por (fecha, id): cada página
+        continúa justo después de la última fila de la anterior usando el
+        índice, sin OFFSET, así que cuesta lo mismo la primera que la milésima.
+        Con caché, las páginas se toman del listado en memoria; la primera lo
+        carga si el usuario tiene hasta MAX_LISTADO_PAGINADO tareas.
+        Devuelve {"tareas": [...], "siguiente": cursor opaco o None al final}.
+        """
+        if tamano < 1:
+            raise ValueError("El tamaño de página debe ser positivo.")
+        if orden not in ("desc", "asc"):
+            raise ValueError(f"Orden no soportado: {orden}")
+        clave = self._leer_cursor(cursor)
+        if estado and estado.lower() != "todas":
+            estado = estado.lower()
+            # Un estado desconocido no tiene código: ninguna tarea lo cumple
+            if estado not in CODIGOS_ESTADO:
+                return {"tareas": [], "siguiente": None}
+        else:
+            estado = None
+
+        en_cache = None
+        if self.cache is not None:
+            en_cache = self.cache.obtener(user_id)
+            # La primera página de un usuario mediano trae su listado entero
+            # a la caché, para que lo que sigue no vuelva a la BD
+            if en_cache is None and clave is None \
+                    and self._cantidad_tareas(user_id) <= MAX_LISTADO_PAGINADO:
+                en_cache = self._cargar_listado(user_id)
+        if en_cache is not None:
+            tareas = self._pagina_en_memoria(en_cache, clave, tamano, estado, orden)
+        else:
+            tareas = self._pagina_desde_bd(user_id, clave, tamano, estado, orden)
+
+        siguiente = None
+        if len(tareas) > tamano:
+            tareas = tareas[:tamano]
+            siguiente = self._escribir_cursor(tareas[-1])
+        return {"tareas": tareas, "siguiente": siguiente}
+
+    def _cantidad_tareas(self, user_id):
+        """Total de tareas del usuario según user_task_stats (búsqueda por clave)."""
+        consulta = (select(func.coalesce(func.sum(
+                        ContadorTareas.pendientes + ContadorTareas.completadas), 0))
+                    .where(ContadorTareas.user_id == user_id))
+        with self._session_scope() as session:
+            return session.execute(consulta).scalar_one()
+
+    def _pagina_desde_bd(self, user_id, clave, tamano, estado, orden):
+        """
+        Lee hasta tamano + 1 filas (la extra indica si hay otra página).
+        Las tareas sin fecha forman un tramo aparte (al final en 'desc', al
+        inicio en 'asc') porque NULL no se puede comparar en la condición
+        (fecha, id) < (?, ?); cada tramo se recorre con su propio rango del índice.
+        """
+        tramos = ["fechas", "sin_fecha"] if orden == "desc" else ["sin_fecha", "fechas"]
+        if clave:
+            tramos = tramos[tramos.index("sin_fecha" if clave[0] is None else "fechas"):]
+        despues = (lambda a, b: a < b) if orden == "desc" else (lambda a, b: a > b)
+
+        tareas = []
+        with self._session_scope() as session:
+            for tramo in tramos:
+                query = select(*COLUMNAS_RESUMEN).where(Tarea.user_id == user_id)
+                if estado:
+                    query = query.where(Tarea.estado == estado)
+
+                if tramo == "fechas":
+                    query = query.filter(Tarea.fecha.isnot(None))
+                    if clave and clave[0] is not None:
+                        query = query.filter(despues(
+                            tuple_(Tarea.fecha, Tarea.id), tuple_(*clave)))
+                else:
+                    query = query.filter(Tarea.fecha.is_(None))
+                    if clave and clave[0] is None:
+                        query = query.filter(despues(Tarea.id, clave[1]))
+                # El cursor solo acota el tramo donde quedó la página anterior
+                clave = None
+
+                query = self._ordenar_y_acotar(query, orden)
+                query = query.limit(tamano + 1 - len(tareas))
+                tareas.extend(self._registros(session, query))
+                if len(tareas) > tamano:
+                    break
+        return tareas
+
+    def _pagina_en_memoria(self, tareas, clave, tamano, estado, orden):
+        """Misma página que _pagina_desde_bd, tomada del listado en caché."""
+        if estado:
+            tareas = [t for t in tareas if t["estado"] == estado]
+        if orden == "asc":
+            # El inverso de (fecha DESC, id DESC) es el orden ascendente de SQLite
+            tareas.reverse()
+
+        if clave:
+            for posicion, t in enumerate(tareas):
+                if self._clave_de(t) == clave:
+                    tareas = tareas[posicion + 1:]
+                    break
+            else:
+                tareas = [t for t in tareas
+                          if self._sigue_al_cursor(self._clave_de(t), clave, orden)]
+        return tareas[:tamano + 1]
+
+    def _sigue_al_cursor(self, clave_fila, clave, orden):
+        """Indica si una fila va después del cursor en el orden pedido."""
+        fecha, id_task = clave_fila
+        if (fecha is None) != (clave[0] is None):
+            # Tramos distintos: sin fecha va al final en 'desc', al inicio en 'asc'
+            return (fecha is None) == (orden == "desc")
+        if fecha is None:
+            fecha = clave[0]
+        if orden == "desc":
+            return (fecha, id_task) < clave
+        return (fecha, id_task) > clave
+
+    def _clave_de(self, t):
+        return parsear_fecha(t["fecha"]), t["id"]
+
+    def _escribir_cursor(self, t):
+        fecha, id_task = self._clave_de(t)
+        return f"{fecha.isoformat() if fecha else ''}:{id_task}"
+
+    def _leer_cursor(self, cursor):
+        """Decodifica el cursor 'aaaa-mm-dd:id' (fecha vacía = tarea sin fecha)."""
+        if not cursor:
+            return None
+        try:
+            fecha, id_task = cursor.rsplit(":", 1)
+            return parsear_fecha(fecha), int(id_task)
+        except ValueError:
+            raise ValueError(f"Cursor de paginación no válido: {cursor}")
+
+    def _invalidar_usuario(self, user_id):
+        if self.cache is not None:
+            self._invalidar(self.cache.invalidar_usuario, user_id)
+
+    def _invalidar_tarea(self, id_task):
+        if self.cache is not None:
+            self._invalidar(self.cache.invalidar_tarea, id_task)
+
+    def _invalidar(self, invalidar, clave):
+        # Dentro de una transacción agrupada se espera al commit
+        if self._en_lote():
+            self._lote.invalidaciones.append((invalidar, clave))
+        else:
+            invalidar(clave)
+
+    @medido
+    def obtener_tarea(self, id_task, user_id=None):
+        """
+        Tarea completa, con la descripción que los listados omiten, para las
+        vistas de detalle y edición. None si no existe o (con user_id) no es
+        del usuario. Con caché, las abiertas hace poco se sirven de memoria.
+        """
+        usar_cache = self.cache is not None and user_id is not None
+        if usar_cache:
+            tarea = self.cache.obtener_detalle(id_task, user_id)
+            if tarea is not None:
+                return tarea
+            generacion = self.cache.generacion(user_id)
+
+        consulta = select(*COLUMNAS_REGISTRO).where(Tarea.id == id_task)
+        if user_id is not None:
+            consulta = consulta.where(Tarea.user_id == user_id)
+        with self._session_scope() as session:
+            tareas = self._registros(session, consulta)
+
+        tarea = tareas[0] if tareas else None
+        if usar_cache and tarea is not None:
+            self.cache.guardar_detalle(user_id, tarea, generacion)
+        return tarea
 
+    @medido
     def agregar_tarea_usuario(self, user_id, titulo, descripcion, fecha=None, prioridad="Media"):
         try:
             with self._session_scope() as session:
                 nueva = Tarea(
                     titulo=titulo,
                     descripcion=descripcion,
-                    fecha=fecha,
+                    fecha=parsear_fecha(fecha),
                     prioridad=prioridad,
                     estado="pendiente",
                     user_id=user_id
                 )
                 session.add(nueva)
+            self._invalidar_usuario(user_id)
             return True
         except Exception as e:
             print(f"Error al guardar tarea: {e}")
             return False
 
-    def editar_tarea(self, id_task, titulo, descripcion, fecha, prioridad):
+    # Las escrituras sobre una tarea son una única sentencia UPDATE/DELETE
+    # (sin cargar el objeto ORM antes). Si se indica user_id, la propiedad de
+    # la tarea se verifica en la misma sentencia. Devuelven las filas afectadas.
+
+    @medido
+    def editar_tarea(self, id_task, titulo, descripcion, fecha, prioridad, user_id=None):
+        if prioridad is not None and prioridad not in CODIGOS_PRIORIDAD:
+            raise ValueError(f"Prioridad no válida: {prioridad}")
+        return self._escribir_tarea(
+            update(Tarea).values(
+                titulo=titulo,
+                descripcion=descripcion,
+                fecha=parsear_fecha(fecha),
+                prioridad=prioridad
+            ), id_task, user_id)
+
+    @medido
+    def eliminar_tarea(self, id_task, user_id=None):
+        return self._escribir_tarea(delete(Tarea), id_task, user_id)
+
+    @medido
+    def marcar_completada(self, id_task, user_id=None):
+        # Toggle resuelto por SQLite con CASE, sin leer el estado actual.
+        # Los literales llevan el tipo de la columna para guardarse como código.
+        def estado(etiqueta):
+            return literal(etiqueta, Tarea.estado.type)
+
+        return self._escribir_tarea(
+            update(Tarea).values(estado=case(
+                (Tarea.estado == "pendiente", estado("completada")),
+                else_=estado("pendiente")
+            )), id_task, user_id)
+
+    def _escribir_tarea(self, sentencia, id_task, user_id):
+        sentencia = sentencia.where(Tarea.id == id_task)
+        if user_id is not None:
+            sentencia = sentencia.where(Tarea.user_id == user_id)
+
         with self._session_scope() as session:
-            tarea = session.query(Tarea).filter_by(id=id_task).first()
-            if tarea:
-                tarea.titulo = titulo
-                tarea.descripcion = descripcion
-                tarea.fecha = fecha
-                tarea.prioridad = prioridad
-
-    def eliminar_tarea(self, id_task):
+            afectadas = session.execute(
+                sentencia, execution_options={"synchronize_session": False}
+            ).rowcount
+
+        if afectadas:
+            if user_id is not None:
+                self._invalidar_usuario(user_id)
+            else:
+                self._invalidar_tarea(id_task)
+        return afectadas
+
+    @medido
+    def buscar_tareas(self, user_id, texto, limite=None):
+        """
+        Búsqueda por título/descripción usando el índice FTS5 (coincidencia por
+        prefijo en cada palabra, resultados ordenados por relevancia bm25).
+        Si el texto es una fecha (dd/mm/aaaa) o un mes (mm/aaaa) filtra por fecha,
+        en memoria si el listado del usuario está vigente en caché. El texto
+        siempre va al índice: los listados en caché no traen la descripción.
+        """
+        rango = self._rango_de_fecha(texto)
+        if rango:
+            en_cache = self.cache.obtener(user_id) if self.cache is not None else None
+            if en_cache is not None:
+                tareas = self._filtrar_por_fecha(en_cache, rango)
+            else:
+                tareas = self.listar_tareas_usuario(
+                    user_id, desde=rango[0], hasta=rango[1])
+            return tareas[:limite] if limite else tareas
+
+        consulta = self._consulta_fts(texto)
+        if not consulta:
+            tareas = self.listar_tareas_usuario(user_id)
+            return tareas[:limite] if limite else tareas
+
+        # El usuario va dentro del MATCH y el LIMIT dentro de la subconsulta:
+        # FTS5 solo puntúa las filas del usuario y corta el orden por bm25
+        # sin materializar el resto de las coincidencias
+        coincidencias = (
+            select(TASKS_FTS.c.rowid, TASKS_FTS.c.rank)
+            .where(literal_column("tasks_fts").op("MATCH")(
+                f'user_id : "{int(user_id)}" AND {{titulo descripcion}} : ({consulta})'))
+            .order_by(TASKS_FTS.c.rank))
+        if limite:
+            coincidencias = coincidencias.limit(limite)
+        coincidencias = coincidencias.subquery()
+
+        sentencia = (select(*COLUMNAS_RESUMEN)
+                     .join_from(coincidencias, Tarea, Tarea.id == coincidencias.c.rowid)
+                     .where(Tarea.user_id == user_id)
+                     .order_by(coincidencias.c.rank))
         with self._session_scope() as session:
-            tarea = session.query(Tarea).filter_by(id=id_task).first()
-            if tarea:
-                session.delete(tarea)
+            return self._registros(session, sentencia)
+
+    def _consulta_fts(self, texto):
+        """
+        Convierte el texto libre en una consulta FTS5 segura: cada palabra se
+        cita (evita errores de sintaxis con comillas, guiones, etc.) y se
+        busca como prefijo, de modo que 'pyt' encuentra 'Python'.
+        """
+        return " ".join(f'"{p}"*' for p in self._palabras(texto))
+
+    def _palabras(self, texto):
+        """Palabras en minúsculas y sin tildes, como las indexa FTS5."""
+        texto = unicodedata.normalize("NFKD", (texto or "").lower())
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+        return re.findall(r"\w+", texto)
+
+    def _filtrar_por_fecha(self, tareas, rango):
+        """Equivalente en memoria del rango de fechas sobre un listado ya cargado."""
+        return [t for t in tareas
+                if parsear_fecha(t["fecha"])
+                and rango[0] <= parsear_fecha(t["fecha"]) <= rango[1]]
+
+    def _rango_de_fecha(self, texto):
+        """Devuelve (desde, hasta) si el texto es dd/mm/aaaa o mm/aaaa."""
+        texto = (texto or "").strip()
+        if re.fullmatch(r"\d{1,2}/\d{1,2}/\d{4}", texto):
+            try:
+                dia = parsear_fecha(texto)
+            except ValueError:
+                return None
+            return dia, dia
+
+        coincidencia = re.fullmatch(r"(\d{1,2})/(\d{4})", texto)
+        if coincidencia:
+            mes, anio = int(coincidencia.group(1)), int(coincidencia.group(2))
+            if not 1 <= mes <= 12:
+                return None
+            inicio = date(anio, mes, 1)
+            siguiente = date(anio + mes // 12, mes % 12 + 1, 1)
+            return inicio, siguiente - timedelta(days=1)
+        return None
+
+    @medido
+    def filtrar_tareas_usuario(self, user_id, estado=None, orden="desc",
+                               desde=None, hasta=None):
+        consulta = select(*COLUMNAS_RESUMEN).where(Tarea.user_id == user_id)
+        if estado and estado.lower() != "todas":
+            if estado.lower() not in CODIGOS_ESTADO:
+                return []
+            consulta = consulta.where(Tarea.estado == estado.lower())
 
-    def marcar_completada(self, id_task):
+        consulta = self._ordenar_y_acotar(consulta, orden, desde, hasta)
         with self._session_scope() as session:
-            tarea = session.query(Tarea).filter_by(id=id_task).first()
-            if tarea:
-                tarea.estado = "completada" if tarea.estado == "pendiente" else "pendiente"
+            return self._registros(session, consulta)
 
-    def buscar_tareas(self, user_id, texto):
+    # ---------------------------------------------------------
+    # ESTADÍSTICAS
+    # ---------------------------------------------------------
+
+    @medido
+    def resumen_tareas(self, user_id):
+        """
+        Totales del usuario leídos de user_task_stats (mantenida por triggers)
+        con una búsqueda por clave primaria. Las vencidas dependen del día y
+        no se materializan: se cuentan en el tramo (pendiente, fecha < hoy)
+        del índice, que solo contiene las tareas vencidas.
+        Devuelve {"total", "pendientes", "completadas", "vencidas",
+        "por_prioridad": {prioridad: {estado: n}}}.
+        """
+        contadores = (select(ContadorTareas.prioridad, ContadorTareas.pendientes,
+                             ContadorTareas.completadas)
+                      .where(ContadorTareas.user_id == user_id))
+        vencidas = (select(func.count()).select_from(Tarea)
+                    .where(Tarea.user_id == user_id, Tarea.estado == "pendiente",
+                           Tarea.fecha < date.today()))
         with self._session_scope() as session:
-            tareas = session.query(Tarea).filter(
-                Tarea.user_id == user_id,
-                Tarea.titulo.like(f"%{texto}%")
-            ).all()
-            return [self._tarea_to_dict(t) for t in tareas]
+            filas = session.execute(contadores).all()
+            vencidas = session.execute(vencidas).scalar_one()
+
+        pendientes = sum(f.pendientes for f in filas)
+        completadas = sum(f.completadas for f in filas)
+        return {
+            "total": pendientes + completadas,
+            "pendientes": pendientes,
+            "completadas": completadas,
+            "vencidas": vencidas,
+            # 0 es la clave de las tareas sin prioridad
+            "por_prioridad": {
+                f.prioridad or None: {"pendiente": f.pendientes,
+                                      "completada": f.completadas}
+                for f in filas if f.pendientes or f.completadas},
+        }
+
+    @medido
+    def estadisticas_tareas(self, user_id, periodo="mes"):
+        """
+        Conteos de las tareas del usuario calculados por SQLite con GROUP BY:
+        no se lee ninguna tarea, solo una fila por combinación de estado,
+        prioridad y periodo de la fecha ("mes" o "semana").
+        Devuelve {"total", "pendientes", "completadas", "vencidas",
+        "por_prioridad": {prioridad: {estado: n}},
+        "por_periodo": {periodo: {estado: n}}}; las tareas sin fecha se
+        cuentan bajo "Sin fecha", al final de por_periodo.
+        """
+        formato = PERIODOS_ESTADISTICAS.get(periodo)
+        if formato is None:
+            raise ValueError(f"Periodo no soportado: {periodo}")
+        clave_periodo = func.strftime(formato, Tarea.fecha)
+        # Vencida: pendiente con fecha anterior a hoy
+        vencida = case((and_(Tarea.estado == "pendiente", Tarea.fecha < date.today()), 1),
+                       else_=0)
+        consulta = (select(Tarea.estado, Tarea.prioridad, clave_periodo,
+                           func.count(), func.sum(vencida))
+                    .where(Tarea.user_id == user_id)
+                    .group_by(Tarea.estado, Tarea.prioridad, clave_periodo))
 
-    def filtrar_tareas_usuario(self, user_id, estado=None):
+        resumen = {"total": 0, "pendientes": 0, "completadas": 0, "vencidas": 0,
+                   "por_prioridad": {}, "por_periodo": {}}
         with self._session_scope() as session:
-            query = session.query(Tarea).filter_by(user_id=user_id)
-            if estado and estado.lower() != "todas":
-                query = query.filter_by(estado=estado.lower())
+            grupos = session.execute(consulta).all()
+
+        por_estado, por_periodo = dict.fromkeys(ESTADOS, 0), {}
+        for estado, prioridad, clave, cantidad, vencidas in grupos:
+            resumen["total"] += cantidad
+            resumen["vencidas"] += vencidas
+            por_estado[estado] = por_estado.get(estado, 0) + cantidad
+            for destino, llave in ((resumen["por_prioridad"], prioridad),
+                                   (por_periodo, clave)):
+                conteo = destino.setdefault(llave, dict.fromkeys(ESTADOS, 0))
+                conteo[estado] = conteo.get(estado, 0) + cantidad
+
+        resumen["pendientes"] = por_estado["pendiente"]
+        resumen["completadas"] = por_estado["completada"]
+        # Periodos en orden cronológico y las tareas sin fecha al final
+        for clave in sorted(por_periodo, key=lambda c: (c is None, c or "")):
+            resumen["por_periodo"][clave or SIN_FECHA] = por_periodo[clave]
+        return resumen
+
+    # ---------------------------------------------------------
+    # OPERACIONES MASIVAS
+    # ---------------------------------------------------------
+
+    @medido
+    def agregar_tareas_usuario(self, user_id, tareas):
+        """
+        Inserta varias tareas en una sola transacción (un INSERT multi-fila).
+        `tareas` es una lista de dicts con titulo, descripcion y opcionalmente
+        fecha y prioridad. Devuelve la cantidad insertada (0 si falla).
+        """
+        try:
+            filas = [{
+                "titulo": t["titulo"],
+                "descripcion": t.get("descripcion"),
+                "fecha": parsear_fecha(t.get("fecha")),
+                "prioridad": t.get("prioridad") or "Media",
+                "estado": "pendiente",
+                "user_id": user_id
+            } for t in tareas]
+            if not filas:
+                return 0
 
-            return [self._tarea_to_dict(t) for t in query.all()]
+            with self._session_scope() as session:
+                session.execute(insert(Tarea), filas)
+            self._invalidar_usuario(user_id)
+            return len(filas)
+        except Exception as e:
+            print(f"Error al guardar tareas: {e}")
+            return 0
+
+    @medido
+    def marcar_completadas(self, user_id, ids, completada=True):
+        """
+        Marca (o desmarca) un conjunto de tareas del usuario con un UPDATE.
+        Devuelve la cantidad de filas afectadas.
+        """
+        estado = "completada" if completada else "pendiente"
+        return self._por_tramos_de_ids(
+            user_id, ids,
+            lambda tramo: update(Tarea)
+            .where(Tarea.user_id == user_id, Tarea.id.in_(tramo))
+            .values(estado=estado)
+        )
+
+    @medido
+    def eliminar_tareas(self, user_id, ids):
+        """Elimina un conjunto de tareas del usuario con un DELETE."""
+        return self._por_tramos_de_ids(
+            user_id, ids,
+            lambda tramo: delete(Tarea)
+            .where(Tarea.user_id == user_id, Tarea.id.in_(tramo))
+        )
+
+    @medido
+    def eliminar_completadas(self, user_id):
+        """Elimina todas las tareas completadas del usuario (usa el índice por estado)."""
+        with self._session_scope() as session:
+            afectadas = session.execute(
+                delete(Tarea).where(Tarea.user_id == user_id,
+                                    Tarea.estado == "completada"),
+                execution_options={"synchronize_session": False}
+            ).rowcount
+        self._invalidar_usuario(user_id)
+        return afectadas
+
+    def _por_tramos_de_ids(self, user_id, ids, sentencia):
+        """
+        Ejecuta la sentencia por tramos de ids en una sola transacción.
+        El filtro por user_id forma parte de la sentencia: los ids ajenos se ignoran.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return 0
+
+        afectadas = 0
+        with self._session_scope() as session:
+            for inicio in range(0, len(ids), MAX_IDS_POR_SENTENCIA):
+                tramo = ids[inicio:inicio + MAX_IDS_POR_SENTENCIA]
+                afectadas += session.execute(
+                    sentencia(tramo),
+                    execution_options={"synchronize_session": False}
+                ).rowcount
+        self._invalidar_usuario(user_id)
+        return afectadas
+
+    # ---------------------------------------------------------
+    # EXPORTACIÓN E IMPORTACIÓN (flujo continuo, memoria constante)
+    # ---------------------------------------------------------
+
+    @medido
+    def exportar_tareas(self, user_id, destino, formato="csv"):
+        """
+        Escribe las tareas del usuario en `destino` (archivo de texto abierto)
+        como CSV o JSONL, en orden de fecha. Las filas se leen por tandas con
+        yield_per, sin cargar el listado completo. Devuelve las filas escritas.
+        La fecha se escribe en ISO (aaaa-mm-dd) o vacía.
+        """
+        escribir = self._escritor_de_formato(destino, formato)
+        consulta = (select(*[Tarea.__table__.c[c] for c in COLUMNAS_EXPORTACION])
+                    .where(Tarea.user_id == user_id)
+                    .order_by(Tarea.fecha, Tarea.id)
+                    .execution_options(yield_per=TAMANO_TANDA_EXPORTACION))
+
+        escritas = 0
+        with self._session_scope() as session:
+            for fila in session.execute(consulta):
+                fila = fila._asdict()
+                fila["fecha"] = fila["fecha"].isoformat() if fila["fecha"] else ""
+                escribir(fila)
+                escritas += 1
+        return escritas
+
+    @medido
+    def importar_tareas(self, user_id, origen, formato="csv",
+                        tamano_lote=TAMANO_LOTE_IMPORTACION):
+        """
+        Lee tareas de `origen` (archivo de texto abierto, CSV con encabezado o
+        JSONL) fila a fila y las inserta con executemany en transacciones de
+        `tamano_lote` filas, liberando el bloqueo de escritura entre lotes.
+
+        Cada fila necesita 'titulo'; 'fecha' se valida (dd/mm/aaaa o ISO),
+        'estado' debe ser pendiente o completada y 'prioridad' Alta, Media o
+        Baja. Las filas inválidas se omiten y se informan con su número de línea.
+        Devuelve {"importadas", "rechazadas", "errores": [(linea, motivo)]}.
+        """
+        resultado = {"importadas": 0, "rechazadas": 0, "errores": []}
+        lote = []
+        for linea, datos in self._lector_de_formato(origen, formato):
+            try:
+                lote.append(self._fila_importada(user_id, datos))
+            except ValueError as e:
+                resultado["rechazadas"] += 1
+                if len(resultado["errores"]) < MAX_ERRORES_IMPORTACION:
+                    resultado["errores"].append((linea, str(e)))
+                continue
+
+            if len(lote) >= tamano_lote:
+                resultado["importadas"] += self._insertar_lote(lote)
+                lote = []
+        if lote:
+            resultado["importadas"] += self._insertar_lote(lote)
+
+        if resultado["importadas"]:
+            self._invalidar_usuario(user_id)
+        return resultado
+
+    def _insertar_lote(self, filas):
+        with self._session_scope() as session:
+            # executemany de Core: sin objetos ORM por fila
+            session.connection().execute(insert(Tarea.__table__), filas)
+        return len(filas)
+
+    def _fila_importada(self, user_id, datos):
+        if isinstance(datos, str):
+            datos = json.loads(datos)       # JSONDecodeError es un ValueError
+        if not isinstance(datos, dict):
+            raise ValueError("Se esperaba un objeto JSON por línea")
+        titulo = self._campo_texto(datos, "titulo")
+        if not titulo:
+            raise ValueError("Falta el título")
+        estado = self._campo_texto(datos, "estado", "pendiente").lower()
+        if estado not in CODIGOS_ESTADO:
+            raise ValueError(f"Estado no válido: {estado}")
+        prioridad = self._campo_texto(datos, "prioridad", "Media").capitalize()
+        if prioridad not in CODIGOS_PRIORIDAD:
+            raise ValueError(f"Prioridad no válida: {prioridad}")
+        return {
+            "titulo": titulo,
+            "descripcion": self._campo_texto(datos, "descripcion"),
+            "fecha": parsear_fecha(self._campo_texto(datos, "fecha", None)),
+            "prioridad": prioridad,
+            "estado": estado,
+            "user_id": user_id
+        }
+
+    def _campo_texto(self, datos, campo, defecto=""):
+        """
+        Valor de un campo importado como texto sin espacios en los extremos.
+        En JSONL puede llegar con otro tipo: los números se convierten y el
+        resto (listas, objetos, booleanos) rechaza la fila.
+        """
+        valor = datos.get(campo)
+        if valor is None or valor == "":
+            return defecto
+        if isinstance(valor, bool) or not isinstance(valor, (str, int, float)):
+            raise ValueError(f"Valor no válido en '{campo}': {valor!r}")
+        return str(valor).strip()
+
+    def _escritor_de_formato(self, destino, formato):
+        if formato == "csv":
+            escritor = csv.DictWriter(destino, fieldnames=COLUMNAS_EXPORTACION)
+            escritor.writeheader()
+            return escritor.writerow
+        if formato == "jsonl":
+            return lambda fila: destino.write(json.dumps(fila, ensure_ascii=False) + "\n")
+        raise ValueError(f"Formato no soportado: {formato}")
+
+    def _lector_de_formato(self, origen, formato):
+        """
+        Genera (número de línea, fila) sin leer el archivo completo. En CSV la
+        fila es un dict; en JSONL, el texto de la línea (se interpreta al
+        validarla para que un JSON roto se informe como cualquier otro error).
+        """
+        if formato == "csv":
+            lector = csv.DictReader(origen)
+            for datos in lector:
+                yield lector.line_num, datos
+        elif formato == "jsonl":
+            for linea, texto in enumerate(origen, start=1):
+                if texto.strip():
+                    yield linea, texto
+        else:
+            raise ValueError(f"Formato no soportado: {formato}")
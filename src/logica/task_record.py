@@ -0,0 +1,57 @@
+"""
+Fila de tarea de solo lectura que devuelven los listados de TaskManager.
+Se construye directamente desde una consulta de columnas, sin objetos ORM
+(identity map, estado de instancia) ni un dict intermedio por tarea.
+"""
+from typing import NamedTuple
+
+
+class TaskRecord(NamedTuple):
+    """
+    Tarea leída de la BD: una tupla inmutable que además se usa como el dict
+    de antes. t["titulo"], t.get("fecha"), "titulo" in t, keys(), values(),
+    items(), dict(t), dict(t, estado=...) y la comparación con un dict
+    funcionan igual. Dos diferencias: al iterarla se recorren los valores,
+    como en cualquier tupla, y json.dumps la escribe como lista; para
+    serializarla como objeto se usa dict(t).
+    """
+    id: int
+    titulo: str
+    descripcion: str    # None en los listados: se pide con obtener_tarea
+    fecha: str          # dd/mm/aaaa o "Sin fecha"
+    prioridad: str
+    estado: str
+
+    def __getitem__(self, clave):
+        if isinstance(clave, str):
+            return tuple.__getitem__(self, _POSICIONES[clave])
+        return tuple.__getitem__(self, clave)
+
+    def get(self, clave, defecto=None):
+        posicion = _POSICIONES.get(clave)
+        return defecto if posicion is None else tuple.__getitem__(self, posicion)
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def __contains__(self, clave):
+        return clave in _POSICIONES
+
+    def items(self):
+        return zip(self._fields, self)
+
+    def __eq__(self, otro):
+        if isinstance(otro, dict):
+            return self._asdict() == otro
+        return tuple.__eq__(self, otro)
+
+    def __ne__(self, otro):
+        return not self == otro
+
+    __hash__ = tuple.__hash__
+
+
+_POSICIONES = {campo: posicion for posicion, campo in enumerate(TaskRecord._fields)}
@@ -2,12 +2,112 @@
 Gestión de persistencia optimizada con SQLAlchemy.
 Define el esquema relacional, índices de búsqueda y validaciones de integridad.
 """
+import os
+from datetime import date, datetime
 from pathlib import Path
-from sqlalchemy import Column, Integer, String, ForeignKey, create_engine
-from sqlalchemy.orm import relationship, sessionmaker, declarative_base
+from sqlalchemy import (Column, Date, Float, ForeignKey, Index, Integer,
+                        SmallInteger, String, TypeDecorator, create_engine,
+                        event, make_url, text)
+from sqlalchemy.orm import (relationship, scoped_session, sessionmaker,
+                            declarative_base)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 
 Base = declarative_base()
 
+# Formato con el que la interfaz muestra y captura las fechas
+FORMATO_FECHA_UI = "%d/%m/%Y"
+# Formatos aceptados al convertir texto a fecha (UI e ISO)
+FORMATOS_FECHA = (FORMATO_FECHA_UI, "%Y-%m-%d")
+# Marcador histórico usado en lugar de una fecha vacía
+SIN_FECHA = "Sin fecha"
+
+# Código entero con que se guarda cada etiqueta de estado y prioridad. Las
+# prioridades crecen con la importancia: ORDER BY prioridad DESC pone primero
+# las de prioridad alta.
+CODIGOS_ESTADO = {"pendiente": 0, "completada": 1}
+CODIGOS_PRIORIDAD = {"Baja": 1, "Media": 2, "Alta": 3}
+
+
+def parsear_fecha(valor):
+    """
+    Convierte el valor recibido de la UI o de la BD a `datetime.date`.
+    Acepta None, cadenas vacías o "Sin fecha" (devuelve None), objetos
+    date/datetime y texto en formato dd/mm/aaaa o aaaa-mm-dd.
+    Lanza ValueError si el texto no corresponde a ninguna fecha válida.
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+
+    texto = str(valor).strip()
+    if not texto or texto == SIN_FECHA:
+        return None
+
+    # Atajo para los dos formatos canónicos: strptime es unas diez veces más
+    # lento y domina en importaciones masivas. Lo demás cae en strptime.
+    try:
+        if len(texto) == 10 and texto[4] == texto[7] == "-":
+            return date.fromisoformat(texto)
+        dia, mes, anio = texto.split("/")
+        if (len(dia) <= 2 and len(mes) <= 2 and len(anio) == 4
+                and (dia + mes + anio).isdigit()):
+            return date(int(anio), int(mes), int(dia))
+    except ValueError:
+        pass
+
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha no válida: {texto}")
+
+
+def formatear_fecha(valor):
+    """Representación de la fecha para la interfaz (dd/mm/aaaa o 'Sin fecha')."""
+    return valor.strftime(FORMATO_FECHA_UI) if valor else SIN_FECHA
+
+
+class Codificado(TypeDecorator):
+    """
+    Columna SMALLINT que la aplicación ve como etiquetas de texto. Filtros,
+    escrituras y lecturas (ORM o Core) traducen al enlazar parámetros y al
+    leer resultados; el SQL escrito a mano debe usar los códigos.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, codigos):
+        super().__init__()
+        # Tupla (y no dict) para que el tipo sirva en la clave de caché de SQL
+        self.codigos = tuple(codigos.items())
+        self._a_codigo = dict(self.codigos)
+        self._a_etiqueta = _Etiquetas(
+            (codigo, etiqueta) for etiqueta, codigo in self.codigos)
+
+    def process_bind_param(self, valor, dialect):
+        if valor is None or isinstance(valor, int):
+            return valor
+        try:
+            return self._a_codigo[valor]
+        except KeyError:
+            raise ValueError(f"Valor no válido: {valor}") from None
+
+    def result_processor(self, dialect, coltype):
+        # Búsqueda directa en el dict (en C) por cada valor leído, en lugar
+        # de una llamada a process_result_value: los listados leen miles
+        return self._a_etiqueta.__getitem__
+
+
+class _Etiquetas(dict):
+    """código -> etiqueta; los valores sin etiqueta (None) se devuelven tal cual."""
+
+    def __missing__(self, codigo):
+        return codigo
+
 
 class Usuario(Base):
     __tablename__ = 'usuarios'
@@ -30,48 +130,512 @@ class Tarea(Base):
     titulo = Column(String, nullable=False)
     descripcion = Column(String)
 
-    # 🔹 NOTA DE DISEÑO: Si tu interfaz lo permite, considera cambiar 'fecha'
-    # de String a sqlalchemy.Date o DateTime para poder ordenar y filtrar por fechas reales.
-    fecha = Column(String)
-    prioridad = Column(String, default="Media")
-    estado = Column(String, default='pendiente')
+    # DATE: Permite ordenar y filtrar por rangos directamente en SQL
+    fecha = Column(Date)
+    # SMALLINT: un byte por fila en la tabla y en los índices, y el orden
+    # numérico de la prioridad es el de su importancia
+    prioridad = Column(Codificado(CODIGOS_PRIORIDAD), default="Media")
+    estado = Column(Codificado(CODIGOS_ESTADO), default='pendiente')
 
     # RELACIÓN: Clave foránea vinculada al usuario
     user_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
     usuario = relationship("Usuario", back_populates="tareas")
 
+    __table_args__ = (
+        # INDEX: Listado y búsqueda de un usuario ordenados por fecha
+        # (también cubre la clave foránea user_id)
+        Index('ix_tasks_user_fecha', 'user_id', 'fecha'),
+        # INDEX: Filtro por estado de un usuario manteniendo el orden por fecha
+        Index('ix_tasks_user_estado_fecha', 'user_id', 'estado', 'fecha'),
+        # INDEX: Listado de un usuario por importancia y luego por fecha
+        Index('ix_tasks_user_prioridad_fecha', 'user_id', 'prioridad', 'fecha'),
+    )
+
+
+class Sesion(Base):
+    """Sesiones persistidas (opcional, ver AlmacenSesiones) para sobrevivir a reinicios."""
+    __tablename__ = 'sesiones'
+
+    # Huella SHA-256 del token; el token en sí nunca se guarda
+    huella = Column(String, primary_key=True)
+    # INDEX: Cerrar todas las sesiones de un usuario
+    user_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False, index=True)
+    # Vencimiento en segundos desde epoch (time.time())
+    vence = Column(Float, nullable=False)
+
+
+class ContadorTareas(Base):
+    """
+    Conteos materializados de tareas por usuario y prioridad. Los mantienen
+    los triggers de SENTENCIAS_CONTADORES; el resumen de un usuario es una
+    búsqueda por clave primaria en lugar de recorrer sus tareas.
+    """
+    __tablename__ = 'user_task_stats'
+
+    user_id = Column(Integer, ForeignKey('usuarios.id'), primary_key=True)
+    # 0 representa una tarea sin prioridad (NULL no sirve en la clave)
+    prioridad = Column(Codificado(CODIGOS_PRIORIDAD), primary_key=True)
+    pendientes = Column(Integer, nullable=False, default=0)
+    completadas = Column(Integer, nullable=False, default=0)
+
+
+# ---------------------------------------------------------
+# BÚSQUEDA DE TEXTO COMPLETO (SQLite FTS5)
+# ---------------------------------------------------------
+
+# Índice invertido externo sobre 'tasks': no duplica el texto, solo los términos.
+# 'rank' queda configurado con bm25 ponderando el título 10 veces más que la
+# descripción, así ORDER BY rank se resuelve dentro de FTS5 sin ordenar aparte.
+# user_id se indexa como un término más (peso 0 en bm25): la búsqueda lo pone
+# en el MATCH y FTS5 solo recorre y puntúa las filas del usuario, en vez de
+# todas las coincidencias de la tabla para filtrarlas después.
+SENTENCIAS_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "titulo, descripcion, user_id, content='tasks', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "INSERT INTO tasks_fts(tasks_fts, rank) VALUES('rank', 'bm25(10.0, 1.0, 0.0)')",
+    # TRIGGERS: Mantienen el índice sincronizado con cualquier escritura en 'tasks'
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, titulo, descripcion, user_id) "
+    "VALUES (new.id, new.titulo, new.descripcion, new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, titulo, descripcion, user_id) "
+    "VALUES ('delete', old.id, old.titulo, old.descripcion, old.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au "
+    "AFTER UPDATE OF titulo, descripcion, user_id ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, titulo, descripcion, user_id) "
+    "VALUES ('delete', old.id, old.titulo, old.descripcion, old.user_id); "
+    "INSERT INTO tasks_fts(rowid, titulo, descripcion, user_id) "
+    "VALUES (new.id, new.titulo, new.descripcion, new.user_id); END",
+    # Indexa las filas que ya existían antes de crear el índice
+    "INSERT INTO tasks_fts(tasks_fts) VALUES('rebuild')",
+)
+
+
+def instalar_busqueda_texto(connection):
+    """Crea la tabla FTS5, sus triggers y la puebla con las tareas existentes."""
+    for sentencia in SENTENCIAS_FTS:
+        connection.exec_driver_sql(sentencia)
+
+
+@event.listens_for(Tarea.__table__, "after_create")
+def _crear_busqueda_texto(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        instalar_busqueda_texto(connection)
+
+
+@event.listens_for(Tarea.__table__, "before_drop")
+def _eliminar_busqueda_texto(target, connection, **kw):
+    # Los triggers se eliminan junto con 'tasks'; la tabla virtual no.
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS tasks_fts")
+
+
+# ---------------------------------------------------------
+# CONTADORES POR USUARIO (user_task_stats)
+# ---------------------------------------------------------
+
+# Suma (o resta) una tarea a la fila (usuario, prioridad) de sus contadores.
+_SUMAR_TAREA = (
+    "INSERT INTO user_task_stats(user_id, prioridad, pendientes, completadas) "
+    "VALUES ({t}.user_id, coalesce({t}.prioridad, 0), "
+    f"{{signo}}({{t}}.estado = {CODIGOS_ESTADO['pendiente']}), "
+    f"{{signo}}({{t}}.estado = {CODIGOS_ESTADO['completada']})) "
+    "ON CONFLICT(user_id, prioridad) DO UPDATE SET "
+    "pendientes = pendientes + excluded.pendientes, "
+    "completadas = completadas + excluded.completadas;"
+)
+# Los triggers se crean sobre 'tasks' y se eliminan con ella
+SENTENCIAS_CONTADORES = (
+    "CREATE TRIGGER IF NOT EXISTS tasks_stats_ai AFTER INSERT ON tasks BEGIN "
+    + _SUMAR_TAREA.format(t="new", signo="") + " END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_stats_ad AFTER DELETE ON tasks BEGIN "
+    + _SUMAR_TAREA.format(t="old", signo="-") + " END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_stats_au "
+    "AFTER UPDATE OF estado, prioridad, user_id ON tasks BEGIN "
+    + _SUMAR_TAREA.format(t="old", signo="-")
+    + _SUMAR_TAREA.format(t="new", signo="") + " END",
+)
+
+# Conteos calculados desde 'tasks', para reconstruir y verificar la tabla
+_CONTEOS_REALES = (
+    "SELECT user_id, coalesce(prioridad, 0) AS prioridad, "
+    f"sum(estado = {CODIGOS_ESTADO['pendiente']}) AS pendientes, "
+    f"sum(estado = {CODIGOS_ESTADO['completada']}) AS completadas "
+    "FROM tasks GROUP BY user_id, coalesce(prioridad, 0)"
+)
+
+
+def instalar_contadores(connection):
+    """Crea los triggers de user_task_stats y la llena con las tareas existentes."""
+    _crear_triggers_contadores(connection)
+    reconstruir_contadores(connection)
+
+
+def _crear_triggers_contadores(connection):
+    for sentencia in SENTENCIAS_CONTADORES:
+        connection.exec_driver_sql(sentencia)
+
+
+@event.listens_for(Tarea.__table__, "after_create")
+def _crear_contadores(target, connection, **kw):
+    # La tabla de contadores puede crearse después: SQLite resuelve las
+    # tablas del cuerpo del trigger recién al ejecutarlo
+    if connection.dialect.name == "sqlite":
+        _crear_triggers_contadores(connection)
+
+
+def reconstruir_contadores(connection):
+    """Recalcula user_task_stats desde 'tasks'. Devuelve las filas escritas."""
+    connection.exec_driver_sql("DELETE FROM user_task_stats")
+    return connection.exec_driver_sql(
+        "INSERT INTO user_task_stats(user_id, prioridad, pendientes, completadas) "
+        + _CONTEOS_REALES).rowcount
+
+
+def verificar_contadores(connection):
+    """
+    Compara user_task_stats con los conteos reales de 'tasks'.
+    Devuelve una lista de diferencias {"user_id", "prioridad", "esperado",
+    "guardado"} con (pendientes, completadas); vacía si son consistentes.
+    Las filas guardadas en cero equivalen a no tener fila.
+    """
+    reales = {(u, p): (pe, co) for u, p, pe, co
+              in connection.exec_driver_sql(_CONTEOS_REALES)}
+    guardados = {(u, p): (pe, co) for u, p, pe, co in connection.exec_driver_sql(
+        "SELECT user_id, prioridad, pendientes, completadas FROM user_task_stats")}
+
+    diferencias = []
+    for clave in sorted(reales.keys() | guardados.keys()):
+        esperado = reales.get(clave, (0, 0))
+        guardado = guardados.get(clave, (0, 0))
+        if esperado != guardado:
+            diferencias.append({"user_id": clave[0], "prioridad": clave[1],
+                                "esperado": esperado, "guardado": guardado})
+    return diferencias
+
+
+# ---------------------------------------------------------
+# PERFILES DE RENDIMIENTO SQLITE
+# ---------------------------------------------------------
+
+# PRAGMAs aplicados a cada conexión nueva. Todos usan WAL (lectores y escritor
+# no se bloquean entre sí) y busy_timeout (espera el lock en lugar de fallar
+# con "database is locked"); cambian en cuánto se sincroniza con el disco:
+#   durable:     fsync en cada commit; ninguna transacción confirmada se pierde.
+#   equilibrado: fsync solo en los checkpoints de WAL; ante un corte de luz se
+#                pueden perder los últimos commits, pero la BD no se corrompe.
+#   rapido:      sin fsync; para pruebas, cargas masivas o datos desechables.
+PERFILES_SQLITE = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,          # KiB (negativo) -> 8 MB
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,         # ms
+    },
+    "equilibrado": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,
+        "mmap_size": 128 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "rapido": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+PERFIL_POR_DEFECTO = "equilibrado"
+
+
+def resolver_perfil(perfil=None):
+    """Perfil explícito, o el de la variable DB_PERFIL, o el por defecto."""
+    return perfil or os.environ.get("DB_PERFIL", PERFIL_POR_DEFECTO)
+
+
+def aplicar_perfil_sqlite(engine, perfil):
+    """
+    Registra un listener 'connect' que ejecuta los PRAGMAs del perfil en cada
+    conexión que abra el pool. No hace nada si el motor no es SQLite.
+    """
+    if perfil not in PERFILES_SQLITE:
+        raise ValueError(f"Perfil de base de datos desconocido: {perfil}")
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = PERFILES_SQLITE[perfil]
+
+    @event.listens_for(engine, "connect")
+    def _configurar_conexion(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nombre, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nombre} = {valor}")
+        finally:
+            cursor.close()
+
+
+# ---------------------------------------------------------
+# POOL DE CONEXIONES
+# ---------------------------------------------------------
+
+# Valores por defecto del pool; se pueden ajustar con DB_POOL_SIZE,
+# DB_MAX_OVERFLOW y DB_POOL_TIMEOUT o con los argumentos de Database.
+POOL_SIZE = 10
+MAX_OVERFLOW = 20
+POOL_TIMEOUT = 30
+
+
+def opciones_pool(db_url, pool_size=None, max_overflow=None, pool_timeout=None,
+                  asincrono=False):
+    """
+    Elige la estrategia de pool según el motor:
+      - SQLite en memoria: StaticPool, una única conexión compartida entre
+        hilos (cada conexión nueva sería otra base de datos vacía).
+      - SQLite en archivo y otros motores: QueuePool acotado. Las conexiones
+        SQLite se comparten entre hilos del pool (check_same_thread=False);
+        nunca las usan dos hilos a la vez porque cada sesión toma la suya.
+    Con `asincrono=True` devuelve las mismas opciones para create_async_engine:
+    AsyncAdaptedQueuePool en lugar de QueuePool y sin check_same_thread
+    (aiosqlite ya usa cada conexión desde su propio hilo).
+    """
+    url = make_url(db_url)
+    es_sqlite = url.get_backend_name() == "sqlite"
+    connect_args = {} if asincrono else {"check_same_thread": False}
+    if es_sqlite and url.database in (None, "", ":memory:"):
+        return {"poolclass": StaticPool, "connect_args": connect_args}
+
+    if max_overflow is None:
+        max_overflow = int(os.environ.get("DB_MAX_OVERFLOW", MAX_OVERFLOW))
+    opciones = {
+        "poolclass": AsyncAdaptedQueuePool if asincrono else QueuePool,
+        "pool_size": pool_size or int(os.environ.get("DB_POOL_SIZE", POOL_SIZE)),
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout or int(os.environ.get("DB_POOL_TIMEOUT", POOL_TIMEOUT)),
+    }
+    if es_sqlite:
+        opciones["connect_args"] = connect_args
+    else:
+        # Los servidores remotos cierran conexiones inactivas
+        opciones["pool_pre_ping"] = True
+    return opciones
+
+
+def url_por_defecto():
+    """URL de DB.sqlite en la raíz del proyecto."""
+    # Reemplaza los múltiples os.path.dirname con pathlib (más limpio)
+    base_dir = Path(__file__).resolve().parent.parent.parent
+    db_path = base_dir / 'DB.sqlite'
+    return f"sqlite:///{db_path}"
+
 
 class Database:
     """
     Configura la conexión ORM y la creación automática de tablas.
     """
 
-    def __init__(self, db_url=None):
+    def __init__(self, db_url=None, perfil=None, pool_size=None,
+                 max_overflow=None, pool_timeout=None):
         """
         Permite inyectar una URL de base de datos (útil para testing).
         Si no se provee, calcula la ruta por defecto a DB.sqlite.
+        El perfil de rendimiento se toma del argumento, de la variable de
+        entorno DB_PERFIL o, en su defecto, PERFIL_POR_DEFECTO.
+        El tamaño del pool se configura igual (ver opciones_pool).
         """
         if not db_url:
-            # Reemplaza los múltiples os.path.dirname con pathlib (más limpio)
-            base_dir = Path(__file__).resolve().parent.parent.parent
-            db_path = base_dir / 'DB.sqlite'
-            db_url = f"sqlite:///{db_path}"
+            db_url = url_por_defecto()
+
+        self.perfil = resolver_perfil(perfil)
 
         # Configuración del motor SQLAlchemy
-        self.engine = create_engine(db_url)
-        self.Session = sessionmaker(bind=self.engine)
+        self.engine = create_engine(db_url, **opciones_pool(
+            db_url, pool_size, max_overflow, pool_timeout))
+        aplicar_perfil_sqlite(self.engine, self.perfil)
+        # SESIONES POR HILO: Flet atiende a cada página en hilos distintos
+        self.Session = scoped_session(sessionmaker(bind=self.engine))
 
     def inicializar_db(self):
         """
         Ejecución automática verificada: Crea tablas, relaciones e índices.
         """
         try:
-            Base.metadata.create_all(self.engine)
+            with self.engine.begin() as conn:
+                inicializar_esquema(conn)
             print("Base de datos y tablas inicializadas con SQLAlchemy.")
         except Exception as e:
             print(f"Error al inicializar la base de datos: {e}")
 
+    def crear_indices_faltantes(self):
+        with self.engine.begin() as conn:
+            crear_indices_faltantes(conn)
+
+    def crear_busqueda_texto(self):
+        with self.engine.begin() as conn:
+            crear_busqueda_texto(conn)
+
+    def migrar_fechas(self):
+        with self.engine.begin() as conn:
+            return migrar_fechas(conn)
+
+    def verificar_contadores(self):
+        with self.engine.connect() as conn:
+            return verificar_contadores(conn)
+
+    def reconstruir_contadores(self):
+        with self.engine.begin() as conn:
+            return reconstruir_contadores(conn)
+
+
+# ---------------------------------------------------------
+# CREACIÓN Y MIGRACIÓN DEL ESQUEMA
+# ---------------------------------------------------------
+# Reciben una conexión síncrona para poder ejecutarse tanto desde Database
+# como desde un motor asíncrono (AsyncConnection.run_sync).
+
+def inicializar_esquema(conn):
+    """Crea tablas e índices y aplica las migraciones pendientes."""
+    Base.metadata.create_all(conn)
+    crear_indices_faltantes(conn)
+    crear_busqueda_texto(conn)
+    crear_contadores(conn)
+    migrar_fechas(conn)
+    migrar_codigos(conn)
+
+
+def crear_indices_faltantes(conn):
+    """
+    create_all no agrega índices a tablas que ya existían; este paso
+    crea los índices declarados en el modelo que falten en un DB.sqlite previo.
+    """
+    for tabla in Base.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            indice.create(conn, checkfirst=True)
+
+
+def crear_busqueda_texto(conn):
+    """
+    Instala el índice FTS5 en bases creadas antes de que existiera
+    (create_all no dispara 'after_create' sobre tablas existentes). Un índice
+    de una versión previa, sin la columna user_id, se reemplaza junto con
+    sus triggers.
+    """
+    definicion = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE name = 'tasks_fts'"
+    )).scalar()
+    if definicion and "user_id" in definicion:
+        return
+    if definicion:
+        for sufijo in ("ai", "ad", "au"):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS tasks_fts_{sufijo}")
+        conn.exec_driver_sql("DROP TABLE tasks_fts")
+    instalar_busqueda_texto(conn)
+
+
+def crear_contadores(conn):
+    """
+    Instala los triggers de user_task_stats (y la llena) en bases creadas
+    antes de que existieran.
+    """
+    existe = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE name = 'tasks_stats_ai'"
+    )).first()
+    if not existe:
+        instalar_contadores(conn)
+
+
+def migrar_fechas(conn):
+    """
+    Migra las fechas guardadas como texto 'dd/mm/aaaa' (esquema anterior)
+    al formato ISO que usa la columna Date. Los valores no convertibles,
+    como el marcador 'Sin fecha', quedan en NULL.
+    Devuelve la cantidad de filas actualizadas.
+    """
+    filas = conn.execute(text(
+        "SELECT id, fecha FROM tasks "
+        "WHERE fecha IS NOT NULL AND fecha NOT GLOB "
+        "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+    )).fetchall()
+
+    for id_task, fecha in filas:
+        try:
+            nueva = parsear_fecha(fecha)
+        except ValueError:
+            nueva = None
+        conn.execute(
+            text("UPDATE tasks SET fecha = :fecha WHERE id = :id"),
+            {"fecha": nueva.isoformat() if nueva else None, "id": id_task}
+        )
+    return len(filas)
+
+
+def migrar_codigos(conn):
+    """
+    Convierte estado y prioridad guardados como texto (esquema anterior) a
+    sus códigos enteros. SQLite no cambia el tipo de una columna, así que
+    'tasks' se reconstruye: se renombra, se crea de nuevo (con sus índices,
+    el índice FTS5 y los triggers) y se copian las filas traduciendo las
+    etiquetas; las desconocidas pasan a 'pendiente' y 'Media'. Los contadores
+    se recalculan al final. Devuelve la cantidad de tareas migradas.
+    """
+    columnas = {fila[1]: fila[2] for fila in
+                conn.exec_driver_sql("PRAGMA table_info(tasks)")}
+    if columnas.get("estado", "").upper() == "SMALLINT":
+        return 0
+
+    # Triggers e índices se van con la tabla renombrada pero conservan su
+    # nombre: se eliminan para poder crearlos sobre la tabla nueva
+    for tipo, nombre in conn.exec_driver_sql(
+            "SELECT type, name FROM sqlite_master WHERE tbl_name = 'tasks' "
+            "AND type IN ('trigger', 'index') AND sql IS NOT NULL").fetchall():
+        conn.exec_driver_sql(f"DROP {tipo.upper()} {nombre}")
+    conn.exec_driver_sql("ALTER TABLE tasks RENAME TO tasks_texto")
+    Tarea.__table__.create(conn)
+
+    def traducir(columna, codigos, defecto):
+        casos = " ".join(f"WHEN '{etiqueta}' THEN {codigo}"
+                         for etiqueta, codigo in codigos.items())
+        return f"CASE {columna} {casos} ELSE {codigos[defecto]} END"
+
+    migradas = conn.exec_driver_sql(
+        "INSERT INTO tasks (id, titulo, descripcion, fecha, prioridad, estado, user_id) "
+        "SELECT id, titulo, descripcion, fecha, "
+        f"{traducir('prioridad', CODIGOS_PRIORIDAD, 'Media')}, "
+        f"{traducir('estado', CODIGOS_ESTADO, 'pendiente')}, user_id "
+        "FROM tasks_texto").rowcount
+    conn.exec_driver_sql("DROP TABLE tasks_texto")
+
+    # Los contadores de una versión previa pueden tener la prioridad en texto
+    ContadorTareas.__table__.drop(conn, checkfirst=True)
+    ContadorTareas.__table__.create(conn)
+    reconstruir_contadores(conn)
+    return migradas
+
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inicializa y mantiene DB.sqlite")
+    parser.add_argument("--verificar-contadores", action="store_true",
+                        help="compara user_task_stats con las tareas")
+    parser.add_argument("--reconstruir-contadores", action="store_true",
+                        help="recalcula user_task_stats desde las tareas")
+    args = parser.parse_args()
+
     db = Database()
     db.inicializar_db()
+    if args.verificar_contadores:
+        diferencias = db.verificar_contadores()
+        for d in diferencias:
+            print(f"Usuario {d['user_id']} prioridad '{d['prioridad']}': "
+                  f"esperado {d['esperado']}, guardado {d['guardado']}")
+        print(f"{len(diferencias)} diferencia(s) en los contadores.")
+    if args.reconstruir_contadores:
+        print(f"Contadores reconstruidos: {db.reconstruir_contadores()} fila(s).")
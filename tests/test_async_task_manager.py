@@ -0,0 +1,217 @@
+"""
+Pruebas unitarias de AsyncTaskManager (SQLAlchemy asyncio + aiosqlite).
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from src.logica.async_task_manager import AsyncTaskManager
+from src.logica.cache_tareas import CacheTareas
+
+
+class TestAsyncTaskManager(unittest.IsolatedAsyncioTestCase):
+    """
+    Valida que la API asíncrona se comporte igual que la síncrona.
+    """
+
+    async def asyncSetUp(self):
+        """
+        Base de datos física temporal recreada en cada prueba.
+        """
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        self.url = "sqlite:///" + os.path.join(self.carpeta.name, "async.db")
+        self.manager = AsyncTaskManager(self.url, cache=CacheTareas())
+        await self.manager.inicializar_db()
+
+        await self.manager.registrar_usuario("async@test.com", "clave", "Async")
+        self.user = await self.manager.login("async@test.com", "clave")
+
+    async def asyncTearDown(self):
+        await self.manager.cerrar()
+
+    async def test_crud_asincrono(self):
+        """
+        Alta, listado, búsqueda, toggle, edición y borrado esperando cada llamada.
+        """
+        uid = self.user["id"]
+        self.assertTrue(await self.manager.agregar_tarea_usuario(
+            uid, "Leer novela", "Capítulo 1", "01/02/2025"))
+
+        tareas = await self.manager.listar_tareas_usuario(uid)
+        self.assertEqual(len(tareas), 1)
+        id_task = tareas[0]["id"]
+
+        self.assertEqual(len(await self.manager.buscar_tareas(uid, "nove")), 1)
+        self.assertEqual(await self.manager.marcar_completada(id_task, user_id=uid), 1)
+        self.assertEqual(await self.manager.editar_tarea(
+            id_task, "Leer ensayo", "Cap 2", None, "Alta", user_id=uid), 1)
+
+        tarea = (await self.manager.listar_tareas_usuario(uid))[0]
+        self.assertEqual((tarea["titulo"], tarea["estado"], tarea["fecha"]),
+                         ("Leer ensayo", "completada", "Sin fecha"))
+
+        self.assertEqual(await self.manager.eliminar_tarea(id_task, user_id=uid), 1)
+        pagina = await self.manager.listar_tareas_pagina(uid)
+        self.assertEqual(pagina, {"tareas": [], "siguiente": None})
+
+    async def test_cache_compartida_entre_paginas(self):
+        """
+        Dos páginas (managers) con la misma caché: una edición en una invalida
+        el detalle y el listado que la otra ya tenía en memoria.
+        """
+        uid = self.user["id"]
+        await self.manager.agregar_tarea_usuario(uid, "Leer", "Antes", None)
+        id_task = (await self.manager.listar_tareas_usuario(uid))[0]["id"]
+        otra = AsyncTaskManager(self.url, cache=self.manager.cache)
+        try:
+            self.assertEqual((await otra.obtener_tarea(id_task, user_id=uid))["descripcion"],
+                             "Antes")
+            await self.manager.editar_tarea(id_task, "Leer", "Después", None, "Media",
+                                            user_id=uid)
+            self.assertEqual((await otra.obtener_tarea(id_task, user_id=uid))["descripcion"],
+                             "Después")
+        finally:
+            await otra.cerrar()
+
+    async def test_sesiones_compartidas_entre_paginas(self):
+        """
+        Con el mismo almacén, el token emitido en una página se resuelve en
+        otra (p. ej. una pestaña nueva) desde memoria.
+        """
+        token = (await self.manager.iniciar_sesion("async@test.com", "clave"))["token"]
+        otra = AsyncTaskManager(self.url, sesiones=self.manager.sesiones)
+        try:
+            aciertos = self.manager.sesiones.aciertos
+            self.assertEqual((await otra.resolver_sesion(token))["id"], self.user["id"])
+            self.assertEqual(self.manager.sesiones.aciertos, aciertos + 1)
+        finally:
+            await otra.cerrar()
+
+    async def test_opciones_de_pool(self):
+        """
+        El motor asíncrono usa el mismo dimensionado del pool que Database:
+        con el pool agotado, una llamada espera pool_timeout y falla.
+        """
+        with mock.patch.dict(os.environ, {"DB_POOL_SIZE": "3"}):
+            por_entorno = AsyncTaskManager(self.url)
+        self.assertEqual(por_entorno.engine.pool.size(), 3)
+        await por_entorno.cerrar()
+
+        acotado = AsyncTaskManager(self.url, pool_size=1, max_overflow=0,
+                                   pool_timeout=0.2)
+        try:
+            self.assertIsInstance(acotado.engine.pool, AsyncAdaptedQueuePool)
+            async with acotado.engine.connect():
+                with self.assertRaises(exc.TimeoutError):
+                    await acotado.listar_tareas_usuario(self.user["id"])
+            self.assertEqual(await acotado.listar_tareas_usuario(self.user["id"]), [])
+        finally:
+            await acotado.cerrar()
+
+    async def test_errores_de_login(self):
+        """
+        Los ValueError de autenticación llegan intactos al llamador.
+        """
+        with self.assertRaises(ValueError):
+            await self.manager.login("async@test.com", "mala")
+
+    async def test_rehash_en_login(self):
+        """
+        El login asíncrono acepta un hash SHA-256 antiguo y lo reemplaza.
+        """
+        heredado = hashlib.sha256(b"vieja").hexdigest()
+        await self.manager._ejecutar("_crear_usuario", "viejo@test.com", heredado, "Viejo")
+
+        usuario = await self.manager.login("viejo@test.com", "vieja")
+        self.assertEqual(usuario["nombre"], "Viejo")
+        credenciales = await self.manager._ejecutar("_credenciales", "viejo@test.com")
+        self.assertTrue(credenciales["password"].startswith("scrypt$"))
+
+    async def test_llamadas_concurrentes(self):
+        """
+        Varias corrutinas pueden escribir y leer en paralelo sobre el mismo manager.
+        """
+        uid = self.user["id"]
+        resultados = await asyncio.gather(*[
+            self.manager.agregar_tarea_usuario(uid, f"T{i}", "D") for i in range(20)
+        ])
+        self.assertTrue(all(resultados))
+        self.assertEqual(len(await self.manager.listar_tareas_usuario(uid)), 20)
+
+    async def test_importar_en_varios_lotes(self):
+        """
+        La importación confirma cada lote por separado y el listado cacheado
+        refleja las tareas nuevas.
+        """
+        uid = self.user["id"]
+        self.assertEqual(await self.manager.listar_tareas_usuario(uid), [])
+        origen = io.StringIO("titulo\n" + "".join(f"T{i}\n" for i in range(25)))
+        resultado = await self.manager.importar_tareas(uid, origen, tamano_lote=10)
+        self.assertEqual(resultado["importadas"], 25)
+        self.assertEqual(len(await self.manager.listar_tareas_usuario(uid)), 25)
+
+        destino = io.StringIO()
+        self.assertEqual(await self.manager.exportar_tareas(uid, destino), 25)
+
+    async def test_archivos_fuera_del_bucle(self):
+        """
+        Exportar e importar con archivos reales: la E/S no ocurre en el hilo
+        del bucle de eventos.
+        """
+        uid = self.user["id"]
+        await self.manager.agregar_tareas_usuario(
+            uid, [{"titulo": f"T{i}"} for i in range(5)])
+        hilos = set()
+
+        class Registrado(io.TextIOWrapper):
+            def write(self, texto):
+                hilos.add(threading.get_ident())
+                return super().write(texto)
+
+        ruta = os.path.join(self.carpeta.name, "tareas.csv")
+        with Registrado(open(ruta, "wb"), encoding="utf-8", newline="") as destino:
+            self.assertEqual(await self.manager.exportar_tareas(uid, destino), 5)
+        self.assertTrue(hilos)
+        self.assertNotIn(threading.get_ident(), hilos)
+
+        with open(ruta, encoding="utf-8", newline="") as origen:
+            resultado = await self.manager.importar_tareas(uid, origen)
+        self.assertEqual(resultado["importadas"], 5)
+        self.assertEqual(len(await self.manager.listar_tareas_usuario(uid)), 10)
+
+    async def test_escritura_agrupada(self):
+        """
+        Con el escritor agrupado las escrituras concurrentes comparten commits
+        y las lecturas posteriores las ven, también las de usuarios distintos
+        (páginas distintas del mismo proceso).
+        """
+        manager = AsyncTaskManager(self.url,
+                                   cache=CacheTareas(), escritura_agrupada=True,
+                                   ventana=0.05)
+        try:
+            uids = [self.user["id"]]
+            for i in range(3):
+                await manager.registrar_usuario(f"pagina{i}@test.com", "clave", "P")
+                uids.append((await manager.login(f"pagina{i}@test.com", "clave"))["id"])
+            resultados = await asyncio.gather(*[
+                manager.agregar_tarea_usuario(uid, f"T{i}", "D")
+                for uid in uids for i in range(5)
+            ])
+            self.assertTrue(all(resultados))
+            self.assertLess(manager.escritor.lotes, 20)
+            for uid in uids:
+                self.assertEqual(len(await manager.listar_tareas_usuario(uid)), 5)
+        finally:
+            await manager.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Pruebas de humo de los benchmarks: que sigan funcionando con datos mínimos,
+que la comparación con la línea base detecte regresiones y que el generador
+de carga clasifique los errores.
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from sqlalchemy import event
+from benchmarks import carga
+from benchmarks.bench_task_manager import NO_MEDIDOS, comparar, ejecutar, percentil
+from src.logica.async_task_manager import AsyncTaskManager
+from src.logica.task_manager import TaskManager
+from src.modelo.modelo import Database
+
+
+class TestBenchmarkTaskManager(unittest.TestCase):
+    """
+    Microbenchmark por operación: cobertura de la API, percentiles y comparación.
+    """
+
+    def test_ejecucion_minima(self):
+        """
+        Todas las operaciones se miden y reportan sus percentiles.
+        """
+        informe = ejecutar(usuarios=3, tareas_por_usuario=5, repeticiones=3)
+        self.assertEqual(informe["meta"]["usuarios"], 3)
+        self.assertIn("buscar_tareas[texto]", informe["resultados"])
+        medidos = {nombre.split("[")[0] for nombre in informe["resultados"]}
+        publicos = {nombre for nombre in dir(TaskManager)
+                    if not nombre.startswith("_") and nombre not in NO_MEDIDOS}
+        self.assertEqual(publicos - medidos, set())
+        for nombre, r in informe["resultados"].items():
+            with self.subTest(metodo=nombre):
+                self.assertEqual(r["n"], 3)
+                self.assertLessEqual(r["p50_ms"], r["p95_ms"])
+                self.assertLessEqual(r["p95_ms"], r["p99_ms"])
+
+    def test_percentil(self):
+        valores = list(range(1, 101))
+        self.assertEqual(percentil(valores, 50), 50)
+        self.assertEqual(percentil(valores, 99), 99)
+        self.assertEqual(percentil([7], 95), 7)
+
+    def test_comparar_con_base(self):
+        """
+        Solo se informan las métricas que empeoran más que la tolerancia.
+        """
+        base = {"resultados": {"login": {"p50_ms": 1.0, "p95_ms": 2.0}}}
+        actual = {"resultados": {
+            "login": {"p50_ms": 1.1, "p95_ms": 3.0},
+            "nuevo": {"p50_ms": 9.0, "p95_ms": 9.0},
+        }}
+        self.assertEqual(comparar(actual, base, tolerancia=0.25),
+                         [("login", "p95_ms", 2.0, 3.0)])
+
+
+class TestGeneradorCarga(unittest.TestCase):
+    """
+    Generador de carga concurrente en modo hilos y async.
+    """
+
+    def test_niveles_de_concurrencia(self):
+        """
+        Cada nivel reporta throughput, percentiles y errores, en ambos modos.
+        """
+        for modo in ("hilos", "async"):
+            with self.subTest(modo=modo):
+                resultados = carga.ejecutar([1, 4], duracion=0.3, modo=modo)
+                self.assertEqual([r["concurrencia"] for r in resultados], [1, 4])
+                for r in resultados:
+                    self.assertGreater(r["operaciones"], 0)
+                    self.assertEqual(r["otros_errores"], 0)
+                    self.assertIn("buscar_tareas", r["por_operacion"])
+
+    def test_clasificacion_de_errores(self):
+        registro = carga.Registro()
+        registro.anotar("login", 0.001)
+        registro.anotar("marcar_completada", 0.0,
+                        sqlite3.OperationalError("database is locked"))
+        registro.anotar("login", 0.0, ValueError("Contraseña incorrecta."))
+
+        resumen = registro.resumen(concurrencia=1, duracion=1.0)
+        self.assertEqual((resumen["operaciones"], resumen["errores_bloqueo"],
+                          resumen["otros_errores"]), (1, 1, 1))
+
+    def test_bloqueo_en_escritura_que_devuelve_false(self):
+        """
+        agregar_tarea_usuario devuelve False ante un bloqueo: el error anotado
+        es la excepción original de SQLite, en ambos modos.
+        """
+        def sin_espera(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA busy_timeout = 0")
+            cursor.close()
+
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "bloqueo.sqlite")
+            db = Database(f"sqlite:///{ruta}")
+            db.inicializar_db()
+            db.engine.dispose()
+            event.listen(db.engine, "connect", sin_espera)
+            carga.escuchar_errores(db.engine)
+            asincrono = AsyncTaskManager(f"sqlite:///{ruta}")
+            event.listen(asincrono.engine.sync_engine, "connect", sin_espera)
+            carga.escuchar_errores(asincrono.engine.sync_engine)
+
+            async def agregar_async():
+                carga._error_bd.set(None)
+                return carga._error(
+                    "agregar_tarea_usuario",
+                    await asincrono.agregar_tarea_usuario(1, "T", "D"))
+
+            bloqueo = sqlite3.connect(ruta)
+            bloqueo.execute("BEGIN IMMEDIATE")
+            try:
+                errores = {
+                    "hilos": carga._error("agregar_tarea_usuario",
+                                          TaskManager(db_instance=db)
+                                          .agregar_tarea_usuario(1, "T", "D")),
+                    "async": asyncio.run(agregar_async()),
+                }
+            finally:
+                bloqueo.rollback()
+                bloqueo.close()
+                asyncio.run(asincrono.cerrar())
+                db.engine.dispose()
+
+        for modo, error in errores.items():
+            with self.subTest(modo=modo):
+                self.assertTrue(carga.es_error_de_bloqueo(error), error)
+
+
+if __name__ == "__main__":
+    unittest.main()
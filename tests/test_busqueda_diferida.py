@@ -0,0 +1,127 @@
+"""
+Pruebas unitarias del canal de búsqueda con espera (debounce).
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from src.logica.busqueda_diferida import BusquedaDiferida, BusquedaDiferidaAsync
+
+
+class TestBusquedaDiferida(unittest.TestCase):
+    """
+    Valida el agrupamiento de teclas y el descarte de resultados viejos.
+    """
+
+    def setUp(self):
+        self.consultas = []
+        self.entregas = []
+        self.entregado = threading.Event()
+
+    def _buscar(self, texto):
+        self.consultas.append(texto)
+        return texto.upper()
+
+    def _entregar(self, texto, resultado):
+        self.entregas.append((texto, resultado))
+        self.entregado.set()
+
+    def test_rafaga_de_teclas_hace_una_sola_consulta(self):
+        """
+        Solo la última solicitud de una ráfaga llega a consultarse.
+        """
+        busqueda = BusquedaDiferida(self._buscar, self._entregar, espera=0.05)
+        for texto in ["p", "py", "pyt", "pyth"]:
+            busqueda.solicitar(texto)
+
+        self.assertTrue(self.entregado.wait(2))
+        time.sleep(0.1)
+        self.assertEqual(self.consultas, ["pyth"])
+        self.assertEqual(self.entregas, [("pyth", "PYTH")])
+
+    def test_resultado_superado_se_descarta(self):
+        """
+        Si llega otra solicitud mientras se consulta, el resultado viejo no se pinta.
+        """
+        liberar = threading.Event()
+
+        def buscar_lento(texto):
+            if texto == "lento":
+                liberar.wait(2)
+            return texto
+
+        busqueda = BusquedaDiferida(buscar_lento, self._entregar, espera=0)
+        hilo = threading.Thread(target=busqueda.ejecutar_ahora, args=("lento",))
+        hilo.start()
+        time.sleep(0.05)
+
+        busqueda.ejecutar_ahora("rapido")
+        liberar.set()
+        hilo.join(2)
+
+        self.assertEqual(self.entregas, [("rapido", "rapido")])
+
+    def test_ejecutar_ahora_anula_la_pendiente(self):
+        """
+        Una recarga inmediata cancela la búsqueda programada.
+        """
+        busqueda = BusquedaDiferida(self._buscar, self._entregar, espera=0.05)
+        busqueda.solicitar("viejo")
+        busqueda.ejecutar_ahora("")
+        time.sleep(0.15)
+
+        self.assertEqual(self.consultas, [""])
+
+
+
+class TestBusquedaDiferidaAsync(unittest.IsolatedAsyncioTestCase):
+    """
+    Mismos escenarios para la variante asyncio usada por la interfaz.
+    """
+
+    async def asyncSetUp(self):
+        self.consultas = []
+        self.entregas = []
+
+    async def _buscar(self, texto):
+        self.consultas.append(texto)
+        return texto.upper()
+
+    def _entregar(self, texto, resultado):
+        self.entregas.append((texto, resultado))
+
+    async def test_rafaga_de_teclas_hace_una_sola_consulta(self):
+        """
+        Las esperas previas se cancelan; solo se consulta la última.
+        """
+        busqueda = BusquedaDiferidaAsync(self._buscar, self._entregar, espera=0.05)
+        tareas = [busqueda.solicitar(t) for t in ["p", "py", "pyt"]]
+        await asyncio.gather(*tareas)
+
+        self.assertEqual(self.consultas, ["pyt"])
+        self.assertEqual(self.entregas, [("pyt", "PYT")])
+
+    async def test_resultado_superado_se_descarta(self):
+        """
+        Una consulta en vuelo no se interrumpe, pero su resultado viejo no se pinta.
+        """
+        liberar = asyncio.Event()
+
+        async def buscar_lento(texto):
+            if texto == "lento":
+                await liberar.wait()
+            return texto
+
+        busqueda = BusquedaDiferidaAsync(buscar_lento, self._entregar, espera=0)
+        lenta = asyncio.ensure_future(busqueda.ejecutar_ahora("lento"))
+        await asyncio.sleep(0.01)
+
+        await busqueda.ejecutar_ahora("rapido")
+        liberar.set()
+        self.assertFalse(await lenta)
+        self.assertEqual(self.entregas, [("rapido", "rapido")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,203 @@
+"""
+Pruebas unitarias de la caché de listados por usuario y su invalidación.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.logica.task_manager import TaskManager
+from src.logica.cache_tareas import CacheTareas
+
+
+class TestCacheTareas(unittest.TestCase):
+    """
+    Valida aciertos, fallos, invalidación precisa y desalojo LRU.
+    """
+
+    def setUp(self):
+        """
+        Base de datos temporal y manager con caché habilitada.
+        """
+        from src.modelo.modelo import Database, Base
+
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        self.url = "sqlite:///" + os.path.join(self.carpeta.name, "cache.db")
+        test_db = Database(self.url)
+        self.test_engine = create_engine(self.url)
+
+        test_db.engine = self.test_engine
+        test_db.Session = sessionmaker(bind=self.test_engine)
+
+        Base.metadata.drop_all(self.test_engine)
+        Base.metadata.create_all(self.test_engine)
+
+        self.cache = CacheTareas(max_tareas=3)
+        self.manager = TaskManager(db_instance=test_db, cache=self.cache)
+
+        self.manager.registrar_usuario("cache@test.com", "clave", "Cache")
+        self.manager.registrar_usuario("otro@test.com", "clave", "Otro")
+        self.uid = self.manager.login("cache@test.com", "clave")["id"]
+        self.otro = self.manager.login("otro@test.com", "clave")["id"]
+
+    def tearDown(self):
+        self.manager.db.engine.dispose()
+
+    def test_lectura_repetida_no_consulta_bd(self):
+        """
+        La segunda lectura sin escrituras intermedias es un acierto.
+        """
+        self.manager.agregar_tarea_usuario(self.uid, "Uno", "D")
+        self.manager.listar_tareas_usuario(self.uid)
+        tareas = self.manager.listar_tareas_usuario(self.uid)
+
+        stats = self.cache.estadisticas()
+        self.assertEqual((stats["aciertos"], stats["fallos"]), (1, 1))
+
+        # Las tareas compartidas son inmutables y la lista devuelta es propia
+        with self.assertRaises(TypeError):
+            tareas[0]["titulo"] = "Modificado"
+        tareas.clear()
+        self.assertEqual(
+            self.manager.listar_tareas_usuario(self.uid)[0]["titulo"], "Uno")
+
+    def test_escrituras_invalidan_solo_al_dueno(self):
+        """
+        Cada escritura invalida el listado de su dueño y no el de otros.
+        """
+        self.manager.agregar_tarea_usuario(self.uid, "Mia", "D")
+        self.manager.agregar_tarea_usuario(self.otro, "Ajena", "D")
+        id_task = self.manager.listar_tareas_usuario(self.uid)[0]["id"]
+        self.manager.listar_tareas_usuario(self.otro)
+
+        self.manager.marcar_completada(id_task)
+        self.assertEqual(self.cache.estadisticas()["usuarios"], 1)
+        self.assertEqual(
+            self.manager.listar_tareas_usuario(self.uid)[0]["estado"], "completada")
+
+        self.manager.editar_tarea(id_task, "Editada", "D", None, "Alta")
+        self.assertEqual(
+            self.manager.listar_tareas_usuario(self.uid)[0]["titulo"], "Editada")
+
+        self.manager.eliminar_tarea(id_task)
+        self.assertEqual(self.manager.listar_tareas_usuario(self.uid), [])
+
+        self.manager.agregar_tarea_usuario(self.uid, "Nueva", "D")
+        self.assertEqual(len(self.manager.listar_tareas_usuario(self.uid)), 1)
+
+        # El listado del otro usuario nunca se invalidó
+        self.manager.listar_tareas_usuario(self.otro)
+        self.assertEqual(self.cache.estadisticas()["invalidaciones"], 4)
+
+    def test_desalojo_por_presupuesto(self):
+        """
+        Al superar el presupuesto de tareas se descarta el usuario menos reciente.
+        """
+        for i in range(2):
+            self.manager.agregar_tarea_usuario(self.uid, f"T{i}", "D")
+            self.manager.agregar_tarea_usuario(self.otro, f"O{i}", "D")
+
+        self.manager.listar_tareas_usuario(self.uid)
+        self.manager.listar_tareas_usuario(self.otro)
+
+        stats = self.cache.estadisticas()
+        self.assertEqual(stats["descartes"], 1)
+        self.assertEqual((stats["usuarios"], stats["tareas"]), (1, 2))
+
+    def test_busqueda_en_memoria_equivale_a_fts(self):
+        """
+        Con el listado en caché las búsquedas por fecha y la vacía se resuelven
+        en memoria; las de texto van al índice FTS (el listado no trae la
+        descripción). En ambos casos el resultado es el mismo que sin caché.
+        """
+        self.manager.agregar_tarea_usuario(
+            self.uid, "Estudiar álgebra", "Capítulo 2", "03/03/2025")
+        self.manager.agregar_tarea_usuario(
+            self.uid, "Comprar libro", "De algebra lineal", "04/04/2025")
+        self.manager.agregar_tarea_usuario(self.uid, "Caminar", "Parque", None)
+
+        consultas = ["alg", "ALGEBRA lin", "cap 2", "04/2025", "03/03/2025", "zzz", ""]
+        sin_cache = {c: self.manager.buscar_tareas(self.uid, c) for c in consultas}
+
+        self.manager.listar_tareas_usuario(self.uid)
+        aciertos = self.cache.estadisticas()["aciertos"]
+        for consulta in consultas:
+            with self.subTest(consulta=consulta):
+                self.assertEqual(self.manager.buscar_tareas(self.uid, consulta),
+                                 sin_cache[consulta])
+        self.assertEqual(self.cache.estadisticas()["aciertos"], aciertos + 3)
+
+    def test_paginas_de_la_ui_usan_la_cache(self):
+        """
+        El tráfico de la vista (primeras páginas por estado, página siguiente,
+        recarga y búsqueda por fecha) consulta la BD una sola vez.
+        """
+        for i in range(3):
+            self.manager.agregar_tarea_usuario(self.uid, f"T{i}", "D", f"0{i + 1}/02/2025")
+        id_task = self.manager.listar_tareas_pagina(self.uid, tamano=1)["tareas"][0]["id"]
+        self.manager.marcar_completada(id_task, user_id=self.uid)
+        antes = self.cache.estadisticas()
+
+        for _ in range(2):
+            pendientes = self.manager.listar_tareas_pagina(self.uid, tamano=1,
+                                                           estado="pendiente")
+            siguiente = self.manager.listar_tareas_pagina(
+                self.uid, cursor=pendientes["siguiente"], tamano=1, estado="pendiente")
+            completadas = self.manager.listar_tareas_pagina(self.uid, tamano=1,
+                                                            estado="completada")
+            self.manager.buscar_tareas(self.uid, "02/2025")
+        self.assertEqual([t["titulo"] for t in pendientes["tareas"] + siguiente["tareas"]],
+                         ["T1", "T0"])
+        self.assertEqual(completadas["tareas"][0]["id"], id_task)
+
+        stats = self.cache.estadisticas()
+        self.assertEqual(stats["fallos"], antes["fallos"] + 1)
+        self.assertEqual(stats["aciertos"], antes["aciertos"] + 7)
+
+        # Un usuario con más tareas que el límite sigue paginando en la BD
+        self.manager.agregar_tarea_usuario(self.uid, "T3", "D", None)
+        with mock.patch("src.logica.task_manager.MAX_LISTADO_PAGINADO", 1):
+            self.manager.listar_tareas_pagina(self.uid, tamano=1)
+        self.assertEqual(self.cache.estadisticas()["usuarios"], 0)
+
+    def test_detalle_en_cache(self):
+        """
+        obtener_tarea guarda la tarea completa; se sirve de la caché hasta
+        que una edición la invalida y nunca se entrega a otro usuario.
+        """
+        # Otra tarea antes, para que el id no coincida con True (== 1)
+        self.manager.agregar_tarea_usuario(self.otro, "Ajena", "D", None)
+        self.manager.agregar_tarea_usuario(self.uid, "T", "Larga", None)
+        id_task = self.manager.listar_tareas_usuario(self.uid)[0]["id"]
+        self.assertNotEqual(id_task, 1)
+
+        self.assertEqual(self.manager.obtener_tarea(id_task, user_id=self.uid)["descripcion"],
+                         "Larga")
+        self.manager.obtener_tarea(id_task, user_id=self.uid)
+        self.assertIsNone(self.manager.obtener_tarea(id_task, user_id=self.otro))
+        stats = self.cache.estadisticas()
+        self.assertEqual((stats["aciertos_detalle"], stats["detalles"]), (1, 1))
+
+        self.manager.editar_tarea(id_task, "T", "Corta", None, "Media", user_id=self.uid)
+        self.assertEqual(self.cache.estadisticas()["detalles"], 0)
+        self.assertEqual(self.manager.obtener_tarea(id_task, user_id=self.uid)["descripcion"],
+                         "Corta")
+
+    def test_lectura_vieja_no_se_guarda(self):
+        """
+        Un resultado leído antes de una invalidación no entra en la caché.
+        """
+        generacion = self.cache.generacion(self.uid)
+        self.cache.invalidar_usuario(self.uid)
+        self.assertFalse(self.cache.guardar(self.uid, [], generacion))
+
+        generacion = self.cache.generacion(self.uid)
+        self.cache.invalidar_tarea(999)
+        self.assertFalse(self.cache.guardar(self.uid, [], generacion))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Prueba de estrés: cientos de hilos atendiendo usuarios contra un solo TaskManager.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from src.logica.hasher import HasherPbkdf2
+from src.logica.task_manager import TaskManager
+from src.modelo.modelo import Base, Database
+
+HILOS = 200
+TAREAS_POR_HILO = 3
+
+
+class TestConcurrencia(unittest.TestCase):
+    """
+    Cada hilo simula el manejador de una página: registra su usuario, agrega
+    tareas, las lista, busca y completa una. No debe haber errores de bloqueo
+    de SQLite ni conexiones que queden fuera del pool.
+    """
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        self.url = "sqlite:///" + os.path.join(self.carpeta.name, "concurrencia.db")
+        self.db = Database(self.url,
+                           pool_size=5, max_overflow=10)
+        Base.metadata.drop_all(self.db.engine)
+        self.db.inicializar_db()
+        # El costo del hash no es lo que se mide aquí
+        self.manager = TaskManager(db_instance=self.db,
+                                   hasher=HasherPbkdf2(costo=1_000))
+
+    def tearDown(self):
+        self.db.engine.dispose()
+
+    def _atender_usuario(self, n, errores):
+        try:
+            email = f"hilo{n}@test.com"
+            self.assertTrue(self.manager.registrar_usuario(email, "clave", f"Hilo {n}"))
+            user_id = self.manager.login(email, "clave")["id"]
+
+            for i in range(TAREAS_POR_HILO):
+                self.assertTrue(self.manager.agregar_tarea_usuario(
+                    user_id, f"Tarea {i} del hilo {n}", "Descripción",
+                    "01/02/2025", "Media"))
+
+            tareas = self.manager.listar_tareas_usuario(user_id)
+            self.assertEqual(len(tareas), TAREAS_POR_HILO)
+            self.assertEqual(self.manager.marcar_completada(tareas[0]["id"], user_id), 1)
+            self.assertEqual(len(self.manager.buscar_tareas(user_id, "hilo")),
+                             TAREAS_POR_HILO)
+        except Exception as e:  # el hilo no puede fallar la prueba directamente
+            errores.append(f"hilo {n}: {e!r}")
+
+    def test_hilos_concurrentes(self):
+        errores = []
+        hilos = [threading.Thread(target=self._atender_usuario, args=(n, errores))
+                 for n in range(HILOS)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+        self.assertEqual(errores, [])
+        # Todas las sesiones devolvieron su conexión al pool
+        self.assertEqual(self.db.engine.pool.checkedout(), 0)
+
+        completadas = self.manager.filtrar_tareas_usuario(
+            self.manager.login("hilo0@test.com", "clave")["id"], estado="Completada")
+        self.assertEqual(len(completadas), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Pruebas unitarias del escritor con commit agrupado (EscritorAgrupado).
+"""
+
+import os
+import tempfile
+import unittest
+from sqlalchemy import event
+from src.logica.cache_tareas import CacheTareas
+from src.logica.escritor_agrupado import EscritorAgrupado
+from src.logica.task_manager import TaskManager
+from src.modelo.modelo import Base, Database
+
+
+class TestEscritorAgrupado(unittest.TestCase):
+    """
+    Verifica que las escrituras compartan commit, respeten el orden y
+    aíslen los errores de cada operación.
+    """
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        self.url = "sqlite:///" + os.path.join(self.carpeta.name, "escritor.db")
+        self.db = Database(self.url)
+        Base.metadata.drop_all(self.db.engine)
+        self.db.inicializar_db()
+        self.cache = CacheTareas()
+        self.manager = TaskManager(db_instance=self.db, cache=self.cache)
+
+        self.manager.registrar_usuario("lote@test.com", "clave", "Lote")
+        self.uid = self.manager.login("lote@test.com", "clave")["id"]
+
+        self.commits = 0
+        event.listen(self.db.engine, "commit", self._contar_commit)
+
+    def tearDown(self):
+        event.remove(self.db.engine, "commit", self._contar_commit)
+        self.db.engine.dispose()
+
+    def _contar_commit(self, conn):
+        self.commits += 1
+
+    def test_escrituras_comparten_commit(self):
+        """
+        Varias altas encoladas juntas se confirman en un solo commit.
+        """
+        escritor = EscritorAgrupado(self.manager, ventana=0.2, max_lote=10)
+        futuros = [escritor.encolar("agregar_tarea_usuario", self.uid,
+                                    f"Tarea {i}", "Desc", "01/02/2025")
+                   for i in range(10)]
+        self.assertEqual([f.result(timeout=5) for f in futuros], [True] * 10)
+        escritor.cerrar()
+
+        self.assertEqual(self.commits, 1)
+        self.assertEqual((escritor.lotes, escritor.operaciones), (1, 10))
+        self.assertEqual(len(self.manager.listar_tareas_usuario(self.uid)), 10)
+
+    def test_orden_por_usuario(self):
+        """
+        Las operaciones se aplican en el orden en que se encolaron.
+        """
+        self.manager.agregar_tarea_usuario(self.uid, "Toggle", "", None)
+        id_task = self.manager.listar_tareas_usuario(self.uid)[0]["id"]
+
+        escritor = EscritorAgrupado(self.manager, ventana=0.05)
+        for _ in range(3):
+            escritor.encolar("marcar_completada", id_task, user_id=self.uid)
+        ultima = escritor.encolar("editar_tarea", id_task, "Editada", "", None,
+                                  "Alta", user_id=self.uid)
+        self.assertEqual(ultima.result(timeout=5), 1)
+        escritor.cerrar()
+
+        tarea = self.manager.listar_tareas_usuario(self.uid)[0]
+        self.assertEqual((tarea["titulo"], tarea["estado"]), ("Editada", "completada"))
+
+    def test_error_aislado(self):
+        """
+        Una operación inválida falla sola; el resto del lote se confirma.
+        """
+        escritor = EscritorAgrupado(self.manager, ventana=0.2)
+        buena = escritor.encolar("agregar_tarea_usuario", self.uid, "Buena", "", None)
+        mala = escritor.encolar("editar_tarea", 1, "X", "", "no es fecha", "Alta")
+        otra = escritor.encolar("agregar_tarea_usuario", self.uid, "Otra", "", None)
+
+        self.assertTrue(buena.result(timeout=5))
+        self.assertTrue(otra.result(timeout=5))
+        with self.assertRaises(ValueError):
+            mala.result(timeout=5)
+        escritor.cerrar()
+
+        titulos = {t["titulo"] for t in self.manager.listar_tareas_usuario(self.uid)}
+        self.assertEqual(titulos, {"Buena", "Otra"})
+
+    def test_cache_invalidada_tras_commit(self):
+        """
+        El listado en caché se descarta cuando el lote se confirma.
+        """
+        self.manager.listar_tareas_usuario(self.uid)
+        escritor = EscritorAgrupado(self.manager)
+        escritor.encolar("agregar_tarea_usuario", self.uid, "Nueva", "", None).result(timeout=5)
+        escritor.cerrar()
+
+        self.assertIsNone(self.cache.obtener(self.uid))
+        self.assertEqual(len(self.manager.listar_tareas_usuario(self.uid)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Pruebas unitarias del hash de contraseñas (scrypt / PBKDF2).
+"""
+
+import asyncio
+import hashlib
+import unittest
+from src.logica.hasher import Hasher, HasherPbkdf2, HasherScrypt
+
+
+class TestHasher(unittest.TestCase):
+    """
+    Formato, verificación, rehash y calibración de los hashers.
+    """
+
+    def test_hash_y_verificacion(self):
+        """
+        Cada hash lleva su propia sal y solo acepta la contraseña correcta.
+        """
+        for hasher in (HasherScrypt(), HasherPbkdf2()):
+            with self.subTest(algoritmo=hasher.ALGORITMO):
+                a, b = hasher.hashear("secreta"), hasher.hashear("secreta")
+                self.assertNotEqual(a, b)
+                self.assertTrue(a.startswith(hasher.ALGORITMO + "$"))
+                self.assertTrue(hasher.verificar("secreta", a))
+                self.assertFalse(hasher.verificar("otra", a))
+                self.assertFalse(hasher.verificar("secreta", "formato$roto"))
+
+    def test_necesita_rehash(self):
+        """
+        Se rehashean los SHA-256 heredados, otros algoritmos y costos menores.
+        """
+        scrypt = HasherScrypt()
+        pbkdf2 = HasherPbkdf2(costo=1_000)
+        heredado = hashlib.sha256(b"secreta").hexdigest()
+
+        self.assertTrue(scrypt.verificar("secreta", heredado))
+        self.assertTrue(scrypt.necesita_rehash(heredado))
+        self.assertTrue(scrypt.necesita_rehash(pbkdf2.hashear("secreta")))
+        # El hash de otro algoritmo se sigue verificando
+        self.assertTrue(scrypt.verificar("secreta", pbkdf2.hashear("secreta")))
+
+        barato = pbkdf2.hashear("secreta")
+        self.assertFalse(pbkdf2.necesita_rehash(barato))
+        pbkdf2.costo *= 2
+        self.assertTrue(pbkdf2.necesita_rehash(barato))
+
+    def test_base_abstracta(self):
+        """
+        Ni la base ni una subclase sin `_derivar` se pueden instanciar.
+        """
+        class SinDerivar(Hasher):
+            ALGORITMO = "nada"
+            COSTO_MINIMO = 1
+
+        for clase in (Hasher, SinDerivar):
+            with self.subTest(clase=clase.__name__):
+                with self.assertRaises(TypeError):
+                    clase()
+
+    def test_calibracion(self):
+        """
+        La calibración duplica el costo hasta alcanzar el tiempo objetivo.
+        """
+        hasher = HasherPbkdf2()
+        self.assertEqual(hasher.calibrar(objetivo=0), HasherPbkdf2.COSTO_MINIMO)
+        costo = hasher.calibrar(objetivo=10, costo_maximo=4 * HasherPbkdf2.COSTO_MINIMO)
+        self.assertEqual(costo, 4 * HasherPbkdf2.COSTO_MINIMO)
+        self.assertIn(f"${costo}$", hasher.hashear("secreta"))
+
+    def test_api_asincrona(self):
+        """
+        Las variantes async calculan en el pool y devuelven el mismo formato.
+        """
+        hasher = HasherPbkdf2(costo=1_000)
+
+        async def flujo():
+            almacenado = await hasher.hashear_async("secreta")
+            return await asyncio.gather(hasher.verificar_async("secreta", almacenado),
+                                        hasher.verificar_async("mala", almacenado))
+        self.assertEqual(asyncio.run(flujo()), [True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
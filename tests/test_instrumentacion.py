@@ -0,0 +1,152 @@
+"""
+Pruebas unitarias de la instrumentación por método de TaskManager.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from sqlalchemy import exc, text
+from src.logica.async_task_manager import AsyncTaskManager
+from src.logica.hasher import HasherPbkdf2
+from src.logica.instrumentacion import Instrumentacion, SIN_METODO
+from src.logica.task_manager import TaskManager
+from src.modelo.modelo import Base, Database
+
+
+class TestInstrumentacion(unittest.TestCase):
+    """
+    Conteo de sentencias, filas y latencias por método, y costo nulo sin ella.
+    """
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        self.url = "sqlite:///" + os.path.join(self.carpeta.name, "instrumentacion.db")
+        self.db = Database(self.url)
+        Base.metadata.drop_all(self.db.engine)
+        self.db.inicializar_db()
+        self.hasher = HasherPbkdf2(costo=1_000)
+        self.instrumentacion = Instrumentacion()
+        self.manager = TaskManager(db_instance=self.db, hasher=self.hasher,
+                                   instrumentacion=self.instrumentacion)
+        self.manager.registrar_usuario("medir@test.com", "clave", "Medir")
+        self.uid = self.manager.login("medir@test.com", "clave")["id"]
+
+    def tearDown(self):
+        self.instrumentacion.desinstalar()
+        self.db.engine.dispose()
+
+    def test_sin_instrumentacion(self):
+        """
+        Sin instrumentación los métodos no se envuelven y stats() está vacío.
+        """
+        manager = TaskManager(db_instance=self.db, hasher=self.hasher)
+        self.assertIs(manager.listar_tareas_usuario.__func__,
+                      TaskManager.listar_tareas_usuario)
+        self.assertEqual(manager.stats(), {})
+
+    def test_metricas_por_metodo(self):
+        """
+        Llamadas, sentencias, filas devueltas/afectadas e histograma.
+        """
+        self.manager.agregar_tareas_usuario(
+            self.uid, [{"titulo": "Leer"}, {"titulo": "Correr"}])
+        for _ in range(3):
+            tareas = self.manager.listar_tareas_usuario(self.uid)
+        self.manager.marcar_completadas(self.uid, [t["id"] for t in tareas])
+
+        stats = self.manager.stats()
+        listar = stats["listar_tareas_usuario"]
+        self.assertEqual(listar["llamadas"], 3)
+        self.assertEqual(listar["sentencias"], 3)
+        self.assertEqual(listar["filas_devueltas"], 6)
+        self.assertEqual(sum(listar["histograma"].values()), 3)
+        self.assertLessEqual(listar["p50_ms"], listar["p99_ms"])
+
+        self.assertEqual(stats["marcar_completadas"]["filas_afectadas"], 2)
+        self.assertEqual(stats["agregar_tareas_usuario"]["filas_afectadas"], 2)
+
+    def test_llamadas_anidadas_y_errores(self):
+        """
+        Las sentencias de un método interno cuentan también para el externo,
+        y las excepciones se registran como errores.
+        """
+        self.manager.listar_tareas_usuario(self.uid)
+        self.instrumentacion.reiniciar()
+        self.manager.buscar_tareas(self.uid, "02/2025")   # delega en listar
+
+        stats = self.manager.stats()
+        self.assertEqual(stats["buscar_tareas"]["sentencias"],
+                         stats["listar_tareas_usuario"]["sentencias"])
+        self.assertNotIn(SIN_METODO, stats)
+
+        with self.assertRaises(ValueError):
+            self.manager.login("medir@test.com", "mala")
+        self.assertEqual(self.manager.stats()["login"]["errores"], 1)
+
+    def test_sentencia_fallida_no_deja_estado(self):
+        """
+        Una sentencia que falla en la base no deja su inicio en la conexión.
+        """
+        with self.db.engine.connect() as conn:
+            for _ in range(3):
+                with self.assertRaises(exc.OperationalError):
+                    conn.execute(text("SELECT * FROM no_existe"))
+            self.assertEqual(conn.execute(text("SELECT 1")).scalar(), 1)
+            self.assertNotIn("instrumentacion_inicio", conn.info)
+        self.assertEqual(self.instrumentacion.stats()[SIN_METODO]["sentencias"], 1)
+
+    def test_volcado_periodico(self):
+        """
+        El volcado escribe stats() en el log en cada intervalo.
+        """
+        with self.assertLogs("src.logica.instrumentacion", level="INFO") as registro:
+            self.instrumentacion.iniciar_volcado(intervalo=0.01)
+            try:
+                for _ in range(100):
+                    if registro.output:
+                        break
+                    time.sleep(0.01)
+            finally:
+                self.instrumentacion.detener_volcado()
+        self.assertIn('"login"', registro.output[0])
+
+
+class TestInstrumentacionAsync(unittest.IsolatedAsyncioTestCase):
+    """
+    En AsyncTaskManager las sentencias se atribuyen a la corrutina que las emite.
+    """
+
+    async def asyncSetUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        self.url = "sqlite:///" + os.path.join(self.carpeta.name, "async.db")
+        self.instrumentacion = Instrumentacion()
+        self.manager = AsyncTaskManager(self.url,
+                                        hasher=HasherPbkdf2(costo=1_000),
+                                        instrumentacion=self.instrumentacion)
+        await self.manager.inicializar_db()
+        self.instrumentacion.reiniciar()
+
+    async def asyncTearDown(self):
+        self.instrumentacion.desinstalar()
+        await self.manager.cerrar()
+
+    async def test_corrutinas_concurrentes(self):
+        await self.manager.registrar_usuario("a@test.com", "clave", "A")
+        uid = (await self.manager.login("a@test.com", "clave"))["id"]
+        await asyncio.gather(*[
+            self.manager.agregar_tarea_usuario(uid, f"T{i}", "D") for i in range(5)
+        ] + [self.manager.listar_tareas_usuario(uid) for _ in range(5)])
+
+        stats = self.manager.stats()
+        self.assertEqual(stats["agregar_tarea_usuario"]["llamadas"], 5)
+        self.assertEqual(stats["listar_tareas_usuario"]["sentencias"], 5)
+        self.assertGreaterEqual(stats["login"]["sentencias"], 1)
+        self.assertNotIn(SIN_METODO, stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
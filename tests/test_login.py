@@ -2,9 +2,11 @@
 Pruebas unitarias para el sistema de autenticación de usuarios.
 """
 
+import hashlib
 import unittest
 import os
 from src.logica.task_manager import TaskManager
+from src.modelo.modelo import Usuario
 
 
 class TestAutenticacion(unittest.TestCase):
@@ -93,5 +95,32 @@ class TestAutenticacion(unittest.TestCase):
         self.assertIn("ya está registrado", str(contexto.exception).lower())
 
 
+    def test_contrasena_con_sal(self):
+        """
+        El registro guarda un hash scrypt con sal, nunca la clave ni SHA-256.
+        """
+        with self.manager._session_scope() as session:
+            almacenado = session.query(Usuario).filter_by(email=self.correo).one().password
+
+        self.assertTrue(almacenado.startswith("scrypt$"))
+        self.assertNotIn(self.clave, almacenado)
+
+    def test_rehash_de_hash_heredado(self):
+        """
+        Un usuario con hash SHA-256 antiguo entra y su hash se reemplaza.
+        """
+        heredado = hashlib.sha256(b"vieja").hexdigest()
+        self.manager._crear_usuario("viejo@test.com", heredado, "Viejo")
+
+        self.assertEqual(self.manager.login("viejo@test.com", "vieja")["nombre"], "Viejo")
+        credenciales = self.manager._credenciales("viejo@test.com")
+        self.assertTrue(credenciales["password"].startswith("scrypt$"))
+
+        # El hash nuevo sigue aceptando la misma contraseña
+        self.assertEqual(self.manager.login("viejo@test.com", "vieja")["nombre"], "Viejo")
+        with self.assertRaises(ValueError):
+            self.manager.login("viejo@test.com", "otra")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,72 @@
+"""
+Pruebas unitarias de los perfiles de rendimiento SQLite de Database.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy import text
+from src.modelo.modelo import Database, PERFILES_SQLITE
+
+
+class TestPerfilesSQLite(unittest.TestCase):
+    """
+    Verifica que cada perfil aplique sus PRAGMAs en las conexiones nuevas.
+    """
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        self.url = "sqlite:///" + os.path.join(self.carpeta.name, "perfil.db")
+
+    def _pragmas(self, db):
+        with db.engine.connect() as conn:
+            return {
+                nombre: conn.execute(text(f"PRAGMA {nombre}")).scalar()
+                for nombre in ("journal_mode", "synchronous", "cache_size",
+                               "busy_timeout", "temp_store")
+            }
+
+    def test_pragmas_por_perfil(self):
+        """
+        journal_mode, synchronous, cache_size y busy_timeout según el perfil.
+        """
+        # Valores numéricos con los que SQLite reporta 'synchronous'
+        synchronous = {"OFF": 0, "NORMAL": 1, "FULL": 2}
+        for perfil, pragmas in PERFILES_SQLITE.items():
+            with self.subTest(perfil=perfil):
+                db = Database(self.url, perfil=perfil)
+                try:
+                    actuales = self._pragmas(db)
+                finally:
+                    db.engine.dispose()
+
+                self.assertEqual(actuales["journal_mode"], "wal")
+                self.assertEqual(actuales["synchronous"],
+                                 synchronous[pragmas["synchronous"]])
+                self.assertEqual(actuales["cache_size"], pragmas["cache_size"])
+                self.assertEqual(actuales["busy_timeout"], pragmas["busy_timeout"])
+
+    def test_perfil_desde_entorno(self):
+        """
+        Sin argumento, el perfil se toma de la variable DB_PERFIL.
+        """
+        with mock.patch.dict(os.environ, {"DB_PERFIL": "durable"}):
+            db = Database(self.url)
+        try:
+            self.assertEqual(db.perfil, "durable")
+            self.assertEqual(self._pragmas(db)["synchronous"], 2)
+        finally:
+            db.engine.dispose()
+
+    def test_perfil_desconocido(self):
+        """
+        Un perfil inexistente se rechaza al construir la base de datos.
+        """
+        with self.assertRaises(ValueError):
+            Database(self.url, perfil="turbo")
+
+
+if __name__ == "__main__":
+    unittest.main()
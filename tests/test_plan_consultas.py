@@ -0,0 +1,145 @@
+"""
+Pruebas de rendimiento estructural: verifica con EXPLAIN QUERY PLAN que las
+consultas generadas por TaskManager usen índices en lugar de recorrer tablas.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from src.logica.sesiones import AlmacenSesiones
+from src.logica.task_manager import TaskManager
+
+
+class TestPlanConsultas(unittest.TestCase):
+    """
+    Captura cada sentencia SQL emitida por TaskManager y analiza su plan.
+    """
+
+    def setUp(self):
+        """
+        Base de datos temporal con un escuchador que registra las sentencias.
+        """
+        from src.modelo.modelo import Database, Base
+
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        self.url = "sqlite:///" + os.path.join(self.carpeta.name, "plan.db")
+        test_db = Database(self.url)
+        self.test_engine = create_engine(self.url)
+
+        test_db.engine = self.test_engine
+        test_db.Session = sessionmaker(bind=self.test_engine)
+
+        Base.metadata.drop_all(self.test_engine)
+        Base.metadata.create_all(self.test_engine)
+
+        self.manager = TaskManager(db_instance=test_db,
+                                   sesiones=AlmacenSesiones(persistente=True))
+        self.sentencias = []
+
+        event.listen(self.test_engine, "before_cursor_execute",
+                     self._registrar_sentencia)
+
+    def tearDown(self):
+        """
+        Retira el escuchador y libera el motor.
+        """
+        event.remove(self.test_engine, "before_cursor_execute",
+                     self._registrar_sentencia)
+        self.manager.db.engine.dispose()
+
+    def _registrar_sentencia(self, conn, cursor, statement, parameters,
+                             context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            self.sentencias.append((statement, parameters))
+
+    def _planes(self):
+        """Devuelve (sentencia, detalle) para cada paso de cada plan capturado."""
+        capturadas = list(self.sentencias)
+        resultado = []
+        with self.test_engine.connect() as conn:
+            for sentencia, parametros in capturadas:
+                filas = conn.exec_driver_sql(
+                    "EXPLAIN QUERY PLAN " + sentencia, parametros).fetchall()
+                resultado.extend((sentencia, fila[-1]) for fila in filas)
+        return resultado
+
+    def _ejercitar_manager(self):
+        """Recorre todas las operaciones públicas de TaskManager."""
+        self.manager.registrar_usuario("plan@test.com", "clave", "Plan")
+        uid = self.manager.login("plan@test.com", "clave")["id"]
+
+        self.manager.agregar_tarea_usuario(uid, "Leer", "Libro", "01/02/2025")
+        self.manager.agregar_tarea_usuario(uid, "Correr", "Parque", "03/02/2025")
+
+        tareas = self.manager.listar_tareas_usuario(uid)
+        self.manager.listar_tareas_usuario(
+            uid, orden="asc", desde="01/01/2025", hasta="31/12/2025")
+        self.manager.filtrar_tareas_usuario(uid, estado="pendiente")
+        self.manager.filtrar_tareas_usuario(
+            uid, estado="completada", desde="01/01/2025")
+        self.manager.filtrar_tareas_usuario(uid, estado="Todas")
+        self.manager.listar_tareas_usuario(uid, orden="prioridad")
+        self.manager.filtrar_tareas_usuario(uid, estado="pendiente", orden="prioridad")
+        self.manager.buscar_tareas(uid, "Leer")
+        self.manager.buscar_tareas(uid, "02/2025")
+        self.manager.obtener_tarea(tareas[0]["id"], user_id=uid)
+        self.manager.resumen_tareas(uid)
+        self.manager.estadisticas_tareas(uid)
+        self.manager.estadisticas_tareas(uid, periodo="semana")
+        self.manager.agregar_tarea_usuario(uid, "Sin fecha", "Nada", None)
+        for estado in (None, "pendiente"):
+            for orden in ("desc", "asc"):
+                pagina = self.manager.listar_tareas_pagina(
+                    uid, tamano=1, estado=estado, orden=orden)
+                while pagina["siguiente"]:
+                    pagina = self.manager.listar_tareas_pagina(
+                        uid, cursor=pagina["siguiente"], tamano=1,
+                        estado=estado, orden=orden)
+
+        self.manager.agregar_tareas_usuario(uid, [{"titulo": "Lote"}])
+        ids = [t["id"] for t in self.manager.listar_tareas_usuario(uid)]
+        self.manager.marcar_completadas(uid, ids[-1:])
+        self.manager.eliminar_tareas(uid, ids[-1:])
+        self.manager.eliminar_completadas(uid)
+        self.manager.exportar_tareas(uid, io.StringIO(), formato="jsonl")
+
+        id_task = tareas[0]["id"]
+        self.manager.editar_tarea(id_task, "Leer más", "Libro", None, "Alta")
+        self.manager.marcar_completada(id_task)
+        self.manager.marcar_completada(id_task, user_id=uid)
+        self.manager.editar_tarea(id_task, "Leer", "Libro", None, "Baja", user_id=uid)
+        self.manager.eliminar_tarea(id_task, user_id=uid)
+        self.manager.eliminar_tarea(id_task)
+
+        token = self.manager.iniciar_sesion("plan@test.com", "clave")["token"]
+        self.manager.sesiones.revocar(token)     # fuerza la lectura de la tabla
+        self.manager.resolver_sesion(token)
+        self.manager.cerrar_sesion(token)
+
+    def test_sin_recorridos_completos(self):
+        """
+        Falla si alguna consulta del manager recorre una tabla completa (SCAN)
+        o necesita ordenar en un árbol temporal en vez de usar el índice.
+        """
+        self._ejercitar_manager()
+        planes = self._planes()
+        self.assertTrue(planes)
+
+        for sentencia, detalle in planes:
+            with self.subTest(sentencia=sentencia, detalle=detalle):
+                # FTS5 se reporta como SCAN de la tabla virtual; con un MATCH
+                # (':M' en el índice) es una búsqueda en el índice invertido.
+                busqueda_fts = "VIRTUAL TABLE INDEX" in detalle and ":M" in detalle
+                self.assertFalse(detalle.startswith("SCAN") and not busqueda_fts)
+                # Las estadísticas agrupan el tramo del usuario (leído del
+                # índice) en un árbol temporal; ningún listado se ordena así.
+                if detalle != "USE TEMP B-TREE FOR GROUP BY":
+                    self.assertNotIn("TEMP B-TREE", detalle)
+
+
+if __name__ == "__main__":
+    unittest.main()
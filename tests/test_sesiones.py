@@ -0,0 +1,114 @@
+"""
+Pruebas unitarias de los tokens de sesión (AlmacenSesiones y TaskManager).
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from sqlalchemy import event
+from src.logica.hasher import HasherPbkdf2
+from src.logica.sesiones import AlmacenSesiones
+from src.logica.task_manager import TaskManager
+from src.modelo.modelo import Base, Database
+
+
+class TestAlmacenSesiones(unittest.TestCase):
+    """
+    Vencimiento, descarte LRU y revocación en memoria.
+    """
+
+    def test_emitir_y_resolver(self):
+        almacen = AlmacenSesiones()
+        token, _ = almacen.emitir({"id": 1, "nombre": "Ana", "email": "a@a.com"})
+        otro, _ = almacen.emitir({"id": 1, "nombre": "Ana", "email": "a@a.com"})
+
+        self.assertNotEqual(token, otro)
+        self.assertEqual(almacen.resolver(token)["nombre"], "Ana")
+        self.assertIsNone(almacen.resolver("inventado"))
+
+        self.assertEqual(almacen.revocar_usuario(1), 2)
+        self.assertIsNone(almacen.resolver(otro))
+
+    def test_vencimiento(self):
+        almacen = AlmacenSesiones(ttl=0.05)
+        token, _ = almacen.emitir({"id": 1})
+        time.sleep(0.1)
+        self.assertIsNone(almacen.resolver(token))
+        self.assertEqual(almacen.estadisticas()["sesiones"], 0)
+
+    def test_descarte_lru(self):
+        almacen = AlmacenSesiones(max_sesiones=2)
+        a, _ = almacen.emitir({"id": 1})
+        b, _ = almacen.emitir({"id": 2})
+        almacen.resolver(a)                 # 'a' pasa a ser la más reciente
+        almacen.emitir({"id": 3})
+
+        self.assertIsNotNone(almacen.resolver(a))
+        self.assertIsNone(almacen.resolver(b))
+        self.assertEqual(almacen.estadisticas()["descartes"], 1)
+
+
+class TestSesionesTaskManager(unittest.TestCase):
+    """
+    Login con token, resolución sin consultas y persistencia entre reinicios.
+    """
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        self.url = "sqlite:///" + os.path.join(self.carpeta.name, "sesiones.db")
+        self.db = Database(self.url)
+        Base.metadata.drop_all(self.db.engine)
+        self.db.inicializar_db()
+        self.hasher = HasherPbkdf2(costo=1_000)
+        self.manager = TaskManager(db_instance=self.db, hasher=self.hasher,
+                                   sesiones=AlmacenSesiones(persistente=True))
+        self.manager.registrar_usuario("token@test.com", "clave", "Token")
+
+        self.consultas = 0
+        event.listen(self.db.engine, "before_cursor_execute", self._contar)
+
+    def tearDown(self):
+        event.remove(self.db.engine, "before_cursor_execute", self._contar)
+        self.db.engine.dispose()
+
+    def _contar(self, *args):
+        self.consultas += 1
+
+    def test_resolver_sin_consultar_bd(self):
+        usuario = self.manager.iniciar_sesion("token@test.com", "clave")
+        self.assertIn("token", usuario)
+
+        self.consultas = 0
+        resuelto = self.manager.resolver_sesion(usuario["token"])
+        self.assertEqual(resuelto, usuario)
+        self.assertEqual(self.consultas, 0)
+
+    def test_sesion_persistida_tras_reinicio(self):
+        token = self.manager.iniciar_sesion("token@test.com", "clave")["token"]
+
+        # Otro proceso: almacén vacío sobre la misma base de datos
+        reiniciado = TaskManager(db_instance=self.db, hasher=self.hasher,
+                                 sesiones=AlmacenSesiones(persistente=True))
+        self.assertEqual(reiniciado.resolver_sesion(token)["nombre"], "Token")
+
+        # Ya cargada en memoria, la siguiente resolución no consulta la BD
+        self.consultas = 0
+        self.assertIsNotNone(reiniciado.resolver_sesion(token))
+        self.assertEqual(self.consultas, 0)
+
+        reiniciado.cerrar_sesion(token)
+        self.assertIsNone(reiniciado.resolver_sesion(token))
+        otro = TaskManager(db_instance=self.db, hasher=self.hasher,
+                           sesiones=AlmacenSesiones(persistente=True))
+        self.assertIsNone(otro.resolver_sesion(token))
+
+    def test_credenciales_invalidas(self):
+        with self.assertRaises(ValueError):
+            self.manager.iniciar_sesion("token@test.com", "mala")
+        self.assertIsNone(self.manager.resolver_sesion(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
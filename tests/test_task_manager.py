@@ -2,10 +2,13 @@
 Módulo de pruebas unitarias para la gestión de tareas (CRUD, filtros y búsqueda).
 """
 
+import io
 import unittest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from src.logica.task_manager import TaskManager
+from src.logica.task_record import TaskRecord
+from src.modelo.modelo import migrar_codigos
 
 # Importación de Base gestionando posibles diferencias de estructura de carpetas
 try:
@@ -66,6 +69,14 @@ class TestTaskManager(unittest.TestCase):
         tareas = self.manager.listar_tareas_usuario(self.user["id"])
         self.assertEqual(len(tareas), 1)
         self.assertEqual(tareas[0]["titulo"], titulo)
+        # Fila proyectada (sin objeto ORM); el listado omite la descripción
+        self.assertIsInstance(tareas[0], TaskRecord)
+        self.assertEqual(tareas[0], {
+            "id": tareas[0]["id"], "titulo": titulo, "descripcion": None,
+            "fecha": "Sin fecha", "prioridad": "Media", "estado": "pendiente"})
+        detalle = self.manager.obtener_tarea(tareas[0]["id"], user_id=self.user["id"])
+        self.assertEqual(detalle, dict(tareas[0], descripcion="Desc"))
+        self.assertIsNone(self.manager.obtener_tarea(tareas[0]["id"], user_id=-1))
 
     def test_aislamiento_usuarios(self):
         """
@@ -155,6 +166,439 @@ class TestTaskManager(unittest.TestCase):
             self.user["id"], estado="pendiente")
         self.assertEqual(len(pendientes), 2)
 
+    def test_orden_y_rango_fechas(self):
+        """
+        Verifica que el orden por fecha y el rango de fechas se resuelvan en SQL.
+        """
+        uid = self.user["id"]
+        self.manager.agregar_tarea_usuario(uid, "Antigua", "D", "01/02/2024")
+        self.manager.agregar_tarea_usuario(uid, "Reciente", "D", "15/03/2025")
+        self.manager.agregar_tarea_usuario(uid, "Sin fecha", "D", None)
+        self.manager.agregar_tarea_usuario(uid, "Media", "D", "2024-12-31")
+
+        desc = self.manager.listar_tareas_usuario(uid)
+        self.assertEqual([t["titulo"] for t in desc],
+                         ["Reciente", "Media", "Antigua", "Sin fecha"])
+        self.assertEqual(desc[0]["fecha"], "15/03/2025")
+        self.assertEqual(desc[-1]["fecha"], "Sin fecha")
+
+        asc = self.manager.listar_tareas_usuario(uid, orden="asc")
+        self.assertEqual(asc[-1]["titulo"], "Reciente")
+
+        rango = self.manager.filtrar_tareas_usuario(
+            uid, estado="pendiente", desde="01/06/2024", hasta="31/12/2024")
+        self.assertEqual([t["titulo"] for t in rango], ["Media"])
+
+        with self.assertRaises(ValueError):
+            self.manager.listar_tareas_usuario(uid, orden="aleatorio")
+
+    def test_migracion_fechas_texto(self):
+        """
+        Valida que las fechas heredadas en texto 'dd/mm/aaaa' se migren a Date.
+        """
+        from sqlalchemy import text
+
+        uid = self.user["id"]
+        with self.test_engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO tasks (titulo, fecha, prioridad, estado, user_id) "
+                "VALUES ('Vieja', '05/04/2023', 2, 0, :uid), "
+                "('Marcador', 'Sin fecha', 2, 0, :uid)"
+            ), {"uid": uid})
+
+        self.assertEqual(self.manager.db.migrar_fechas(), 2)
+        self.assertEqual(self.manager.db.migrar_fechas(), 0)
+
+        tareas = self.manager.listar_tareas_usuario(uid)
+        fechas = {t["titulo"]: t["fecha"] for t in tareas}
+        self.assertEqual(fechas, {"Vieja": "05/04/2023", "Marcador": "Sin fecha"})
+
+    def test_estado_y_prioridad_codificados(self):
+        """
+        Estado y prioridad se guardan como enteros pero se leen como
+        etiquetas; el orden por prioridad va de Alta a Baja.
+        """
+        uid = self.user["id"]
+        for titulo, prioridad in (("B", "Baja"), ("A", "Alta"), ("M", "Media")):
+            self.assertTrue(self.manager.agregar_tarea_usuario(
+                uid, titulo, "", "01/02/2025", prioridad))
+        self.assertFalse(self.manager.agregar_tarea_usuario(uid, "X", "", None, "Urgente"))
+
+        tareas = self.manager.listar_tareas_usuario(uid, orden="prioridad")
+        self.assertEqual([t["prioridad"] for t in tareas], ["Alta", "Media", "Baja"])
+        self.manager.marcar_completada(tareas[0]["id"])
+        self.assertEqual(self.manager.filtrar_tareas_usuario(
+            uid, estado="Completada", orden="prioridad")[0]["titulo"], "A")
+
+        with self.test_engine.connect() as conn:
+            filas = conn.exec_driver_sql(
+                "SELECT titulo, typeof(estado), estado, prioridad FROM tasks "
+                "ORDER BY titulo").fetchall()
+        self.assertEqual(filas, [("A", "integer", 1, 3), ("B", "integer", 0, 1),
+                                 ("M", "integer", 0, 2)])
+
+    def test_etiquetas_desconocidas(self):
+        """
+        Un estado sin código filtra a una lista vacía (como antes de codificar)
+        y una prioridad desconocida al editar es un ValueError, no un error SQL.
+        """
+        uid = self.user["id"]
+        self.manager.agregar_tarea_usuario(uid, "T", "", None, "Alta")
+        self.assertEqual(self.manager.filtrar_tareas_usuario(uid, estado="archivada"), [])
+        self.assertEqual(self.manager.listar_tareas_pagina(uid, estado="archivada"),
+                         {"tareas": [], "siguiente": None})
+
+        id_task = self.manager.listar_tareas_usuario(uid)[0]["id"]
+        with self.assertRaisesRegex(ValueError, "Prioridad no válida"):
+            self.manager.editar_tarea(id_task, "T", "", None, "Urgente", user_id=uid)
+        self.assertEqual(self.manager.listar_tareas_usuario(uid)[0]["prioridad"], "Alta")
+
+    def test_migracion_codigos(self):
+        """
+        Una base con estado y prioridad en texto se reconstruye con códigos
+        enteros conservando ids, búsqueda de texto y contadores.
+        """
+        from src.modelo.modelo import Database
+
+        db = Database("sqlite://")
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "CREATE TABLE usuarios (id INTEGER PRIMARY KEY, email VARCHAR NOT NULL "
+                "UNIQUE, password VARCHAR NOT NULL, nombre VARCHAR NOT NULL)")
+            conn.exec_driver_sql(
+                "CREATE TABLE tasks (id INTEGER PRIMARY KEY, titulo VARCHAR NOT NULL, "
+                "descripcion VARCHAR, fecha DATE, prioridad VARCHAR, estado VARCHAR, "
+                "user_id INTEGER NOT NULL REFERENCES usuarios (id))")
+            conn.exec_driver_sql(
+                "CREATE INDEX ix_tasks_user_fecha ON tasks (user_id, fecha)")
+            conn.exec_driver_sql("INSERT INTO usuarios VALUES (1, 'v@test.com', 'x', 'V')")
+            conn.exec_driver_sql(
+                "INSERT INTO tasks VALUES "
+                "(7, 'Leer libro', '', '2023-04-05', 'Alta', 'completada', 1), "
+                "(9, 'Correr', '', NULL, 'Rara', 'pendiente', 1)")
+        db.inicializar_db()
+
+        manager = TaskManager(db_instance=db)
+        tareas = manager.listar_tareas_usuario(1, orden="prioridad")
+        self.assertEqual([(t["id"], t["prioridad"], t["estado"]) for t in tareas],
+                         [(7, "Alta", "completada"), (9, "Media", "pendiente")])
+        self.assertEqual([t["id"] for t in manager.buscar_tareas(1, "libro")], [7])
+        self.assertEqual(manager.resumen_tareas(1)["completadas"], 1)
+        self.assertEqual(db.verificar_contadores(), [])
+        with db.engine.begin() as conn:
+            self.assertEqual(migrar_codigos(conn), 0)
+        db.engine.dispose()
+
+    def test_busqueda_texto_completo(self):
+        """
+        Valida la búsqueda FTS: prefijos, descripción, relevancia, límite,
+        fechas y sincronización del índice tras editar y eliminar.
+        """
+        uid = self.user["id"]
+        self.manager.agregar_tarea_usuario(
+            uid, "Repasar álgebra", "Capítulo de matrices", "10/05/2025")
+        self.manager.agregar_tarea_usuario(
+            uid, "Comprar cuaderno", "Para repasar en casa", "20/05/2025")
+        self.manager.agregar_tarea_usuario(uid, "Pagar luz", "Recibo", "02/06/2025")
+
+        # Prefijo + coincidencia en título pesa más que en descripción
+        res = self.manager.buscar_tareas(uid, "repas")
+        self.assertEqual([t["titulo"] for t in res],
+                         ["Repasar álgebra", "Comprar cuaderno"])
+        self.assertEqual(len(self.manager.buscar_tareas(uid, "repas", limite=1)), 1)
+
+        # Insensible a tildes y tolerante a caracteres especiales
+        self.assertEqual(len(self.manager.buscar_tareas(uid, 'algebra"')), 1)
+
+        # Búsqueda por fecha completa o por mes
+        self.assertEqual(len(self.manager.buscar_tareas(uid, "02/06/2025")), 1)
+        self.assertEqual(len(self.manager.buscar_tareas(uid, "05/2025")), 2)
+
+        # El índice se mantiene al editar y eliminar
+        id_luz = self.manager.buscar_tareas(uid, "luz")[0]["id"]
+        self.manager.editar_tarea(id_luz, "Pagar agua", "Recibo", None, "Alta")
+        self.assertEqual(self.manager.buscar_tareas(uid, "luz"), [])
+        self.assertEqual(len(self.manager.buscar_tareas(uid, "agua")), 1)
+        self.manager.eliminar_tarea(id_luz)
+        self.assertEqual(self.manager.buscar_tareas(uid, "agua"), [])
+
+        # Otro usuario no ve coincidencias ajenas
+        self.manager.registrar_usuario("otro@test.com", "123", "Otro")
+        otro = self.manager.login("otro@test.com", "123")
+        self.assertEqual(self.manager.buscar_tareas(otro["id"], "repas"), [])
+
+    def test_busqueda_acotada_por_usuario(self):
+        """
+        El usuario forma parte del MATCH: el límite se aplica sobre sus
+        coincidencias (no sobre las de todos) y su id no es un término buscable.
+        Un índice previo sin user_id se reemplaza al inicializar.
+        """
+        from src.modelo.modelo import crear_busqueda_texto
+
+        uid = self.user["id"]
+        self.manager.registrar_usuario("otro@test.com", "123", "Otro")
+        otro = self.manager.login("otro@test.com", "123")["id"]
+        self.manager.agregar_tareas_usuario(
+            otro, [{"titulo": f"Repaso {i}", "descripcion": "repaso"} for i in range(5)])
+        self.manager.agregar_tarea_usuario(uid, "Leer", "repaso general", None)
+
+        for limite in (None, 1):
+            self.assertEqual([t["titulo"] for t in
+                              self.manager.buscar_tareas(uid, "repaso", limite=limite)],
+                             ["Leer"])
+        self.assertEqual(self.manager.buscar_tareas(uid, str(uid)), [])
+
+        with self.test_engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE tasks_fts")
+            conn.exec_driver_sql(
+                "CREATE VIRTUAL TABLE tasks_fts USING fts5(titulo, descripcion, "
+                "content='tasks', content_rowid='id')")
+            crear_busqueda_texto(conn)
+        self.assertEqual(len(self.manager.buscar_tareas(otro, "repaso", limite=3)), 3)
+        self.assertEqual(len(self.manager.buscar_tareas(uid, "leer")), 1)
+
+    def test_paginacion_por_clave(self):
+        """
+        Recorre todas las páginas (con y sin caché, ambos órdenes, con y sin
+        estado) y verifica que coincidan con el listado completo sin repetir filas.
+        """
+        from src.logica.cache_tareas import CacheTareas
+
+        uid = self.user["id"]
+        fechas = ["01/01/2025", "01/01/2025", None, "15/02/2024", None,
+                  "01/01/2025", "30/06/2025", None, "15/02/2024"]
+        for i, fecha in enumerate(fechas):
+            self.manager.agregar_tarea_usuario(uid, f"T{i}", "D", fecha)
+        for t in self.manager.listar_tareas_usuario(uid)[::3]:
+            self.manager.marcar_completada(t["id"])
+
+        con_cache = TaskManager(db_instance=self.manager.db, cache=CacheTareas())
+        con_cache.listar_tareas_usuario(uid)
+
+        for manager in (self.manager, con_cache):
+            for orden in ("desc", "asc"):
+                for estado in (None, "pendiente", "completada"):
+                    for tamano in (1, 2, 4, 20):
+                        esperado = self.manager.filtrar_tareas_usuario(
+                            uid, estado=estado, orden=orden)
+                        obtenido, cursor = [], None
+                        while True:
+                            pagina = manager.listar_tareas_pagina(
+                                uid, cursor=cursor, tamano=tamano,
+                                estado=estado, orden=orden)
+                            self.assertLessEqual(len(pagina["tareas"]), tamano)
+                            obtenido.extend(pagina["tareas"])
+                            cursor = pagina["siguiente"]
+                            if not cursor:
+                                break
+                        with self.subTest(cache=manager is con_cache, orden=orden,
+                                          estado=estado, tamano=tamano):
+                            self.assertEqual(obtenido, esperado)
+
+        with self.assertRaises(ValueError):
+            self.manager.listar_tareas_pagina(uid, cursor="basura")
+
+    def test_operaciones_masivas(self):
+        """
+        Valida las operaciones por lotes y que no afecten tareas de otro usuario.
+        """
+        uid = self.user["id"]
+        nuevas = [{"titulo": f"Lote {i}", "descripcion": "D",
+                   "fecha": "01/03/2025"} for i in range(1200)]
+        self.assertEqual(self.manager.agregar_tareas_usuario(uid, nuevas), 1200)
+        self.assertEqual(
+            self.manager.agregar_tareas_usuario(uid, [{"titulo": "X", "fecha": "xx"}]), 0)
+
+        self.manager.registrar_usuario("ajeno@test.com", "123", "Ajeno")
+        ajeno = self.manager.login("ajeno@test.com", "123")["id"]
+        self.manager.agregar_tarea_usuario(ajeno, "Ajena", "D")
+        id_ajena = self.manager.listar_tareas_usuario(ajeno)[0]["id"]
+
+        ids = [t["id"] for t in self.manager.listar_tareas_usuario(uid)]
+        self.assertEqual(
+            self.manager.marcar_completadas(uid, ids[:700] + [id_ajena]), 700)
+        self.assertEqual(self.manager.marcar_completadas(uid, ids[:100], False), 100)
+        self.assertEqual(self.manager.eliminar_tareas(uid, ids[-50:] + [id_ajena]), 50)
+        self.assertEqual(self.manager.eliminar_completadas(uid), 600)
+
+        restantes = self.manager.filtrar_tareas_usuario(uid, estado="Todas")
+        self.assertEqual(len(restantes), 550)
+        self.assertTrue(all(t["estado"] == "pendiente" for t in restantes))
+        self.assertEqual(len(self.manager.listar_tareas_usuario(ajeno)), 1)
+
+    def test_escrituras_verifican_propietario(self):
+        """
+        Con user_id, editar/completar/eliminar solo afectan tareas propias y
+        devuelven la cantidad de filas modificadas.
+        """
+        uid = self.user["id"]
+        self.manager.agregar_tarea_usuario(uid, "Propia", "D")
+        id_task = self.manager.listar_tareas_usuario(uid)[0]["id"]
+
+        self.manager.registrar_usuario("ajeno@test.com", "123", "Ajeno")
+        ajeno = self.manager.login("ajeno@test.com", "123")["id"]
+
+        self.assertEqual(self.manager.marcar_completada(id_task, user_id=ajeno), 0)
+        self.assertEqual(self.manager.editar_tarea(
+            id_task, "Robada", "D", None, "Baja", user_id=ajeno), 0)
+        self.assertEqual(self.manager.eliminar_tarea(id_task, user_id=ajeno), 0)
+
+        tarea = self.manager.listar_tareas_usuario(uid)[0]
+        self.assertEqual((tarea["titulo"], tarea["estado"]), ("Propia", "pendiente"))
+
+        self.assertEqual(self.manager.marcar_completada(id_task, user_id=uid), 1)
+        self.assertEqual(self.manager.editar_tarea(
+            id_task, "Editada", "D", "02/02/2025", "Alta", user_id=uid), 1)
+        tarea = self.manager.listar_tareas_usuario(uid)[0]
+        self.assertEqual((tarea["titulo"], tarea["estado"], tarea["fecha"]),
+                         ("Editada", "completada", "02/02/2025"))
+
+        self.assertEqual(self.manager.eliminar_tarea(id_task, user_id=uid), 1)
+        self.assertEqual(self.manager.eliminar_tarea(id_task), 0)
+
+    def test_estadisticas(self):
+        """
+        Conteos por estado, prioridad y periodo, y tareas vencidas (pendientes
+        con fecha pasada), sin importar cuántas tareas haya.
+        """
+        uid = self.user["id"]
+        self.assertEqual(self.manager.estadisticas_tareas(uid)["total"], 0)
+
+        self.manager.agregar_tareas_usuario(uid, [
+            {"titulo": "Vieja", "fecha": "03/02/2020", "prioridad": "Alta"},
+            {"titulo": "Vieja hecha", "fecha": "10/02/2020", "prioridad": "Alta"},
+            {"titulo": "Futura", "fecha": "05/03/2099"},
+            {"titulo": "Sin fecha"},
+        ])
+        hecha = self.manager.buscar_tareas(uid, "hecha")[0]["id"]
+        self.manager.marcar_completada(hecha)
+
+        stats = self.manager.estadisticas_tareas(uid)
+        self.assertEqual((stats["total"], stats["pendientes"], stats["completadas"],
+                          stats["vencidas"]), (4, 3, 1, 1))
+        self.assertEqual(stats["por_prioridad"], {
+            "Alta": {"pendiente": 1, "completada": 1},
+            "Media": {"pendiente": 2, "completada": 0}})
+        self.assertEqual(list(stats["por_periodo"].items()), [
+            ("2020-02", {"pendiente": 1, "completada": 1}),
+            ("2099-03", {"pendiente": 1, "completada": 0}),
+            ("Sin fecha", {"pendiente": 1, "completada": 0})])
+
+        semanas = self.manager.estadisticas_tareas(uid, periodo="semana")["por_periodo"]
+        self.assertEqual(list(semanas)[:2], ["2020-W05", "2020-W06"])
+        with self.assertRaises(ValueError):
+            self.manager.estadisticas_tareas(uid, periodo="anio")
+
+    def test_contadores_materializados(self):
+        """
+        user_task_stats sigue a cada escritura por medio de los triggers, el
+        resumen coincide con el GROUP BY y el verificador detecta y la
+        reconstrucción corrige una tabla desincronizada.
+        """
+        uid = self.user["id"]
+        db = self.manager.db
+        self.manager.agregar_tarea_usuario(uid, "Vencida", "", "01/01/2020", "Alta")
+        self.manager.agregar_tareas_usuario(uid, [
+            {"titulo": f"Lote {i}", "prioridad": "Baja"} for i in range(5)])
+        self.manager.importar_tareas(uid, io.StringIO("titulo,estado\nImportada,completada\n"))
+        ids = [t["id"] for t in self.manager.filtrar_tareas_usuario(uid, estado="pendiente")]
+        # ids[0] es la vencida (las tareas sin fecha van al final)
+        self.manager.marcar_completadas(uid, ids[1:3])
+        self.manager.editar_tarea(ids[3], "Editada", "", None, "Alta", user_id=uid)
+        self.manager.eliminar_tarea(ids[4], user_id=uid)
+
+        resumen = self.manager.resumen_tareas(uid)
+        stats = self.manager.estadisticas_tareas(uid)
+        for clave in ("total", "pendientes", "completadas", "vencidas", "por_prioridad"):
+            self.assertEqual(resumen[clave], stats[clave], clave)
+        self.assertEqual((resumen["total"], resumen["vencidas"]), (6, 1))
+
+        self.manager.eliminar_completadas(uid)
+        self.assertEqual(self.manager.resumen_tareas(uid)["completadas"], 0)
+        self.assertEqual(db.verificar_contadores(), [])
+
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("UPDATE user_task_stats SET pendientes = 99")
+        diferencias = db.verificar_contadores()
+        self.assertTrue(diferencias)
+        self.assertEqual(diferencias[0]["guardado"][0], 99)
+        db.reconstruir_contadores()
+        self.assertEqual(db.verificar_contadores(), [])
+        self.assertEqual(self.manager.resumen_tareas(uid)["pendientes"], 3)
+
+    def test_exportar_importar(self):
+        """
+        Ida y vuelta CSV y JSONL; las filas inválidas se informan con su línea
+        y no impiden importar las demás, aunque lleguen en varios lotes.
+        """
+        uid = self.user["id"]
+        self.manager.agregar_tarea_usuario(uid, "Leer, con coma", "Línea\nnueva",
+                                           "01/02/2025", "Alta")
+        self.manager.agregar_tarea_usuario(uid, "Sin fecha", "", None)
+        self.manager.marcar_completada(
+            self.manager.listar_tareas_usuario(uid)[0]["id"])
+
+        self.manager.registrar_usuario("copia@test.com", "123", "Copia")
+        copia = self.manager.login("copia@test.com", "123")["id"]
+        # El listado no trae la descripción: se compara la de cada detalle
+        originales = [(t["titulo"], self.manager.obtener_tarea(t["id"])["descripcion"],
+                       t["fecha"], t["prioridad"], t["estado"])
+                      for t in self.manager.listar_tareas_usuario(uid)]
+        for formato in ("csv", "jsonl"):
+            destino = io.StringIO()
+            self.assertEqual(self.manager.exportar_tareas(uid, destino, formato), 2)
+            self.manager.eliminar_tareas(
+                copia, [t["id"] for t in self.manager.listar_tareas_usuario(copia)])
+
+            destino.seek(0)
+            resultado = self.manager.importar_tareas(copia, destino, formato)
+            self.assertEqual(resultado, {"importadas": 2, "rechazadas": 0, "errores": []})
+            importadas = [(t["titulo"], self.manager.obtener_tarea(t["id"])["descripcion"],
+                           t["fecha"], t["prioridad"], t["estado"])
+                          for t in self.manager.listar_tareas_usuario(copia)]
+            self.assertEqual(importadas, originales)
+
+        origen = io.StringIO(
+            "titulo,fecha,estado\n"
+            "Buena,2025-03-01,\n"
+            ",01/03/2025,pendiente\n"
+            "Mala fecha,31/02/2025,pendiente\n"
+            "Mal estado,,archivada\n"
+            "Otra buena,02/03/2025,Completada\n")
+        resultado = self.manager.importar_tareas(uid, origen, tamano_lote=1)
+        self.assertEqual((resultado["importadas"], resultado["rechazadas"]), (2, 3))
+        self.assertEqual([linea for linea, _ in resultado["errores"]], [3, 4, 5])
+        self.assertEqual(len(self.manager.buscar_tareas(uid, "buena")), 2)
+
+        resultado = self.manager.importar_tareas(
+            uid, io.StringIO('{"titulo": "JSON"}\n\n{roto\n[1]\n'), "jsonl")
+        self.assertEqual(resultado["importadas"], 1)
+        self.assertEqual([linea for linea, _ in resultado["errores"]], [3, 4])
+        with self.assertRaises(ValueError):
+            self.manager.exportar_tareas(uid, io.StringIO(), "xml")
+
+    def test_importar_campos_no_texto(self):
+        """
+        En JSONL un campo puede no ser texto: los números se aceptan como
+        texto y los demás tipos rechazan solo su fila, sin cortar la importación.
+        """
+        uid = self.user["id"]
+        origen = io.StringIO(
+            '{"titulo": 5, "descripcion": 1.5}\n'
+            '{"titulo": "Prioridad numérica", "prioridad": 3}\n'
+            '{"titulo": ["lista"]}\n'
+            '{"titulo": "Estado", "estado": true}\n'
+            '{"titulo": "Fecha", "fecha": {"dia": 1}}\n'
+            '{"titulo": "Última", "estado": "pendiente"}\n')
+        resultado = self.manager.importar_tareas(uid, origen, "jsonl", tamano_lote=1)
+        self.assertEqual((resultado["importadas"], resultado["rechazadas"]), (2, 4))
+        self.assertEqual([linea for linea, _ in resultado["errores"]], [2, 3, 4, 5])
+        tareas = self.manager.listar_tareas_usuario(uid)
+        self.assertEqual(sorted(t["titulo"] for t in tareas), ["5", "Última"])
+        detalle = self.manager.obtener_tarea(
+            next(t["id"] for t in tareas if t["titulo"] == "5"))
+        self.assertEqual(detalle["descripcion"], "1.5")
+
 
 if __name__ == "__main__":
     unittest.main()
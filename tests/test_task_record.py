@@ -0,0 +1,50 @@
+"""
+Pruebas unitarias de TaskRecord, la fila de solo lectura de los listados.
+"""
+
+import unittest
+from src.logica.task_record import TaskRecord
+
+
+class TestTaskRecord(unittest.TestCase):
+    """
+    La tupla debe poder usarse en lugar del dict que devolvían los listados.
+    """
+
+    def setUp(self):
+        self.tarea = TaskRecord(7, "Leer", "Libro", "01/02/2025", "Alta", "pendiente")
+        self.como_dict = {"id": 7, "titulo": "Leer", "descripcion": "Libro",
+                          "fecha": "01/02/2025", "prioridad": "Alta",
+                          "estado": "pendiente"}
+
+    def test_acceso_como_dict(self):
+        self.assertEqual(self.tarea["titulo"], "Leer")
+        self.assertEqual(self.tarea.titulo, "Leer")
+        self.assertEqual(self.tarea[0], 7)
+        self.assertEqual(self.tarea.get("prioridad", "Media"), "Alta")
+        self.assertEqual(self.tarea.get("color", "gris"), "gris")
+        with self.assertRaises(KeyError):
+            self.tarea["color"]
+        # Pertenencia por clave, como en un dict (no por valor, como en una tupla)
+        self.assertIn("descripcion", self.tarea)
+        self.assertNotIn("Leer", self.tarea)
+        self.assertEqual(self.tarea.values(), tuple(self.como_dict.values()))
+
+    def test_conversion_y_comparacion(self):
+        self.assertEqual(dict(self.tarea), self.como_dict)
+        self.assertEqual(dict(self.tarea, estado="completada")["estado"], "completada")
+        self.assertEqual(self.tarea, self.como_dict)
+        self.assertFalse(self.tarea != self.como_dict)
+        self.assertNotEqual(self.tarea, dict(self.como_dict, titulo="Otro"))
+        self.assertEqual(self.tarea, TaskRecord(**self.como_dict))
+        self.assertEqual(len({self.tarea, TaskRecord(**self.como_dict)}), 1)
+
+    def test_inmutable(self):
+        with self.assertRaises(TypeError):
+            self.tarea["titulo"] = "Otro"
+        with self.assertRaises(AttributeError):
+            self.tarea.titulo = "Otro"
+
+
+if __name__ == "__main__":
+    unittest.main()